@@ -0,0 +1,118 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+ALERTS_STATE_FILE = "alerts_state.json"  # Últimas alertas evaluadas por ticker e intervalo
+ALERTS_LOG_FILE = "alerts.ndjson"  # Historial de eventos (un JSON por línea)
+
+# Alertas que se siguen entre corridas: nombre -> (texto, tipo de alerta)
+ALERT_LABELS = {
+    ("cruce_macd", "alcista"): ("Cruce MACD alcista", "alert_buy"),
+    ("cruce_macd", "bajista"): ("Cruce MACD bajista", "alert_sell"),
+    ("minorista_cruce_cero", True): ("Konkorde: minoristas cruzan a positivo", "alert_buy"),
+    ("signal_minimo", True): ("MACD signal en el 10% inferior histórico", "alert_buy"),
+    ("signal_maximo", True): ("MACD signal en el 10% superior histórico", "alert_sell"),
+}
+
+
+def alert_state(result):
+    """
+    Alertas activas de un resultado: sólo las que están encendidas.
+    """
+    state = {}
+    if result.cruce.value != "ninguno":
+        state["cruce_macd"] = result.cruce.value
+    for name in ("minorista_cruce_cero", "signal_minimo", "signal_maximo"):
+        if getattr(result, name):
+            state[name] = True
+    return state
+
+
+def event_message(event):
+    """
+    Línea de texto (con estado de color) para mostrar un evento en la interfaz.
+    """
+    label, status = ALERT_LABELS[(event["alert"], event["value"] if event["kind"] != "terminada" else event["previous"])]
+    when = datetime.fromisoformat(event["time"]).strftime("%H:%M")
+    if event["kind"] == "terminada":
+        return {"text": f"{when} {event['ticker']}: terminó {label}", "status": "info"}
+    return {"text": f"{when} {event['ticker']}: {'NUEVA' if event['kind'] == 'nueva' else 'CAMBIO'} {label}", "status": status}
+
+
+class SignalStore:
+    """
+    Guarda las últimas alertas de cada (ticker, intervalo) y detecta qué cambió.
+
+    `diff` compara un resultado nuevo con el anterior y devuelve los eventos
+    (alerta nueva, terminada o que cambió de sentido), que además se agregan al
+    log NDJSON. Con `path=None` / `log_path=None` no se persiste.
+    """
+
+    def __init__(self, path=ALERTS_STATE_FILE, log_path=ALERTS_LOG_FILE):
+        self.path = path
+        self.log_path = log_path
+        self._states = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                self._states = json.load(f)
+        except (OSError, ValueError):
+            self._states = {}
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            snapshot = dict(self._states)
+        try:
+            with open(self.path + ".tmp", 'w') as f:
+                json.dump(snapshot, f)
+            os.replace(self.path + ".tmp", self.path)
+        except OSError:
+            pass
+
+    def diff(self, result, interval, now=None):
+        """
+        Actualiza el estado del ticker y devuelve la lista de eventos (vacía si no cambió nada).
+
+        `now` es la hora de los eventos: la del reloj de la fuente de velas (simulado en
+        replay); por defecto, la hora local.
+        """
+        if result.error:
+            return []
+        key = f"{result.ticker.upper()}|{interval}"
+        current = alert_state(result)
+        with self._lock:
+            previous = self._states.get(key, {})
+            self._states[key] = current
+
+        now = (now or datetime.now()).astimezone().isoformat(timespec="seconds")
+        events = []
+        for alert in sorted(previous.keys() | current.keys()):
+            before, after = previous.get(alert), current.get(alert)
+            if before == after:
+                continue
+            kind = "nueva" if before is None else "terminada" if after is None else "cambio"
+            events.append({
+                "time": now, "ticker": result.ticker.upper(), "interval": interval,
+                "alert": alert, "kind": kind, "value": after, "previous": before,
+            })
+        if events:
+            self._log(events)
+        return events
+
+    def _log(self, events):
+        if not self.log_path:
+            return
+        try:
+            with self._lock, open(self.log_path, 'a') as f:
+                for event in events:
+                    f.write(json.dumps(event, ensure_ascii=False) + "\n")
+        except OSError:
+            pass
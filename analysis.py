@@ -1,349 +1,293 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
 import ta.momentum
 import ta.trend
 
+from bars import Bars
+from instrumentation import NULL_METRICS
+from indicators import (
+    ADX_MIN_BARS, QUANTILE_LOOKBACK, directional_movement, konkorde, minoristas, prior_quantiles, window_quantile,
+)
+from metadata import default_metadata_cache
+from report import StockResult, build_result
 
-def check_stock(ticker, period="5y", interval="1d"):
+
+def check_stock(ticker, period="5y", interval="1d", data=None, metadata=None, ticker_factory=None,
+                metrics=NULL_METRICS, quantile_prior=None, screen=None):
     """
-    Analiza un ticker y devuelve un diccionario con ticker, recuento de filtros y mensajes.
+    Analiza un ticker y devuelve un `StockResult` (valores y señales; el texto se arma con `render_report`).
+
+    Si se pasa `data` (OHLCV ya descargado, por ejemplo en lote) no se vuelve a descargar.
+    `ticker_factory` reemplaza a `yf.Ticker` (por ejemplo, por un falso offline).
+    `metrics` (`instrumentation.Metrics`) acumula la duración de cada etapa.
+    Con `quantile_prior` los cuantiles salen de esa señal histórica (ver `analyze_arrays`).
+    El nombre de la empresa sale del cache de metadatos y nunca bloquea por red.
+    Con `screen` ('compra', 'venta' o 'todas') devuelve None si `screen_arrays`
+    descarta el ticker, sin calcular el resto ni buscar el nombre.
     """
     try:
-        stock = yf.Ticker(ticker)
-        data = stock.history(period=period, interval=interval)
+        if data is None:
+            if ticker_factory is None:
+                import yfinance as yf  # Import diferido (ver data.yf_downloader)
+                ticker_factory = yf.Ticker
+            with metrics.stage("descarga", ticker):
+                data = ticker_factory(ticker).history(period=period, interval=interval)
 
         if data.empty:
-            return {
-                "ticker": ticker,
-                "pass_count": 0,
-                "messages": [
-                    {
-                        "text": f"{ticker.upper()}: No se encontraron datos.",
-                        "status": "fail",
-                    }
-                ],
-            }
-
-        # Cálculo de indicadores
-        data["RSI_14"] = ta.momentum.rsi(data["Close"], window=14)
-        macd_indicator = ta.trend.MACD(
-            close=data["Close"], window_fast=12, window_slow=26, window_sign=9
-        )
-        data["MACD_12_26_9"] = macd_indicator.macd()
-        data["MACDs_12_26_9"] = macd_indicator.macd_signal()
-        data["ADX_14"] = ta.trend.adx(
-            high=data["High"], low=data["Low"], close=data["Close"], window=14
-        )
+            return no_data_report(ticker)
 
-        # --- Cálculo de Konkorde (Versión Mejorada basada en PVI/NVI) ---
-        # 1. Cálculo de PVI y NVI
-        pvi = [100.0]
-        nvi = [100.0]
-        
-        close_prices = data['Close'].values
-        volumes = data['Volume'].values
-        
-        for i in range(1, len(data)):
-            prev_close = close_prices[i-1]
-            curr_close = close_prices[i]
-            prev_vol = volumes[i-1]
-            curr_vol = volumes[i]
-            
-            price_change = (curr_close - prev_close) / prev_close
-            
-            if curr_vol > prev_vol:
-                pvi.append(pvi[-1] * (1 + price_change))
-                nvi.append(nvi[-1])
-            elif curr_vol < prev_vol:
-                pvi.append(pvi[-1])
-                nvi.append(nvi[-1] * (1 + price_change))
-            else:
-                pvi.append(pvi[-1])
-                nvi.append(nvi[-1])
-        
-        data['PVI'] = pvi
-        data['NVI'] = nvi
-        
-        # 2. Suavizado para obtener las líneas de Konkorde (Estándar Blai5: 15 periodos)
-        # Manos Fuertes (Azul en TradingView) -> NVI - Media(NVI, 15)
-        nvi_ema_15 = data['NVI'].ewm(span=15).mean()
-        data['manos_fuertes'] = (data['NVI'] - nvi_ema_15)
-        
-        # Minoristas (Rojo en TradingView) -> PVI - Media(PVI, 15)
-        pvi_ema_15 = data['PVI'].ewm(span=15).mean()
-        data['minoristas'] = (data['PVI'] - pvi_ema_15)
-        
-        # Media de señal para Konkorde (Marrón en TradingView)
-        data['konkorde_signal'] = data['manos_fuertes'].rolling(window=15).mean()
-        
-        # Lógica de Alertas
-        pass_count = 0
-        messages = []
-
-        # Paso 1: RSI
-        rsi_val = data["RSI_14"].iloc[-1]
-        rsi_sobrecompra = rsi_val > 70
-        rsi_sobreventa = rsi_val < 30
-        rsi_status = "pass" if rsi_sobrecompra or rsi_sobreventa else "fail"
-        rsi_text = f"RSI(14): {rsi_val:.2f}. {'Sobrecompra' if rsi_sobrecompra else 'Sobreventa' if rsi_sobreventa else 'Neutral'}"
-        messages.append({"text": rsi_text, "status": rsi_status})
-        if rsi_status == "pass":
-            pass_count += 1
-
-        # Paso 2: MACD (Detección de cruce en las últimas 4 velas)
-        macd_series = data["MACD_12_26_9"]
-        signal_series = data["MACDs_12_26_9"]
-        
-        cruce_alcista = False
-        cruce_bajista = False
-        dias_desde_cruce = 0
-
-        # Buscamos en las últimas 4 velas (índices -1 a -4)
-        for i in range(1, 5):
-            idx_curr = -i
-            idx_prev = -(i + 1)
-            
-            curr_macd = macd_series.iloc[idx_curr]
-            curr_signal = signal_series.iloc[idx_curr]
-            prev_macd = macd_series.iloc[idx_prev]
-            prev_signal = signal_series.iloc[idx_prev]
-
-            # Cruce Alcista: MACD pasa de estar debajo a estar arriba de la señal
-            if prev_macd < prev_signal and curr_macd > curr_signal:
-                cruce_alcista = True
-                dias_desde_cruce = i - 1
-                break
-            # Cruce Bajista: MACD pasa de estar arriba a estar debajo de la señal
-            if prev_macd > prev_signal and curr_macd < curr_signal:
-                cruce_bajista = True
-                dias_desde_cruce = i - 1
-                break
-
-        last_macdsignal = signal_series.iloc[-1]
-        
-        # Lógica de confirmación con RSI (para pass_count)
-        macd_condition_met = (rsi_sobrecompra and cruce_bajista) or (
-            rsi_sobreventa and cruce_alcista
-        )
-        macd_status = "pass" if macd_condition_met else "fail"
-        
-        cruce_text = "Sin cruce reciente"
-        if cruce_alcista:
-            cruce_text = f"Cruce Alcista ({'Hoy' if dias_desde_cruce == 0 else f'hace {dias_desde_cruce}d'})"
-        elif cruce_bajista:
-            cruce_text = f"Cruce Bajista ({'Hoy' if dias_desde_cruce == 0 else f'hace {dias_desde_cruce}d'})"
-
-        macd_text = f"MACD ({last_macdsignal:.2f}): {cruce_text}. Confirmación RSI: {'OK' if macd_condition_met else 'NO'}"
-        messages.append({"text": macd_text, "status": macd_status})
-        
-        if cruce_alcista or cruce_bajista:
-            pass_count += 1
-
-        if cruce_alcista:
-            messages.append({'text': f"\n*** MACD: ALERTA DE COMPRA para {ticker.upper()} ***", 'status': 'alert_buy'})
-            messages.append({'text': f"Motivo: {cruce_text} de MACD.", 'status': 'alert_buy'})
-            pass_count += 1
-        elif cruce_bajista:
-            messages.append({'text': f"\n*** MACD: ALERTA DE VENTA para {ticker.upper()} ***", 'status': 'alert_sell'})
-            messages.append({'text': f"Motivo: {cruce_text} de MACD.", 'status': 'alert_sell'})
-            pass_count += 1
-
-        # Análisis de la señal MACD con cuantiles históricos
-        macd_signal_history = data['MACDs_12_26_9'].dropna() # Drop NaN values for accurate quantile calculation
-        quantile_10 = macd_signal_history.quantile(0.10)
-        quantile_90 = macd_signal_history.quantile(0.90)
-
-        if last_macdsignal <= quantile_10:
-            min_macd_text = f"MACD: Signal en el 10% inferior histórico ({quantile_10:.2f}). Posible oportunidad de compra."
-            messages.append({'text': min_macd_text, 'status': 'alert_buy'})
-            pass_count += 1
-
-        if last_macdsignal >= quantile_90:
-            max_macd_text = f"MACD: Signal en el 10% superior histórico ({quantile_90:.2f}). Posible oportunidad de venta."
-            messages.append({'text': max_macd_text, 'status': 'alert_sell'})
-            pass_count += 1
-
-        # Paso 3: ADX
-        # Get ADX, +DI, -DI
-        data["ADX_14"] = ta.trend.adx(
-            high=data["High"], low=data["Low"], close=data["Close"], window=14
-        )
-        data["ADX_POS_14"] = ta.trend.adx_pos(
-            high=data["High"], low=data["Low"], close=data["Close"], window=14
-        )
-        data["ADX_NEG_14"] = ta.trend.adx_neg(
-            high=data["High"], low=data["Low"], close=data["Close"], window=14
-        )
+        arrays = ohlcv_arrays(data)
+        if screen is not None:
+            with metrics.stage("filtro", ticker):
+                if not screen_arrays(arrays[2], arrays[3], screen, quantile_prior):
+                    return None
 
-        # --- Análisis de Canal de Tendencia (SMA 20/50 - Corto/Mediano Plazo) ---
-        data["SMA_20"] = data["Close"].rolling(window=20).mean()
-        data["SMA_50"] = data["Close"].rolling(window=50).mean()
-        
-        last_close = data["Close"].iloc[-1]
-        last_sma20 = data["SMA_20"].iloc[-1]
-        last_sma50 = data["SMA_50"].iloc[-1]
-        
-        # Calcular pendiente de SMA 20 (últimos 5 días)
-        prev_sma20 = data["SMA_20"].iloc[-6]
-        slope_sma20 = (last_sma20 - prev_sma20) / prev_sma20
-        
-        canal_status = "info"
-        if last_close > last_sma50 and slope_sma20 > 0.001:
-            canal_text = "Canal: ALCISTA (Basado en SMA 20/50 - Últimos 50 días)"
-            canal_status = "pass"
-        elif last_close < last_sma50 and slope_sma20 < -0.001:
-            canal_text = "Canal: BAJISTA (Basado en SMA 20/50 - Últimos 50 días)"
-            canal_status = "fail"
-        else:
-            canal_text = "Canal: LATERAL / CONSOLIDACIÓN (SMA 20/50)"
-            canal_status = "info"
-
-        adx_val = data["ADX_14"].iloc[-1]
-        adx_pos = data["ADX_POS_14"].iloc[-1]
-        adx_neg = data["ADX_NEG_14"].iloc[-1]
-
-        # Determine Trend Strength
-        adx_fuerte = adx_val > 23
-        strength_text = "Fuerte" if adx_fuerte else "Débil o en rango"
-
-        # Determine Trend Direction
-        trend_direction_text = "Indefinida"
-        if adx_pos > adx_neg and adx_val > 20:  # ADX > 20 to confirm a trend
-            trend_direction_text = "Alcista"
-        elif adx_neg > adx_pos and adx_val > 20:  # ADX > 20 to confirm a trend
-            trend_direction_text = "Bajista"
-
-        # Determine ADX overall status for pass_count
-        # Consider a pass if ADX is strong and direction is defined.
-        # Determine ADX status for coloring based on user's request
-        adx_status_for_color = "info"  # Default to grey
-
-        if adx_fuerte and trend_direction_text == "Alcista":
-            adx_status_for_color = "pass"  # Green
-        elif adx_fuerte and trend_direction_text == "Bajista":
-            adx_status_for_color = "fail"  # Red-Orange
-        else:  # Weak or undefined trend
-            adx_status_for_color = "info"  # For now, use info for yellow-like behavior
-
-        # Keep adx_status for pass_count consistent with previous logic
-        adx_status = (
-            "pass"
-            if adx_fuerte
-            and (trend_direction_text == "Alcista" or trend_direction_text == "Bajista")
-            else "fail"
-        )
-        adx_text = (
-            f"ADX: {adx_val:.2f}. Tendencia: {trend_direction_text} ({strength_text})"
-        )
-        messages.append(
-            {"text": adx_text, "status": adx_status_for_color}
-        )  # Use new status for color        messages.append({'text': adx_text, 'status': adx_status})
-        if adx_status == "pass":
-            pass_count += 1
-
-        # Canal de Tendencia
-        messages.append({"text": canal_text, "status": canal_status})
-
-        # Paso 4: Konkorde
-        # Análisis de Minoristas (PVI / Montaña)
-        last_minorista = data['minoristas'].iloc[-1]
-        prev_minorista = data['minoristas'].iloc[-2]
-        
-        minorista_cruce_cero = prev_minorista < 0 and last_minorista > 0
-        if minorista_cruce_cero:
-            messages.append({'text': "Konkorde: Interés minorista entrando (Cruce a cero). Alerta de COMPRA.", 'status': 'alert_buy'})
-            pass_count += 1
-        
-        # Análisis de Manos Fuertes (NVI)
-        last_mf = data['manos_fuertes'].iloc[-1]
-        prev_mf = data['manos_fuertes'].iloc[-2]
-        
-        mf_acumulando = last_mf > 0
-        mf_distribuyendo = last_mf < 0
-        mf_aumentando = last_mf > prev_mf
-
-        konkorde_status = "info"
-        if mf_acumulando:
-            konkorde_interpretation = "Manos Fuertes ACUMULANDO (Positivo)."
-            konkorde_status = "pass"
-            if mf_aumentando:
-                konkorde_interpretation += " Incrementando posición."
-        else:
-            konkorde_interpretation = "Manos Fuertes DISTRIBUYENDO (Negativo)."
-            konkorde_status = "fail"
-            if not mf_aumentando:
-                konkorde_interpretation += " Reduciendo posición."
-
-        messages.append({"text": f"Konkorde: {konkorde_interpretation}", "status": konkorde_status})
-
-        # Confirmación Konkorde + MACD
-        if (cruce_alcista and mf_acumulando):
-            messages.append({"text": "\n*** ESTRATEGIA: ALERTA DE COMPRA (Konkorde + MACD) ***", "status": "alert_buy"})
-            messages.append({"text": "Motivo: Cruce MACD con Institucionales comprando.", "status": "alert_buy"})
-            pass_count += 2
-        elif (cruce_bajista and mf_distribuyendo):
-            messages.append({"text": "\n*** ESTRATEGIA: ALERTA DE VENTA (Konkorde + MACD) ***", "status": "alert_sell"})
-            messages.append({"text": "Motivo: Cruce MACD con Institucionales vendiendo.", "status": "alert_sell"})
-            pass_count += 2
-        company_name = stock.info.get("longName", "")
-        header_text = f"{ticker.upper()}"
-        if company_name:
-            header_text += f" ({company_name})"
-        
-        current_price = data["Close"].iloc[-1]
-        price_text = f"Precio: ${current_price:.2f} USD"
-
-        # Create a list of all content lines to calculate max width
-        content_lines = [header_text, price_text, "═" * 10] # Divider placeholder
-        for m in messages:
-            content_lines.append(m['text'].strip())
-
-        # Find max width and add padding
-        max_w = max(len(line) for line in content_lines)
-        box_width = max_w + 4 # 2 spaces padding on each side
-
-        # Re-build messages with borders
-        framed_messages = []
-        
-        # Header
-        top_border = "╔" + "═" * (box_width) + "╗"
-        mid_border = "╠" + "═" * (box_width) + "╣"
-        bot_border = "╚" + "═" * (box_width) + "╝"
-
-        framed_messages.append({"text": top_border, "status": "info"})
-        
-        # Linea de Ticker
-        line = f"║  {header_text.ljust(max_w)}  ║"
-        framed_messages.append({"text": line, "status": "info"})
-        
-        # Linea de Precio
-        line = f"║  {price_text.ljust(max_w)}  ║"
-        framed_messages.append({"text": line, "status": "info"})
-        
-        framed_messages.append({"text": mid_border, "status": "info"})
-
-        # Contenido de indicadores
-        for m in messages:
-            text = m['text'].strip()
-            # If the text has multiple lines (like ALERTA), handle them
-            for subline in text.split('\n'):
-                subline = subline.strip()
-                if not subline: continue
-                
-                # Check if it's an alert to keep its status
-                line_str = f"║  {subline.ljust(max_w)}  ║"
-                framed_messages.append({"text": line_str, "status": m['status']})
-
-        framed_messages.append({"text": bot_border, "status": "info"})
-
-        return {"ticker": ticker, "pass_count": pass_count, "messages": framed_messages}
+        metadata = metadata or default_metadata_cache()
+        company_name = metadata.get_name(ticker)
+        return analyze_arrays(ticker, *arrays, company_name=company_name, metrics=metrics,
+                              quantile_prior=quantile_prior)
+
+    except Exception as e:
+        return error_report(ticker, e)
+
+
+def no_data_report(ticker):
+    return StockResult(ticker=ticker, error=f"{ticker.upper()}: No se encontraron datos.")
 
+
+def error_report(ticker, e):
+    return StockResult(ticker=ticker, error=f"{ticker.upper()}: Error al procesar - {e}")
+
+
+def ohlcv_arrays(data):
+    """
+    Extrae (high, low, close, volume) como arrays contiguos.
+
+    Son los únicos datos que necesita la etapa de indicadores y se serializan
+    como buffers crudos al pasarlos a otro proceso (sin el overhead del DataFrame).
+    Con `Bars` se pasan tal cual (float32 si así se guardaron).
+    """
+    if isinstance(data, Bars):
+        return data.high, data.low, data.close, data.volume
+    return tuple(
+        np.ascontiguousarray(data[col].to_numpy(dtype=float))
+        for col in ("High", "Low", "Close", "Volume")
+    )
+
+
+def analyze_arrays(ticker, high, low, close, volume, company_name="", metrics=NULL_METRICS,
+                   quantile_prior=None, screen=None):
+    """
+    Análisis completo de un ticker a partir de arrays OHLCV (sin I/O).
+
+    Es la tarea que se ejecuta en el pool de procesos: devuelve sólo el
+    `StockResult`, que es mucho más chico que los arrays de indicadores.
+    Si los arrays son sólo las últimas velas, `quantile_prior` = (señal MACD
+    histórica, velas nuevas) completa la ventana larga de los cuantiles.
+    Con `screen` devuelve None para los tickers que descarta `screen_arrays`.
+    """
+    try:
+        if screen is not None:
+            with metrics.stage("filtro", ticker):
+                if not screen_arrays(close, volume, screen, quantile_prior):
+                    return None
+        with metrics.stage("indicadores", ticker):
+            indicators = compute_indicators(high, low, close, volume)
+        with metrics.stage("reglas", ticker):
+            quantiles = None
+            if quantile_prior is not None:
+                quantiles = prior_quantiles(indicators["MACDs_12_26_9"], *quantile_prior)
+            signals = evaluate_signals(indicators, quantiles=quantiles)
+            return build_result(ticker, signals, company_name)
     except Exception as e:
-        return {
-            "ticker": ticker,
-            "pass_count": 0,
-            "messages": [
-                {"text": f"{ticker.upper()}: Error al procesar - {e}", "status": "fail"}
-            ],
-        }
+        return error_report(ticker, e)
+
+
+def compute_indicators(high, low, close, volume):
+    """
+    Calcula todos los indicadores sobre arrays OHLCV y devuelve un dict de arrays.
+
+    Función pura: no descarga nada ni toca estado global.
+    """
+    high = pd.Series(high, dtype=float)
+    low = pd.Series(low, dtype=float)
+    close = pd.Series(close, dtype=float)
+
+    indicators = {"Close": close.to_numpy()}
+
+    indicators["RSI_14"] = ta.momentum.rsi(close, window=14).to_numpy()
+    macd_indicator = ta.trend.MACD(
+        close=close, window_fast=12, window_slow=26, window_sign=9
+    )
+    indicators["MACD_12_26_9"] = macd_indicator.macd().to_numpy()
+    indicators["MACDs_12_26_9"] = macd_indicator.macd_signal().to_numpy()
+
+    # ADX, +DI, -DI en una sola pasada (True Range y DM se calculan una vez)
+    adx, adx_pos, adx_neg = directional_movement(high, low, close, window=14)
+    indicators["ADX_14"] = adx.to_numpy()
+    indicators["ADX_POS_14"] = adx_pos.to_numpy()
+    indicators["ADX_NEG_14"] = adx_neg.to_numpy()
+
+    # --- Canal de Tendencia (SMA 20/50 - Corto/Mediano Plazo) ---
+    indicators["SMA_20"] = close.rolling(window=20).mean().to_numpy()
+    indicators["SMA_50"] = close.rolling(window=50).mean().to_numpy()
+
+    # --- Cálculo de Konkorde (Versión Mejorada basada en PVI/NVI) ---
+    # PVI/NVI vectorizados y suavizado Blai5 de 15 periodos:
+    # Manos Fuertes (Azul en TradingView) -> NVI - Media(NVI, 15)
+    # Minoristas (Rojo en TradingView) -> PVI - Media(PVI, 15)
+    # Media de señal para Konkorde (Marrón en TradingView)
+    manos_fuertes, minoristas, konkorde_signal = konkorde(close.to_numpy(), volume)
+    indicators["manos_fuertes"] = manos_fuertes
+    indicators["minoristas"] = minoristas
+    indicators["konkorde_signal"] = konkorde_signal
+    return indicators
+
+
+def macd_cross(macd_series, signal_series, bars=4):
+    """
+    Cruce más reciente del MACD con su señal en las últimas `bars` velas: (alcista, bajista, velas desde el cruce).
+    """
+    for i in range(1, bars + 1):
+        idx_curr = -i
+        idx_prev = -(i + 1)
+
+        curr_macd = macd_series[idx_curr]
+        curr_signal = signal_series[idx_curr]
+        prev_macd = macd_series[idx_prev]
+        prev_signal = signal_series[idx_prev]
+
+        # Cruce Alcista: MACD pasa de estar debajo a estar arriba de la señal
+        if prev_macd < prev_signal and curr_macd > curr_signal:
+            return True, False, i - 1
+        # Cruce Bajista: MACD pasa de estar arriba a estar debajo de la señal
+        if prev_macd > prev_signal and curr_macd < curr_signal:
+            return False, True, i - 1
+    return False, False, 0
+
+
+def screen_arrays(close, volume, filter_type="compra", quantile_prior=None, quantile_lookback=QUANTILE_LOOKBACK):
+    """
+    Primer filtro barato: indica si alguna regla de alerta del tipo buscado se cumple.
+
+    Calcula sólo lo que leen esas reglas (MACD y su señal, los cuantiles y, para
+    compra, Minoristas) con las mismas fórmulas que `compute_indicators`: un
+    ticker descartado tampoco tendría la alerta en el análisis completo. Con
+    menos de `ADX_MIN_BARS` velas pasa, para que se informe como en el análisis completo.
+    """
+    if len(close) < ADX_MIN_BARS:
+        return True
+    buy = filter_type in ("compra", "todas")
+    sell = filter_type in ("venta", "todas")
+    close = pd.Series(close, dtype=float)
+
+    macd_indicator = ta.trend.MACD(close=close, window_fast=12, window_slow=26, window_sign=9)
+    signal_series = macd_indicator.macd_signal().to_numpy()
+    cruce_alcista, cruce_bajista, _ = macd_cross(macd_indicator.macd().to_numpy(), signal_series)
+    if (buy and cruce_alcista) or (sell and cruce_bajista):
+        return True
+
+    if quantile_prior is not None:
+        quantile_10, quantile_90 = prior_quantiles(signal_series, *quantile_prior)
+    else:
+        quantile_10 = window_quantile(signal_series, 0.10, quantile_lookback)
+        quantile_90 = window_quantile(signal_series, 0.90, quantile_lookback)
+    if (buy and signal_series[-1] <= quantile_10) or (sell and signal_series[-1] >= quantile_90):
+        return True
+
+    if not buy:
+        return False
+    retail = minoristas(close.to_numpy(), volume)
+    return bool(retail[-2] < 0 and retail[-1] > 0)
+
+
+def evaluate_signals(indicators, quantiles=None, quantile_lookback=QUANTILE_LOOKBACK):
+    """
+    Evalúa las reglas de alerta sobre las últimas velas de los indicadores.
+
+    Devuelve un dict con los valores numéricos y las condiciones (booleanos)
+    que luego usa `build_result` para el recuento de filtros. Los cuantiles de
+    la señal MACD usan los últimos `quantile_lookback` valores, así no dependen
+    de cuánto histórico se descargó; si los indicadores son sólo las últimas
+    velas (modo incremental) se pasan ya calculados en `quantiles` (q10, q90).
+    """
+    signals = {"price": indicators["Close"][-1]}
+
+    # Paso 1: RSI
+    rsi_val = indicators["RSI_14"][-1]
+    signals["rsi"] = rsi_val
+    signals["rsi_sobrecompra"] = rsi_val > 70
+    signals["rsi_sobreventa"] = rsi_val < 30
+
+    # Paso 2: MACD (Detección de cruce en las últimas 4 velas)
+    macd_series = indicators["MACD_12_26_9"]
+    signal_series = indicators["MACDs_12_26_9"]
+
+    # Buscamos en las últimas 4 velas (índices -1 a -4)
+    cruce_alcista, cruce_bajista, dias_desde_cruce = macd_cross(macd_series, signal_series)
+
+    signals["cruce_alcista"] = cruce_alcista
+    signals["cruce_bajista"] = cruce_bajista
+    signals["dias_desde_cruce"] = dias_desde_cruce
+
+    last_macdsignal = signal_series[-1]
+    signals["macd_signal"] = last_macdsignal
+
+    # Análisis de la señal MACD con cuantiles históricos (ventana móvil de valores válidos)
+    if quantiles is None:
+        quantiles = (
+            window_quantile(signal_series, 0.10, quantile_lookback),
+            window_quantile(signal_series, 0.90, quantile_lookback),
+        )
+    quantile_10, quantile_90 = quantiles
+    signals["quantile_10"] = quantile_10
+    signals["quantile_90"] = quantile_90
+    signals["signal_minimo"] = last_macdsignal <= quantile_10
+    signals["signal_maximo"] = last_macdsignal >= quantile_90
+
+    # Paso 3: ADX
+    adx_val = indicators["ADX_14"][-1]
+    adx_pos = indicators["ADX_POS_14"][-1]
+    adx_neg = indicators["ADX_NEG_14"][-1]
+    signals["adx"] = adx_val
+
+    # Determine Trend Strength
+    signals["adx_fuerte"] = adx_val > 23
+
+    # Determine Trend Direction
+    trend_direction_text = "Indefinida"
+    if adx_pos > adx_neg and adx_val > 20:  # ADX > 20 to confirm a trend
+        trend_direction_text = "Alcista"
+    elif adx_neg > adx_pos and adx_val > 20:  # ADX > 20 to confirm a trend
+        trend_direction_text = "Bajista"
+    signals["tendencia"] = trend_direction_text
+
+    # Canal de Tendencia (SMA 20/50)
+    last_close = indicators["Close"][-1]
+    last_sma20 = indicators["SMA_20"][-1]
+    last_sma50 = indicators["SMA_50"][-1]
+
+    # Calcular pendiente de SMA 20 (últimos 5 días)
+    prev_sma20 = indicators["SMA_20"][-6]
+    slope_sma20 = (last_sma20 - prev_sma20) / prev_sma20
+
+    if last_close > last_sma50 and slope_sma20 > 0.001:
+        signals["canal"] = "ALCISTA"
+    elif last_close < last_sma50 and slope_sma20 < -0.001:
+        signals["canal"] = "BAJISTA"
+    else:
+        signals["canal"] = "LATERAL"
+
+    # Paso 4: Konkorde
+    # Análisis de Minoristas (PVI / Montaña)
+    last_minorista = indicators["minoristas"][-1]
+    prev_minorista = indicators["minoristas"][-2]
+    signals["minorista_cruce_cero"] = prev_minorista < 0 and last_minorista > 0
+
+    # Análisis de Manos Fuertes (NVI)
+    last_mf = indicators["manos_fuertes"][-1]
+    prev_mf = indicators["manos_fuertes"][-2]
+    signals["mf_acumulando"] = last_mf > 0
+    signals["mf_distribuyendo"] = last_mf < 0
+    signals["mf_aumentando"] = last_mf > prev_mf
+    return signals
@@ -1,17 +1,19 @@
 import customtkinter as ctk
-from analysis import check_stock
+from report import has_opportunity
+from rendering import ReportView
+from scheduler import RunScheduler
+from markets import SystemClock, next_run_time, open_tickers
+from alerts import SignalStore, event_message
+from engine import AnalyticsEngine
+from instrumentation import METRICS_LOG_FILE, Metrics, profiled
 import threading
-import time
-import json
 import os
 import sys
 from datetime import datetime
-import pytz
-
-STOCKS_FILE = "stocks.json"
+from storage import STOCKS_FILE, read_stock_lists, write_stock_lists
 
 class App(ctk.CTk):
-    def __init__(self):
+    def __init__(self, source=None):
         super().__init__()
         self.spinner_chars = ['⠋', '⠙', '⠹', '⠸', '⠼', '⠴', '⠦', '⠧', '⠇', '⠏']
         self.spinner_idx = 0
@@ -31,6 +33,14 @@ class App(ctk.CTk):
 
         self.is_auto_analyzing = ctk.BooleanVar(value=False)
         self.last_analysis_time = None
+        # pandas/ta/yfinance y los caches se cargan en segundo plano: la ventana no los espera
+        self.engine = AnalyticsEngine(source)  # `source`: fuente de velas (yfinance, directorio local o replay)
+        self.signal_store = SignalStore()  # Últimas alertas por ticker: el modo automático sólo muestra cambios
+        self.run_scheduler = RunScheduler()  # Un solo análisis activo; los pedidos idénticos se comparten
+        self.execution_mode = "thread"  # "process": indicadores en todos los núcleos; "panel": todos los tickers a la vez
+        self.metrics_log = METRICS_LOG_FILE  # Tiempos por etapa de cada análisis (None para no guardarlos)
+        self.profile_path = None  # Con una ruta (ej. "analisis.prof") cada análisis se perfila con cProfile
+        self.tiered = True  # Primer filtro barato (MACD, cuantiles, Minoristas): sólo los candidatos se analizan completos
         
         # Mapping user-friendly period names to yfinance (period, interval)
         self.YFINANCE_PERIOD_INTERVAL_MAP = {
@@ -74,7 +84,7 @@ class App(ctk.CTk):
         self.analyze_button = ctk.CTkButton(self.top_frame, text="Analizar", command=self.start_analysis_thread)
         self.analyze_button.grid(row=1, column=2, padx=10, pady=5)
         
-        self.auto_checkbox = ctk.CTkCheckBox(self.top_frame, text="Análisis Automático (cada 10 min)", variable=self.is_auto_analyzing, command=self.toggle_auto_analysis)
+        self.auto_checkbox = ctk.CTkCheckBox(self.top_frame, text="Análisis Automático (al cierre de cada vela, en horario de mercado)", variable=self.is_auto_analyzing, command=self.toggle_auto_analysis)
         self.auto_checkbox.grid(row=2, column=1, columnspan=2, padx=10, pady=5, sticky="w")
 
         # --- FRAME PARA SELECCIÓN DE TEMPORALIDAD ---
@@ -108,18 +118,28 @@ class App(ctk.CTk):
         self.results_textbox = ctk.CTkTextbox(self, corner_radius=10, font=ctk.CTkFont(family="Consolas", size=13))
         self.results_textbox.grid(row=1, column=0, padx=10, pady=(0, 10), sticky="nsew")
         self.configure_tags()
+
+        # Reportes en lotes por cuadro, con ventana acotada y botón para cargar el resto
+        self.report_view = ReportView(self.results_textbox, on_hidden_changed=self.update_load_more_button)
+        self.load_more_button = ctk.CTkButton(self, text="Mostrar más", command=self.report_view.load_more)
+        self.load_more_button.grid(row=2, column=0, padx=10, pady=(0, 10))
+        self.load_more_button.grid_remove()
+        self.report_view.start(self)
         self.update_results([{'text': "Bienvenido. Cargue acciones y presione 'Analizar' o active el modo automático.", 'status': 'info'}])
 
         # --- CARGA INICIAL Y LOOP AUTOMÁTICO ---
         self.load_stocks()
         self.auto_analysis_thread = None
+        self.auto_stop = threading.Event()  # Corta la espera del modo automático al instante
         self.protocol("WM_DELETE_WINDOW", self.on_closing) # Manejar cierre de ventana
         self.run_auto = True
+        self.after(100, self.engine.prewarm)  # Con la ventana ya dibujada
 
     def period_changed(self):
-        # Trigger analysis if not in auto mode and tickers are present
+        # Trigger analysis if not in auto mode and tickers are present.
+        # Switching timeframe/filter recomputes on cached bars (weekly is derived from daily)
         if not self.is_auto_analyzing.get() and self.entry_tickers.get():
-            self.start_analysis_thread()
+            self.start_analysis_thread(refresh=False)
 
     def configure_tags(self):
         self.results_textbox.tag_config('info', foreground='gray80')
@@ -134,23 +154,46 @@ class App(ctk.CTk):
         if self.is_loading:
             char = self.spinner_chars[self.spinner_idx % len(self.spinner_chars)]
             self.results_textbox.configure(state="normal")
-            # Overwrite the character at the very end
-            self.results_textbox.delete("end-2c", "end-1c")
-            self.results_textbox.insert("end-1c", char, "spinner")
+            # Overwrite the character at the spinner mark
+            self.results_textbox.delete("spinner", "spinner+1c")
+            self.results_textbox.insert("spinner", char, "spinner")
             self.results_textbox.configure(state="disabled")
             self.spinner_idx += 1
             self.after(80, self.animate_spinner)
         else:
             # Clean up spinner character and clear line
             self.results_textbox.configure(state="normal")
-            self.results_textbox.delete("end-2c", "end-1c")
+            self.results_textbox.delete("spinner", "spinner+1c")
             self.results_textbox.configure(state="disabled")
 
-    def start_analysis_thread(self, from_auto=False):
+    def start_analysis_thread(self, from_auto=False, refresh=True, tickers=None):
         if not from_auto and self.is_auto_analyzing.get():
             self.update_results([{'text': "Info: El análisis automático ya está en ejecución.", 'status': 'info'}])
             return
-            
+
+        tickers_list = tickers or [ticker.strip().upper() for ticker in self.entry_tickers.get().split(',') if ticker.strip()]
+        if not tickers_list:
+            self.update_results([{'text': "Error: Ingrese al menos un ticker.", 'status': 'fail'}])
+            return
+
+        selected_period_label = self.period_var.get()
+        yfinance_params = self.YFINANCE_PERIOD_INTERVAL_MAP.get(selected_period_label, {"period": "1y", "interval": "1d"}) # Default to 1y, 1d
+        yfinance_period = yfinance_params["period"]
+        yfinance_interval = yfinance_params["interval"]
+        filter_type = self.opportunity_filter_var.get() # 'compra' o 'venta'
+
+        # Si ya corre el mismo análisis (misma lista, temporalidad y filtro) no se repite:
+        # sus resultados son los que se están mostrando
+        run_key = (tuple(tickers_list), yfinance_interval, filter_type)
+        if self.run_scheduler.active(run_key):
+            return
+        # Cualquier otro análisis en curso queda reemplazado por este
+        self.run_scheduler.cancel_all()
+
+        # Guardamos en la lista activa antes de analizar
+        self.update_active_list_data()
+        self.save_stocks()
+
         self.analyze_button.configure(state="disabled")
         self.last_analysis_time = datetime.now()
         
@@ -158,22 +201,22 @@ class App(ctk.CTk):
             self.clear_textbox()
             self.results_textbox.see("0.0") # Scroll to top when starting a new analysis
             
-            # Start the line without a newline so spinner can append
+            # The spinner lives on the header line while reports stream in below it
             self.results_textbox.configure(state="normal")
             self.results_textbox.insert("end", "Iniciando análisis manual...  ", "info")
+            self.results_textbox.mark_set("spinner", "end-2c")
+            self.results_textbox.mark_gravity("spinner", "left")
+            self.results_textbox.insert("end", "\n\n\n")
             self.results_textbox.configure(state="disabled")
             
             self.is_loading = True
             self.animate_spinner()
 
-        selected_period_label = self.period_var.get()
-        yfinance_params = self.YFINANCE_PERIOD_INTERVAL_MAP.get(selected_period_label, {"period": "1y", "interval": "1d"}) # Default to 1y, 1d
-        yfinance_period = yfinance_params["period"]
-        yfinance_interval = yfinance_params["interval"]
-        
-        thread = threading.Thread(target=self.run_analysis, args=(yfinance_period, yfinance_interval,))
-        thread.daemon = True
-        thread.start()
+        self.begin_streamed_results()
+
+        self.run_scheduler.submit(run_key, lambda cancel: self.run_analysis(
+            tickers_list, yfinance_period, yfinance_interval, filter_type, cancel, from_auto, refresh
+        ))
 
     # --- LÓGICA DE GESTIÓN DE LISTAS ---
     def change_active_list(self, new_name):
@@ -227,105 +270,136 @@ class App(ctk.CTk):
         self.entry_tickers.insert(0, ", ".join(tickers))
         self.save_stocks()
 
-    def run_analysis(self, yfinance_period, yfinance_interval):
-        tickers_input = self.entry_tickers.get()
-        if not tickers_input:
-            self.is_loading = False
-            self.update_results([{'text': "Error: Ingrese al menos un ticker.", 'status': 'fail'}])
-            self.after(100, self.on_analysis_complete)
-            return
-
-        tickers_list = [ticker.strip().upper() for ticker in tickers_input.split(',') if ticker.strip()]
-        
-        # Guardamos en la lista activa antes de analizar
-        self.update_active_list_data()
-        self.save_stocks()
-        
-        all_reports = []
-        for ticker in tickers_list:
-            if ticker:
-                report = check_stock(ticker, yfinance_period, yfinance_interval)
-                all_reports.append(report)
-        
-        # Sort reports by pass_count in descending order
-        all_reports.sort(key=lambda x: x['pass_count'], reverse=True)
+    def run_analysis(self, tickers_list, yfinance_period, yfinance_interval, filter_type, cancel,
+                     incremental=False, refresh=True):
+        if not self.engine.ready:
+            self.after(0, self.update_results, [{'text': "Cargando motor de análisis...", 'status': 'info'}])
+        try:
+            engine = self.engine.get()
+        except Exception as e:
+            self.after(0, self.update_results, [{'text': f"Error cargando el motor de análisis: {e}", 'status': 'fail'}])
+            self.after(200, self.on_analysis_complete)
+            return []
+
+        # El modo automático compara todas las alertas contra el ciclo anterior: ahí no se filtra antes
+        screen = filter_type if self.tiered and not incremental else None
+
+        # Los nombres de empresa se completan en segundo plano mientras se descargan las velas
+        # (con el primer filtro se buscan sólo los de los candidatos)
+        engine.metadata_cache.reset_stats()
+        if screen is None:
+            engine.metadata_cache.prefetch(tickers_list)
+
+        # FILTRO DE OPORTUNIDAD: se aplica a cada reporte apenas llega
+        shown = []
+        changes = []
+
+        def on_result(result):
+            if cancel.is_set():
+                return
+            if incremental:
+                # Modo automático: sólo se muestra lo que cambió desde el ciclo anterior
+                events = self.signal_store.diff(result, yfinance_interval, engine.clock.now())
+                if not events:
+                    return
+                changes.extend(events)
+                self.after(0, self.update_run_results, cancel, [event_message(e) for e in events])
+                if not any(e['kind'] != "terminada" for e in events):
+                    return
+            # Filtra por las señales tipadas; el texto sólo se arma para lo que se muestra
+            if has_opportunity(result, filter_type):
+                shown.append(result)
+                self.report_view.push(result, cancel)
+
+        metrics = Metrics()
+        self.report_view.metrics = metrics
+
+        # Descarga concurrente en lote (incremental sobre el cache); cada ticker se muestra al terminar
+        with profiled(self.profile_path):
+            engine.run_pipeline(tickers_list, yfinance_period, yfinance_interval, on_result=on_result,
+                                max_workers=engine.max_workers, cache=engine.ohlcv_cache, metadata=engine.metadata_cache,
+                                mode=self.execution_mode, state_store=engine.state_store if incremental else None,
+                                refresh=refresh, cancel=cancel, metrics=metrics,
+                                quantile_store=engine.quantile_store, downloader=engine.provider, screen=screen)
+
+        if cancel.is_set():
+            # Reemplazado por un análisis más nuevo, que ya es dueño de la pantalla
+            return shown
 
-        # APLICAR FILTRO DE OPORTUNIDAD
-        filter_type = self.opportunity_filter_var.get() # 'compra' o 'venta'
-        status_to_match = "alert_buy" if filter_type == "compra" else "alert_sell"
-        
-        filtered_reports = []
-        for report in all_reports:
-            # Si el reporte contiene al menos un mensaje con el estatus buscado
-            has_matching_opportunity = any(msg.get('status') == status_to_match for msg in report.get('messages', []))
-            if has_matching_opportunity:
-                filtered_reports.append(report)
-
-        # DETENER SPINNER Y AGREGAR SALTOS DE LINEA ANTES DE MOSTRAR RESULTADOS
         self.is_loading = False
-        self.after(0, self.insert_separator_newlines)
-
-        if not filtered_reports:
+        if incremental:
+            self.signal_store.save()
+            if not changes:
+                self.update_results([{'text': "Sin cambios en las alertas desde el último análisis.", 'status': 'info'}])
+        elif not shown:
             self.update_results([{'text': f"No se encontraron oportunidades de {filter_type.upper()} en esta lista.", 'status': 'info'}])
-        else:
-            for report in filtered_reports:
-                self.after(100, self.update_results, report['messages'])
-                self.after(100, self.update_results, [{'text': "\n", 'status': 'info'}]) # Add a newline for separation
+
+        self.after(150, self.update_run_results, cancel, [
+            {'text': engine.metadata_cache.stats_text(), 'status': 'info'},
+            {'text': metrics.summary(), 'status': 'info'},
+        ])
+        metrics.write_log(self.metrics_log, interval=yfinance_interval, mode=self.execution_mode,
+                          incremental=incremental, filter=filter_type)
         
         self.after(200, self.on_analysis_complete)
+        return shown
 
     def save_stocks(self):
         try:
-            # Guardamos todo el objeto (listas y activa)
-            data = {
-                "active_list": self.active_list_name,
-                "lists": self.stock_lists
-            }
-            with open(STOCKS_FILE, 'w') as f:
-                json.dump(data, f)
+            write_stock_lists(self.stock_lists, self.active_list_name)
         except Exception as e:
             self.update_results([{'text': f"Error guardando acciones: {e}", 'status': 'fail'}])
 
-    def insert_separator_newlines(self):
-        self.results_textbox.configure(state="normal")
-        self.results_textbox.insert("end", "\n\n\n")
-        self.results_textbox.configure(state="disabled")
+    def begin_streamed_results(self):
+        # Los reportes se insertan desde acá, ordenados por pass_count
+        self.report_view.begin()
+
+    def update_load_more_button(self, hidden):
+        if hidden:
+            self.load_more_button.configure(text=f"Mostrar más ({hidden} ocultos)")
+            self.load_more_button.grid()
+        else:
+            self.load_more_button.grid_remove()
 
     def toggle_auto_analysis(self):
         if self.is_auto_analyzing.get():
             self.clear_textbox()
             self.update_results([{'text': "Modo automático ACTIVADO.", 'status': 'info'}])
             self.analyze_button.configure(state="disabled")
-            self.auto_analysis_thread = threading.Thread(target=self.auto_analysis_loop)
+            self.auto_stop = threading.Event()
+            self.auto_analysis_thread = threading.Thread(target=self.auto_analysis_loop, args=(self.auto_stop,))
             self.auto_analysis_thread.daemon = True
             self.auto_analysis_thread.start()
         else:
             self.update_results([{'text': "Modo automático DESACTIVADO.", 'status': 'info'}])
             self.analyze_button.configure(state="normal")
-            # El loop se detendrá naturalmente en la próxima iteración al chequear `is_auto_analyzing`
-
-    def auto_analysis_loop(self):
-        while self.is_auto_analyzing.get() and self.run_auto:
-            if self.is_market_open():
-                self.clear_textbox()
-                self.update_results([{'text': f"Mercado ABIERTO. Analizando automáticamente... (Último análisis: {self.last_analysis_time.strftime('%H:%M:%S') if self.last_analysis_time else 'Nunca'})", 'status': 'info'}])
-                self.start_analysis_thread(from_auto=True)
-                time.sleep(600) # Espera 10 minutos
+            self.auto_stop.set()  # Despierta al loop, que termina sin esperar el próximo ciclo
+
+    def auto_analysis_loop(self, stop):
+        try:
+            clock = self.engine.get().clock  # En replay el reloj es simulado y el loop corre acelerado
+        except Exception:
+            clock = SystemClock()  # El error de carga se informa en cada análisis
+        while not stop.is_set():
+            tickers = [t.strip().upper() for t in self.entry_tickers.get().split(',') if t.strip()]
+            interval = self.YFINANCE_PERIOD_INTERVAL_MAP.get(self.period_var.get(), {"interval": "1d"})["interval"]
+            now = clock.now()
+
+            # Sólo se descargan los tickers cuyo mercado está en rueda
+            tickers_open = open_tickers(tickers, now)
+            # No se limpia la pantalla: cada ciclo agrega sólo las alertas que cambiaron
+            if tickers_open:
+                self.update_results([{'text': f"Mercado ABIERTO ({len(tickers_open)} de {len(tickers)} tickers). Analizando automáticamente... (Último análisis: {self.last_analysis_time.strftime('%H:%M:%S') if self.last_analysis_time else 'Nunca'})", 'status': 'info'}])
+                self.start_analysis_thread(from_auto=True, tickers=tickers_open)
             else:
-                self.clear_textbox()
                 self.update_results([{'text': "Mercado CERRADO. El análisis automático se reanudará en horario de mercado.", 'status': 'info'}])
-                time.sleep(60) # Espera 1 minuto y vuelve a chequear
-        self.after(100, self.on_auto_analysis_stopped)
 
-    def is_market_open(self):
-        try:
-            tz = pytz.timezone('America/Argentina/Buenos_Aires')
-            now_ar = datetime.now(tz)
-            is_weekday = now_ar.weekday() < 5 # Lunes=0, Domingo=6
-            is_market_time = 11 <= now_ar.hour < 17
-            return is_weekday and is_market_time
-        except Exception: # Si falla pytz, asumimos que está cerrado por seguridad
-            return False
+            # Próxima corrida en el siguiente cierre de vela: la cadencia no deriva con la duración del análisis
+            next_run = next_run_time(tickers, interval, now)
+            self.update_results([{'text': f"Próximo análisis: {next_run.astimezone().strftime('%d/%m %H:%M:%S')}", 'status': 'info'}])
+            clock.wait(stop, max(0.0, (next_run - clock.now()).total_seconds()))
+        if self.run_auto: # Si se cerró la ventana no hay nada que actualizar
+            self.after(100, self.on_auto_analysis_stopped)
 
     def update_results(self, messages):
         self.results_textbox.configure(state="normal")
@@ -338,6 +412,11 @@ class App(ctk.CTk):
 
         self.results_textbox.configure(state="disabled")
 
+    def update_run_results(self, cancel, messages):
+        # Desde el thread de la interfaz: un análisis ya reemplazado no escribe en la pantalla nueva
+        if not cancel.is_set():
+            self.update_results(messages)
+
     def on_analysis_complete(self):
         self.is_loading = False
         if not self.is_auto_analyzing.get():
@@ -354,35 +433,36 @@ class App(ctk.CTk):
     def load_stocks(self):
         if os.path.exists(STOCKS_FILE):
             try:
-                with open(STOCKS_FILE, 'r') as f:
-                    data = json.load(f)
-                    
-                    # Compatibilidad con formato viejo (si era una lista simple)
-                    if isinstance(data, list):
-                        self.stock_lists = {"Mi Portfolio": data}
-                        self.active_list_name = "Mi Portfolio"
-                    else:
-                        self.stock_lists = data.get("lists", {"Mi Portfolio": []})
-                        self.active_list_name = data.get("active_list", "Mi Portfolio")
-                    
-                    # Actualizar UI
-                    self.list_selector.configure(values=list(self.stock_lists.keys()))
-                    self.list_selector.set(self.active_list_name)
-                    
-                    tickers = self.stock_lists.get(self.active_list_name, [])
-                    self.entry_tickers.delete(0, "end")
-                    self.entry_tickers.insert(0, ", ".join(tickers))
-                    
+                self.stock_lists, self.active_list_name = read_stock_lists()
+
+                # Actualizar UI
+                self.list_selector.configure(values=list(self.stock_lists.keys()))
+                self.list_selector.set(self.active_list_name)
+
+                tickers = self.stock_lists.get(self.active_list_name, [])
+                self.entry_tickers.delete(0, "end")
+                self.entry_tickers.insert(0, ", ".join(tickers))
+
             except Exception as e:
                 self.update_results([{'text': f"Error cargando acciones: {e}", 'status': 'fail'}])
     
     def on_closing(self):
-        self.run_auto = False # Señal para que el loop del thread se detenga
-        if self.is_auto_analyzing.get():
-            self.is_auto_analyzing.set(False)
-            time.sleep(1.1) # Dar tiempo al thread para que termine su ciclo
+        self.run_auto = False
+        self.auto_stop.set() # El loop automático termina al instante, sin esperar
+        self.run_scheduler.cancel_all()
         self.destroy()
 
 if __name__ == "__main__":
-    app = App()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Monitor de alertas de acciones (GUI).")
+    parser.add_argument("--data-dir", help="Velas desde un directorio local (CSV/Parquet) en lugar de yfinance.")
+    parser.add_argument("--replay", metavar="DIR", help="Repite una sesión grabada con un reloj simulado.")
+    parser.add_argument("--speed", type=float, default=1.0, help="Velocidad del replay (ej. 1000).")
+    parser.add_argument("--replay-start", help="Fecha/hora de inicio del replay (por defecto, la primera con historia suficiente).")
+    parser.add_argument("--replay-interval", default="1h", choices=["1h", "1d", "1wk"])
+    args = parser.parse_args()
+    source = {"data_dir": args.data_dir, "replay": args.replay, "speed": args.speed,
+              "start": args.replay_start, "interval": args.replay_interval}
+    app = App(source)
     app.mainloop()
\ No newline at end of file
@@ -0,0 +1,171 @@
+"""
+Backtest vectorizado de las reglas de alerta de `check_stock`.
+
+Evalúa cada regla en todas las velas a la vez (series booleanas sobre un panel
+velas x tickers) y mide el retorno hacia adelante desde cada disparo.
+
+    python -m backtest --list "Mi Portfolio" --interval 1d --period 10y
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from indicators import QUANTILE_LOOKBACK, QUANTILE_MIN_PERIODS, konkorde, macd, rolling_quantile
+from panel import build_panel
+
+HORIZONS = (5, 10, 20)  # Velas hacia adelante para medir el retorno
+CROSS_LOOKBACK = 4  # Igual que `evaluate_signals`: cruces en las últimas 4 velas
+
+# Regla -> dirección de la alerta (en "venta" acertar es que el precio baje)
+RULES = {
+    "cruce_alcista": "compra",
+    "cruce_bajista": "venta",
+    "signal_minimo": "compra",
+    "signal_maximo": "venta",
+    "minorista_cruce_cero": "compra",
+    "estrategia_compra": "compra",
+    "estrategia_venta": "venta",
+}
+
+
+def rule_signals(close, volume, quantile_lookback=QUANTILE_LOOKBACK, quantile_min_periods=QUANTILE_MIN_PERIODS):
+    """
+    Evalúa las reglas de alerta en cada vela del panel.
+
+    Devuelve {regla: DataFrame booleano velas x tickers}; la fila t es lo que
+    `evaluate_signals` hubiera informado con el histórico hasta la vela t.
+    Las reglas de cuantiles no se encienden hasta tener `quantile_min_periods`
+    valores de señal (con dos o tres valores cualquier vela es un extremo).
+    """
+    return rule_states(close, volume, quantile_lookback, quantile_min_periods)[0]
+
+
+def rule_states(close, volume, quantile_lookback=QUANTILE_LOOKBACK, quantile_min_periods=QUANTILE_MIN_PERIODS):
+    """
+    Como `rule_signals`, pero devuelve también {regla: DataFrame booleano} con las
+    velas en que la regla ya se puede evaluar (sólo las reglas con calentamiento propio).
+    """
+    macd_line, signal = macd(close, 12, 26, 9)
+    macd_line, signal = macd_line.to_numpy(), signal.to_numpy()
+
+    # Cruces en cada vela (comparaciones con NaN dan False, como en el análisis por ticker)
+    prev_macd, prev_signal = np.roll(macd_line, 1, axis=0), np.roll(signal, 1, axis=0)
+    prev_macd[0], prev_signal[0] = np.nan, np.nan
+    up = (prev_macd < prev_signal) & (macd_line > signal)
+    down = (prev_macd > prev_signal) & (macd_line < signal)
+
+    # Ventana de 4 velas: gana el cruce más reciente (se recorre de la más vieja a la más nueva)
+    cruce_alcista = np.zeros_like(up)
+    cruce_bajista = np.zeros_like(down)
+    for lag in range(CROSS_LOOKBACK - 1, -1, -1):
+        lag_up = np.zeros_like(up)
+        lag_down = np.zeros_like(down)
+        lag_up[lag:] = up[:len(up) - lag]
+        lag_down[lag:] = down[:len(down) - lag]
+        crossed = lag_up | lag_down
+        cruce_alcista = np.where(crossed, lag_up, cruce_alcista)
+        cruce_bajista = np.where(crossed, lag_down, cruce_bajista)
+
+    # Cuantiles de la señal MACD en cada vela, con la misma ventana móvil que el análisis en vivo
+    signal_frame = pd.DataFrame(signal, columns=close.columns)
+    quantile_10 = rolling_quantile(signal_frame, 0.10, quantile_lookback, quantile_min_periods).to_numpy()
+    quantile_90 = rolling_quantile(signal_frame, 0.90, quantile_lookback, quantile_min_periods).to_numpy()
+
+    manos_fuertes, minoristas, _ = konkorde(close.to_numpy(), volume.to_numpy())
+    prev_minoristas = np.roll(minoristas, 1, axis=0)
+    prev_minoristas[0] = np.nan
+
+    signals = {
+        "cruce_alcista": cruce_alcista,
+        "cruce_bajista": cruce_bajista,
+        "signal_minimo": signal <= quantile_10,
+        "signal_maximo": signal >= quantile_90,
+        "minorista_cruce_cero": (prev_minoristas < 0) & (minoristas > 0),
+        "estrategia_compra": cruce_alcista & (manos_fuertes > 0),
+        "estrategia_venta": cruce_bajista & (manos_fuertes < 0),
+    }
+    # Los cuantiles recién existen con `quantile_min_periods` valores de señal
+    quantiles_ready = ~np.isnan(quantile_10)
+    ready = {"signal_minimo": quantiles_ready, "signal_maximo": quantiles_ready}
+    return (
+        {name: pd.DataFrame(values, columns=close.columns) for name, values in signals.items()},
+        {name: pd.DataFrame(values, columns=close.columns) for name, values in ready.items()},
+    )
+
+
+def forward_returns(close, horizon):
+    return close.shift(-horizon) / close - 1
+
+
+def backtest(histories, horizons=HORIZONS):
+    """
+    Cuenta los disparos de cada regla en toda la lista y resume sus retornos hacia adelante.
+
+    Un disparo es la primera vela en que la regla se enciende (una alerta que
+    sigue activa varias velas cuenta una vez). Si la regla ya está encendida en
+    la primera vela en que se puede evaluar no cuenta: no se vio el momento en
+    que se encendió. Devuelve un DataFrame con una
+    fila por regla: dirección, disparos, retorno medio y % de aciertos por horizonte.
+    """
+    histories = {t: d for t, d in histories.items() if d is not None and not d.empty}
+    panel = build_panel(histories)
+    close = panel["Close"]
+    signals, ready = rule_states(close, panel["Volume"])
+    returns = {h: forward_returns(close, h).to_numpy() for h in horizons}
+
+    rows = {}
+    for name, direction in RULES.items():
+        active = signals[name].to_numpy()
+        onset = active.copy()
+        onset[1:] &= ~active[:-1]
+        if name in ready:
+            evaluable = ready[name].to_numpy()
+            onset[0] = False
+            onset[1:] &= evaluable[:-1]
+        row = {"direccion": direction, "disparos": int(onset.sum())}
+        for h in horizons:
+            values = returns[h][onset]
+            values = values[~np.isnan(values)]
+            hits = values > 0 if direction == "compra" else values < 0
+            row[f"retorno_{h}"] = values.mean() if len(values) else np.nan
+            row[f"aciertos_{h}"] = hits.mean() if len(values) else np.nan
+        rows[name] = row
+    return pd.DataFrame.from_dict(rows, orient="index")
+
+
+def format_summary(summary):
+    formatted = summary.copy()
+    for column in summary.columns:
+        if column.startswith("retorno_") or column.startswith("aciertos_"):
+            formatted[column] = summary[column].map(lambda v: "-" if pd.isna(v) else f"{v * 100:.2f}%")
+    return formatted.to_string()
+
+
+def main(argv=None):
+    from cache import OHLCVCache
+    from data import DEFAULT_PERIODS, fetch_histories
+    from storage import STOCKS_FILE, read_stock_lists
+
+    parser = argparse.ArgumentParser(description="Backtest de las reglas de alerta sobre una lista de tickers.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--list", help="Nombre de la lista guardada (por defecto, la lista activa).")
+    source.add_argument("--tickers", help="Tickers separados por coma.")
+    parser.add_argument("--interval", default="1d", choices=sorted(DEFAULT_PERIODS))
+    parser.add_argument("--period", help="Histórico a usar (por defecto según la temporalidad).")
+    parser.add_argument("--horizons", default=",".join(map(str, HORIZONS)), help="Velas hacia adelante, separadas por coma.")
+    args = parser.parse_args(argv)
+
+    if args.tickers:
+        tickers = [t.strip().upper() for t in args.tickers.split(",") if t.strip()]
+    else:
+        stock_lists, active_list = read_stock_lists(STOCKS_FILE)
+        tickers = stock_lists.get(args.list or active_list, [])
+    period = args.period or DEFAULT_PERIODS[args.interval]
+    histories = fetch_histories(tickers, period, args.interval, cache=OHLCVCache())
+    horizons = tuple(int(h) for h in args.horizons.split(","))
+    print(format_summary(backtest(histories, horizons)))
+
+
+if __name__ == "__main__":
+    main()
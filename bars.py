@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+PRICE_DTYPE = np.float64  # Con np.float32 los precios ocupan la mitad (indicadores siguen en float64)
+PRICE_COLUMNS = ("Open", "High", "Low", "Close")
+
+
+class Bars:
+    """
+    Velas OHLCV de un ticker como arrays contiguos, sin DataFrame.
+
+    Sólo guarda las columnas OHLCV (nada de Dividends/Stock Splits): precios en
+    `dtype` (float64 o float32), volumen en float64 (NaN donde falta, igual que en el
+    DataFrame: Konkorde no lo confunde con volumen 0) e índice en enteros ns UTC.
+    `bars["Close"]` devuelve el array, así que sirve donde se leía una columna.
+    """
+    __slots__ = ("index", "tz", "open", "high", "low", "close", "volume")
+
+    def __init__(self, index, tz, open_, high, low, close, volume):
+        self.index = index
+        self.tz = tz
+        self.open = open_
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    @classmethod
+    def from_frame(cls, frame, dtype=PRICE_DTYPE):
+        index = frame.index
+        tz = str(index.tz) if getattr(index, "tz", None) is not None else ""
+        utc_index = index.tz_convert("UTC") if tz else index
+        # Siempre copias: una vista al bloque 2-D del DataFrame lo mantendría vivo entero
+        prices = [
+            np.array(frame[c].to_numpy(dtype=dtype), copy=True) if c in frame.columns else np.full(len(frame), np.nan, dtype=dtype)
+            for c in PRICE_COLUMNS
+        ]
+        volume = np.array(frame["Volume"].to_numpy(dtype=np.float64), copy=True) if "Volume" in frame.columns else np.full(len(frame), np.nan)
+        return cls(pd.DatetimeIndex(utc_index).as_unit("ns").asi8, tz, *prices, volume)
+
+    def to_frame(self):
+        index = pd.to_datetime(self.index, unit="ns", utc=True)
+        index = index.tz_convert(self.tz) if self.tz else index.tz_localize(None)
+        return pd.DataFrame(
+            {"Open": self.open, "High": self.high, "Low": self.low, "Close": self.close, "Volume": self.volume},
+            index=index,
+        )
+
+    def __getitem__(self, column):
+        return getattr(self, column.lower())
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def empty(self):
+        return len(self.index) == 0
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in ("index", "open", "high", "low", "close", "volume"))
+
+
+def as_bars(histories, dtype=PRICE_DTYPE):
+    """
+    Convierte un dict ticker -> DataFrame en ticker -> Bars (los vacíos quedan como Bars vacíos).
+    """
+    return {
+        ticker: data if isinstance(data, Bars) else Bars.from_frame(data if data is not None else pd.DataFrame(), dtype)
+        for ticker, data in histories.items()
+    }
@@ -0,0 +1,40 @@
+"""
+ADX/+DI/-DI: tres llamadas a `ta` contra `directional_movement` en una pasada.
+
+La paridad con `ta` se verifica en tests/test_indicators.py.
+
+    python -m benchmarks.bench_adx --bars 1260 --repeat 50
+"""
+import argparse
+import timeit
+
+import ta.trend
+
+from benchmarks.synthetic import synthetic_ohlcv
+from indicators import directional_movement
+
+
+def ta_adx(high, low, close):
+    return (
+        ta.trend.adx(high=high, low=low, close=close, window=14),
+        ta.trend.adx_pos(high=high, low=low, close=close, window=14),
+        ta.trend.adx_neg(high=high, low=low, close=close, window=14),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bars", type=int, default=1260)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    data = synthetic_ohlcv(args.bars, 0)
+    high, low, close = data["High"], data["Low"], data["Close"]
+    before = timeit.timeit(lambda: ta_adx(high, low, close), number=args.repeat) / args.repeat
+    after = timeit.timeit(lambda: directional_movement(high, low, close, 14), number=args.repeat) / args.repeat
+    print(f"ta (adx + adx_pos + adx_neg): {before * 1000:7.2f} ms/ticker")
+    print(f"directional_movement        : {after * 1000:7.2f} ms/ticker  ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Backtest vectorizado: paridad con `check_stock` y velocidad en miles de ticker-años.
+
+Verifica que en la última vela las reglas coincidan con `evaluate_signals` y
+luego mide el backtest completo sobre un universo sintético.
+
+    python -m benchmarks.bench_backtest --tickers 500 --bars 1260
+"""
+import argparse
+import time
+
+from analysis import compute_indicators, evaluate_signals, ohlcv_arrays
+from backtest import backtest, format_summary, rule_signals
+from benchmarks.synthetic import synthetic_universe
+from panel import build_panel
+
+
+def check_parity(universe, bars):
+    # Para cada corte, la fila final del backtest debe ser lo que informa el análisis en vivo
+    for cut in (bars // 3, bars // 2, bars):
+        histories = {t: d.iloc[:cut] for t, d in universe.items()}
+        panel = build_panel(histories)
+        signals = rule_signals(panel["Close"], panel["Volume"])
+        for j, (ticker, data) in enumerate(histories.items()):
+            live = evaluate_signals(compute_indicators(*ohlcv_arrays(data)))
+            live["estrategia_compra"] = live["cruce_alcista"] and live["mf_acumulando"]
+            live["estrategia_venta"] = live["cruce_bajista"] and live["mf_distribuyendo"]
+            for name, frame in signals.items():
+                if bool(frame.iat[-1, j]) != bool(live[name]):
+                    raise SystemExit(f"{name} difiere del análisis en vivo ({ticker}, {cut} velas)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--bars", type=int, default=1260)
+    args = parser.parse_args()
+
+    check_parity(synthetic_universe(30, args.bars, seed=100), args.bars)
+    print("Paridad con evaluate_signals OK (30 tickers, 3 cortes)")
+
+    universe = synthetic_universe(args.tickers, args.bars)
+    start = time.perf_counter()
+    summary = backtest(universe)
+    elapsed = time.perf_counter() - start
+    ticker_years = args.tickers * args.bars / 252
+    print(format_summary(summary))
+    print(f"{ticker_years:.0f} ticker-años en {elapsed:.2f}s ({ticker_years / elapsed:.0f} ticker-años/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Memoria de las velas en RAM: DataFrames de yfinance vs `Bars` (float64 y float32).
+
+    python -m benchmarks.bench_memory --tickers 300 --bars 4000 --interval 1h
+
+Cada variante corre en un proceso nuevo y se mide el pico de RSS
+(`resource.getrusage().ru_maxrss`), que incluye lo que NumPy y pandas alocan
+en C: cuánto crece al armar las velas y el pico tras el análisis. También
+verifica que float32 no cambie las alertas.
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from analysis import check_stock
+from bars import as_bars
+from benchmarks.synthetic import synthetic_ohlcv
+from metadata import MetadataCache
+
+VARIANTS = {
+    "DataFrame (yfinance)": None,
+    "Bars float64": np.float64,
+    "Bars float32": np.float32,
+}
+
+
+def peak_rss():
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def yfinance_frame(data):
+    # `Ticker.history` agrega Dividends y Stock Splits, que el análisis nunca lee
+    data = data.copy()
+    data["Dividends"] = 0.0
+    data["Stock Splits"] = 0.0
+    return data
+
+
+def measure(variant, tickers, bars, interval):
+    """
+    Corre una variante en este proceso y devuelve picos de RSS, duración y alertas.
+
+    Las velas se generan de a un ticker (igual en todas las variantes), así el
+    crecimiento del pico al armarlas es lo que retiene cada representación.
+    """
+    metadata = MetadataCache(path=None, fetcher=lambda ticker: "")
+    dtype = VARIANTS[variant]
+
+    def build(seed):
+        # De a un ticker, como llegan los chunks: el DataFrame intermedio no se acumula
+        frame = yfinance_frame(synthetic_ohlcv(bars, seed, interval))
+        return frame if dtype is None else as_bars({"": frame}, dtype)[""]
+
+    # Un ticker de calentamiento: imports y cachés internos de pandas/ta no cuentan como velas
+    check_stock("WARMUP", data=build(tickers), metadata=metadata)
+    before = peak_rss()
+    histories = {f"SYN{seed:04d}": build(seed) for seed in range(tickers)}
+    built = peak_rss()
+
+    start = time.perf_counter()
+    results = [check_stock(ticker, data=data, metadata=metadata) for ticker, data in histories.items()]
+    elapsed = time.perf_counter() - start
+    return {
+        "velas": built - before,
+        "pico": peak_rss(),
+        "elapsed": elapsed,
+        "alerts": [(r.pass_count, r.alerta_compra, r.alerta_venta) for r in results],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickers", type=int, default=300)
+    parser.add_argument("--bars", type=int, default=4000)
+    parser.add_argument("--interval", default="1h")
+    parser.add_argument("--variant", choices=list(VARIANTS), help=argparse.SUPPRESS)  # Uso interno (proceso hijo)
+    args = parser.parse_args()
+
+    if args.variant:
+        print(json.dumps(measure(args.variant, args.tickers, args.bars, args.interval)))
+        return
+
+    print(f"{args.tickers} tickers x {args.bars} velas {args.interval} (pico de RSS, un proceso por variante)")
+    alerts = {}
+    for name in VARIANTS:
+        completed = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_memory", "--tickers", str(args.tickers),
+             "--bars", str(args.bars), "--interval", args.interval, "--variant", name],
+            capture_output=True, text=True, check=True,
+        )
+        record = json.loads(completed.stdout)
+        alerts[name] = [tuple(a) for a in record["alerts"]]
+        per_100 = record["velas"] * 100 / args.tickers / 2 ** 20
+        print(f"{name:<22}: {per_100:7.2f} MB/100 tickers  pico {record['pico'] / 2 ** 20:7.1f} MB  "
+              f"{record['elapsed']:5.2f}s")
+
+    reference = alerts["DataFrame (yfinance)"]
+    for name, values in alerts.items():
+        diffs = sum(a != b for a, b in zip(values, reference))
+        print(f"{name:<22}: {diffs} tickers con alertas distintas")
+
+
+if __name__ == "__main__":
+    main()
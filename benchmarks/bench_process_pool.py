@@ -0,0 +1,42 @@
+"""
+Escalado de la etapa de indicadores en el pool de procesos (1..N workers).
+
+    python -m benchmarks.bench_process_pool --tickers 300 --bars 1260
+"""
+import argparse
+import os
+import time
+
+from benchmarks.synthetic import FakeDownloader, synthetic_universe
+from metadata import MetadataCache
+from pipeline import run_pipeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickers", type=int, default=300)
+    parser.add_argument("--bars", type=int, default=1260)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    universe = synthetic_universe(args.tickers, args.bars)
+    metadata = MetadataCache(path=None, fetcher=lambda ticker: "")
+
+    def run(**kwargs):
+        start = time.perf_counter()
+        run_pipeline(list(universe), downloader=FakeDownloader(universe), metadata=metadata,
+                     min_interval=0, chunk_size=50, **kwargs)
+        return time.perf_counter() - start
+
+    baseline = run(mode="thread")
+    print(f"{args.tickers} tickers x {args.bars} velas")
+    print(f"thread (GIL)       : {baseline:6.2f}s")
+    workers = 1
+    while workers <= args.max_workers:
+        elapsed = run(mode="process", processes=workers)
+        print(f"process x{workers:<3}       : {elapsed:6.2f}s  speedup {baseline / elapsed:4.1f}x")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Tiempo de arranque de la GUI: imports (`python -X importtime`) y tiempo hasta la primera ventana.
+
+    python -m benchmarks.bench_startup --runs 5 --top 10
+
+Cada medición corre en un proceso nuevo (imports en frío respecto del intérprete).
+Sin display la parte de la ventana se omite y sólo se informan los imports.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIRST_WINDOW = """
+import time
+start = time.perf_counter()
+import app
+window = app.App()
+window.update()
+print(time.perf_counter() - start)
+start = time.perf_counter()
+window.engine.get()
+print(time.perf_counter() - start)
+window.destroy()
+"""
+
+
+def import_times(statement):
+    """
+    Corre `statement` con -X importtime y devuelve {módulo: (propio_us, acumulado_us)}.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        if own.strip().isdigit():
+            times[name.strip()] = (int(own), int(cumulative))
+    return times
+
+
+def first_window():
+    """
+    (segundos hasta la primera ventana, segundos extra hasta tener el motor cargado) o None sin display.
+    """
+    completed = subprocess.run([sys.executable, "-c", FIRST_WINDOW], cwd=ROOT, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return None
+    window, engine = completed.stdout.split()
+    return float(window), float(engine)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    statements = {
+        "app (GUI)": "import app",
+        "stack analítico": "import pipeline, yfinance",  # Lo que antes se importaba antes de la ventana
+    }
+    for label, statement in statements.items():
+        runs = [import_times(statement) for _ in range(args.runs)]
+        totals = [sum(times[name][0] for name in times) / 1e6 for times in runs]
+        print(f"{label:<16}: import {statistics.median(totals):6.3f}s (mediana de {args.runs})")
+
+    times = runs[-1]
+    print("\nMódulos más lentos del stack analítico (acumulado, última corrida):")
+    for name in sorted(times, key=lambda n: -times[n][1])[:args.top]:
+        print(f"  {name:<40} {times[name][1] / 1e3:8.1f} ms")
+
+    windows = [first_window() for _ in range(args.runs)]
+    if None in windows:
+        print("\nSin display: no se mide el tiempo hasta la primera ventana.")
+        return
+    print(f"\nPrimera ventana : {statistics.median(w for w, _ in windows):6.3f}s")
+    print(f"Motor listo     : +{statistics.median(e for _, e in windows):5.3f}s (en segundo plano)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Suite de benchmarks offline por etapa (descarga, indicadores, reglas, render) y de punta a punta
+(con y sin el primer filtro de alertas).
+
+    python -m benchmarks.bench_suite --output resultados.json
+    python -m benchmarks.bench_suite --sizes 10 100 --intervals 1d --baseline base.json
+    python -m benchmarks.bench_suite --save-baseline base.json
+
+Corre sobre universos sintéticos con semilla fija (`FakeDownloader` y `FakeTicker`
+en lugar de yfinance), así dos corridas en la misma máquina son comparables.
+Con `--baseline` marca las etapas más lentas que la referencia más allá de la
+tolerancia y termina con código 1.
+"""
+import argparse
+import functools
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from analysis import check_stock, compute_indicators, evaluate_signals, ohlcv_arrays
+from benchmarks.synthetic import BARS_PER_INTERVAL, FakeDownloader, FakeTicker, synthetic_universe
+from data import DEFAULT_PERIODS, download_history
+from metadata import MetadataCache
+from pipeline import run_pipeline
+from rendering import layout_report
+from report import build_result, render_report
+
+SIZES = (10, 100, 1000)
+INTERVALS = ("1h", "1d", "1wk")
+STAGES = ("fetch", "indicators", "rules", "rendering", "check_stock", "run_pipeline", "run_pipeline_tiered")
+TOLERANCE = 0.20  # Más lento que la referencia en más de un 20%...
+NOISE_FLOOR = 0.005  # ...y en más de 5 ms (por debajo es ruido del reloj)
+
+
+def best_of(repeat, fn):
+    """
+    Corre `fn` `repeat` veces; devuelve (mejor tiempo en segundos, último resultado).
+    """
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run_case(n_tickers, interval, repeat=3, seed=0):
+    """
+    Mide cada etapa para `n_tickers` tickers en `interval`; devuelve {etapa: segundos}.
+    """
+    universe = synthetic_universe(n_tickers, BARS_PER_INTERVAL[interval], seed, interval)
+    tickers = list(universe)
+    period = DEFAULT_PERIODS[interval]
+    downloader = FakeDownloader(universe)
+    metadata = MetadataCache(path=None, fetcher=lambda ticker: "")
+    timings = {}
+
+    # Etapas sueltas: cada una recibe lo que produjo la anterior
+    timings["fetch"], histories = best_of(repeat, lambda: download_history(
+        tickers, period, interval, downloader=downloader))
+    arrays = {ticker: ohlcv_arrays(data) for ticker, data in histories.items()}
+    timings["indicators"], indicators = best_of(repeat, lambda: {
+        ticker: compute_indicators(*values) for ticker, values in arrays.items()})
+    timings["rules"], results = best_of(repeat, lambda: [
+        build_result(ticker, evaluate_signals(values)) for ticker, values in indicators.items()])
+    timings["rendering"], _ = best_of(repeat, lambda: [layout_report(render_report(r)) for r in results])
+
+    # De punta a punta: un ticker por vez (como antes del pipeline) y el pipeline en lote
+    ticker_factory = functools.partial(FakeTicker, universe)
+    timings["check_stock"], _ = best_of(repeat, lambda: [
+        check_stock(ticker, period, interval, metadata=metadata, ticker_factory=ticker_factory) for ticker in tickers])
+    timings["run_pipeline"], _ = best_of(repeat, lambda: run_pipeline(
+        tickers, period, interval, downloader=downloader, metadata=metadata, min_interval=0))
+    # Con el primer filtro: el costo de los indicadores completos sigue a los candidatos, no al universo
+    timings["run_pipeline_tiered"], _ = best_of(repeat, lambda: run_pipeline(
+        tickers, period, interval, downloader=downloader, metadata=metadata, min_interval=0, screen="compra"))
+    return timings
+
+
+def environment():
+    return {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(records, baseline, tolerance=TOLERANCE):
+    """
+    Devuelve los registros más lentos que la referencia (misma cantidad, temporalidad y etapa).
+    """
+    reference = {(r["tickers"], r["interval"], r["stage"]): r["seconds"] for r in baseline["results"]}
+    regressions = []
+    for record in records:
+        before = reference.get((record["tickers"], record["interval"], record["stage"]))
+        if before is None:
+            continue
+        if record["seconds"] > before * (1 + tolerance) and record["seconds"] - before > NOISE_FLOOR:
+            regressions.append(dict(record, baseline=before, ratio=record["seconds"] / before))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--intervals", nargs="+", default=list(INTERVALS), choices=INTERVALS)
+    parser.add_argument("--repeat", type=int, default=3, help="Corridas por etapa (se toma la mejor).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Guarda los resultados en este JSON.")
+    parser.add_argument("--baseline", help="JSON de referencia contra el que se buscan regresiones.")
+    parser.add_argument("--save-baseline", help="Guarda los resultados como nueva referencia.")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    records = []
+    for interval in args.intervals:
+        for n_tickers in args.sizes:
+            timings = run_case(n_tickers, interval, args.repeat, args.seed)
+            print(f"{n_tickers:>5} tickers {interval:<3} ({BARS_PER_INTERVAL[interval]} velas)", file=sys.stderr)
+            for stage in STAGES:
+                seconds = timings[stage]
+                records.append({
+                    "tickers": n_tickers, "interval": interval, "bars": BARS_PER_INTERVAL[interval],
+                    "stage": stage, "seconds": seconds, "ms_per_ticker": 1000 * seconds / n_tickers,
+                })
+                print(f"    {stage:<19}: {seconds:8.3f}s  {1000 * seconds / n_tickers:7.3f} ms/ticker", file=sys.stderr)
+
+    output = {"environment": environment(), "results": records}
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(output, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare(records, baseline, args.tolerance)
+        for r in regressions:
+            print(f"REGRESIÓN {r['tickers']} tickers {r['interval']} {r['stage']}: "
+                  f"{r['baseline']:.3f}s -> {r['seconds']:.3f}s ({r['ratio']:.2f}x)", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"Sin regresiones contra {args.baseline} (tolerancia {args.tolerance:.0%}).", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
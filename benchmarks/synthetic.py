@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+from cache import period_to_timedelta
+
+BAR_FREQ = {"1h": "h", "1d": "B", "1wk": "W-MON"}
+BARS_PER_INTERVAL = {"1h": 420, "1d": 1260, "1wk": 260}  # Lo que trae el período por defecto (60d de 1h, 5y)
+
+
+def synthetic_ohlcv(n_bars=1260, seed=0, interval="1d"):
+    """
+    Genera velas OHLCV reproducibles: precio como paseo aleatorio geométrico y
+    volumen log-normal con rachas (más volumen en las velas de mayor movimiento).
+    """
+    rng = np.random.default_rng(seed)
+    volatility = rng.uniform(0.01, 0.04)
+    returns = rng.normal(0.0002, volatility, n_bars)
+    close = rng.uniform(5, 500) * np.exp(np.cumsum(returns))
+    open_ = np.concatenate(([close[0]], close[:-1])) * (1 + rng.normal(0, volatility / 4, n_bars))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, volatility / 2, n_bars)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, volatility / 2, n_bars)))
+    base_volume = rng.uniform(1e5, 5e7)
+    volume = np.round(base_volume * rng.lognormal(0, 0.4, n_bars) * (1 + 20 * np.abs(returns)))
+
+    index = pd.date_range(end="2026-10-16", periods=n_bars, freq=BAR_FREQ.get(interval, "B"))
+    return pd.DataFrame(
+        {"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume},
+        index=index,
+    )
+
+
+def synthetic_universe(n_tickers, n_bars=1260, seed=0, interval="1d"):
+    return {
+        f"SYN{i:04d}": synthetic_ohlcv(n_bars, seed + i, interval)
+        for i in range(n_tickers)
+    }
+
+
+class FakeTicker:
+    """
+    Reemplazo offline de `yf.Ticker` (sólo `history`) para un universo sintético.
+
+    Se inyecta con `functools.partial(FakeTicker, universe)` como `ticker_factory`.
+    """
+
+    def __init__(self, universe, ticker):
+        self.universe = universe
+        self.ticker = ticker
+
+    def history(self, period=None, interval="1d"):
+        data = self.universe.get(self.ticker)
+        return data.copy() if data is not None else pd.DataFrame()
+
+
+class FakeDownloader:
+    """
+    Reemplazo offline de `yf.download` para un universo sintético; cuenta los requests.
+    """
+
+    def __init__(self, universe):
+        self.universe = universe
+        self.requests = 0
+
+    def __call__(self, tickers, interval="1d", period=None, start=None):
+        self.requests += 1
+        frames = {}
+        for ticker in tickers:
+            data = self.universe.get(ticker)
+            if data is None:
+                continue
+            if start is not None:
+                data = data[data.index >= pd.Timestamp(start)]
+            elif period_to_timedelta(period) is not None and not data.empty:
+                # Como yfinance: sólo las velas dentro del período pedido
+                data = data[data.index >= data.index[-1] - period_to_timedelta(period)]
+            frames[ticker] = data
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1)
@@ -0,0 +1,190 @@
+import os
+import re
+import threading
+import time
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = "cache"
+MAX_CACHE_BYTES = 200 * 1024 * 1024  # Tope de tamaño en disco del cache
+FULL_REFRESH_AGE = timedelta(days=7)  # Re-descarga completa (ajustes por dividendos/splits)
+EVICT_AFTER = timedelta(days=30)  # Entradas sin usar se eliminan
+MIN_REFRESH = timedelta(seconds=60)  # Debajo de esto no se pide ni siquiera la vela nueva
+TMP_SUFFIX = ".tmp.npz"  # Archivo de un `store` en curso, antes del `os.replace`
+
+_PERIOD_RE = re.compile(r"^(\d+)(d|wk|mo|y)$")
+_PERIOD_UNITS = {"d": 1, "wk": 7, "mo": 31, "y": 366}
+
+
+def period_to_timedelta(period):
+    """
+    Convierte un período de yfinance ("60d", "5y", "1mo"...) a timedelta. None si es "max".
+    """
+    match = _PERIOD_RE.match(period or "")
+    if not match:
+        return None
+    return timedelta(days=int(match.group(1)) * _PERIOD_UNITS[match.group(2)])
+
+
+class CacheEntry:
+    __slots__ = ("data", "fetched_at", "full_at", "period")
+
+    def __init__(self, data, fetched_at, full_at, period=""):
+        self.data = data
+        self.fetched_at = fetched_at  # Último request (completo o incremental), epoch
+        self.full_at = full_at  # Última descarga completa, epoch
+        self.period = period  # Período de la última descarga completa ("" si no se sabe)
+
+
+class OHLCVCache:
+    """
+    Cache local de velas OHLCV, un archivo binario (.npz) por (ticker, intervalo).
+
+    Guarda el índice como enteros (ns UTC) y una columna float64 por campo, lo que
+    permite pedir a yfinance sólo las velas posteriores a la última guardada.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_CACHE_BYTES,
+                 full_refresh_age=FULL_REFRESH_AGE, evict_after=EVICT_AFTER,
+                 min_refresh=MIN_REFRESH):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.full_refresh_age = full_refresh_age
+        self.evict_after = evict_after
+        self.min_refresh = min_refresh
+        self._lock = threading.Lock()
+
+    def _path(self, ticker, interval):
+        safe = re.sub(r"[^A-Za-z0-9._-]", "_", ticker.upper())
+        return os.path.join(self.directory, f"{safe}_{interval}.npz")
+
+    def load(self, ticker, interval):
+        path = self._path(ticker, interval)
+        try:
+            with np.load(path, allow_pickle=False) as npz:
+                tz = str(npz["tz"]) or None
+                index = pd.to_datetime(npz["index"], unit="ns", utc=True)
+                index = index.tz_convert(tz) if tz else index.tz_localize(None)
+                columns = [str(c) for c in npz["columns"]]
+                data = pd.DataFrame(
+                    {c: npz[f"col_{c}"] for c in columns}, index=index
+                )
+                period = str(npz["period"]) if "period" in npz.files else ""
+                entry = CacheEntry(data, float(npz["fetched_at"]), float(npz["full_at"]), period)
+            os.utime(path)  # Marca de uso para la política LRU
+            return entry
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def store(self, ticker, interval, data, full=False, previous=None, period=""):
+        if data is None or data.empty:
+            return
+        now = time.time()
+        full_at = now if full or previous is None else previous.full_at
+        if previous is not None and not full:
+            period = previous.period
+
+        index = data.index
+        tz = str(index.tz) if getattr(index, "tz", None) is not None else ""
+        utc_index = index.tz_convert("UTC") if tz else index
+        arrays = {f"col_{c}": data[c].to_numpy(dtype=float) for c in data.columns}
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(ticker, interval)
+        tmp_path = path + TMP_SUFFIX
+        np.savez(
+            tmp_path,
+            index=utc_index.as_unit("ns").asi8,
+            tz=np.array(tz),
+            columns=np.array([str(c) for c in data.columns]),
+            fetched_at=np.array(now),
+            full_at=np.array(full_at),
+            period=np.array(period),
+            **arrays,
+        )
+        with self._lock:
+            os.replace(tmp_path, path)
+
+    def needs_full_refresh(self, entry, period):
+        """
+        Una entrada se re-descarga entera si es vieja, si su última vela cae fuera del
+        período o si se bajó con un período más corto que el pedido.
+        """
+        if entry.data.empty:
+            return True
+        if time.time() - entry.full_at > self.full_refresh_age.total_seconds():
+            return True
+        span = period_to_timedelta(period)
+        covered = period_to_timedelta(entry.period)
+        if span is not None and covered is not None and covered < span:
+            return True
+        if span is not None:
+            last = entry.data.index[-1]
+            now = pd.Timestamp.now(tz=last.tz) if last.tz is not None else pd.Timestamp.now()
+            if now - last > span:
+                return True
+        return False
+
+    def is_fresh(self, entry):
+        return time.time() - entry.fetched_at < self.min_refresh.total_seconds()
+
+    def evict(self):
+        """
+        Elimina entradas sin usar y, si el cache supera el tope, las menos usadas recientemente.
+
+        Los temporales de un `store` se escriben fuera del lock: sólo se borran si
+        vencieron (restos de un proceso cortado), nunca para hacer lugar.
+        """
+        with self._lock:
+            try:
+                names = [n for n in os.listdir(self.directory) if n.endswith((".npz", ".state"))]
+            except OSError:
+                return
+            files = []
+            for name in names:
+                path = os.path.join(self.directory, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                files.append((st.st_mtime, st.st_size, path))
+
+            now = time.time()
+            files.sort()
+            total = sum(size for _, size, _ in files)
+            for mtime, size, path in files:
+                expired = now - mtime > self.evict_after.total_seconds()
+                if not expired and (total <= self.max_bytes or path.endswith(TMP_SUFFIX)):
+                    continue
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+
+
+def merge_bars(cached, new, period=None):
+    """
+    Une las velas nuevas a las cacheadas (la vela repetida se reemplaza por la nueva).
+    """
+    if new is None or new.empty:
+        return cached
+
+    cached_tz = getattr(cached.index, "tz", None)
+    new_tz = getattr(new.index, "tz", None)
+    if cached_tz is not None and new_tz is None:
+        new = new.tz_localize(cached_tz)
+    elif cached_tz is None and new_tz is not None:
+        new = new.tz_localize(None)
+    elif cached_tz is not None:
+        new = new.tz_convert(cached_tz)
+
+    merged = pd.concat([cached, new[cached.columns.intersection(new.columns)]])
+    merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+
+    span = period_to_timedelta(period)
+    if span is not None and not merged.empty:
+        merged = merged[merged.index >= merged.index[-1] - span]
+    return merged
@@ -0,0 +1,172 @@
+import pandas as pd
+
+from cache import merge_bars, period_to_timedelta
+from instrumentation import NULL_METRICS
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+CHUNK_SIZE = 50  # Tickers por request multi-símbolo
+DEFAULT_PERIODS = {"1h": "60d", "1d": "5y", "1wk": "5y"}  # Histórico a pedir por temporalidad (1h: máximo 60 días)
+
+# Temporalidades que se derivan localmente de otra más fina (ya cacheada) en vez de descargarse
+DERIVED_INTERVALS = {"1wk": "1d"}
+OHLCV_AGGREGATION = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+
+def yf_downloader(tickers, **kwargs):
+    """
+    Descarga varios tickers en un único request de yfinance.
+    """
+    import yfinance as yf  # Import diferido: es lo más lento de cargar y sólo hace falta para la red
+
+    return yf.download(
+        tickers,
+        group_by="ticker",
+        auto_adjust=True,
+        threads=False,
+        progress=False,
+        **kwargs,
+    )
+
+
+def split_tickers(frame, tickers):
+    """
+    Separa el DataFrame multi-ticker de yfinance en un DataFrame OHLCV por ticker.
+    """
+    histories = {}
+    for ticker in tickers:
+        if frame is None or frame.empty:
+            histories[ticker] = pd.DataFrame(columns=OHLCV_COLUMNS)
+            continue
+
+        if isinstance(frame.columns, pd.MultiIndex):
+            if ticker not in frame.columns.get_level_values(0):
+                histories[ticker] = pd.DataFrame(columns=OHLCV_COLUMNS)
+                continue
+            data = frame[ticker]
+        else:
+            data = frame
+
+        # Cada ticker tiene su propio calendario: descartamos las filas vacías del resto
+        data = data[[c for c in OHLCV_COLUMNS if c in data.columns]]
+        histories[ticker] = data.dropna(how="all").copy()
+    return histories
+
+
+def download_history(tickers, period="5y", interval="1d", chunk_size=CHUNK_SIZE, downloader=None, start=None):
+    """
+    Descarga el histórico de una lista de tickers en requests multi-símbolo.
+
+    Devuelve un diccionario ticker -> DataFrame OHLCV. `downloader` permite
+    reemplazar yfinance (por ejemplo, por un falso que cuente los requests).
+    Con `start` se piden sólo las velas desde esa fecha en lugar de todo el período.
+    """
+    downloader = downloader or yf_downloader
+    tickers = list(dict.fromkeys(tickers))
+    window = {"start": start} if start is not None else {"period": period}
+
+    histories = {}
+    for i in range(0, len(tickers), chunk_size):
+        chunk = tickers[i:i + chunk_size]
+        try:
+            frame = downloader(chunk, interval=interval, **window)
+        except Exception:
+            frame = None
+        histories.update(split_tickers(frame, chunk))
+    return histories
+
+
+def resample_bars(data, rule):
+    """
+    Agrega velas OHLCV a una temporalidad mayor (Open primera, High máx, Low mín,
+    Close última, Volume suma) descartando los períodos sin operaciones.
+    """
+    if data.empty:
+        return data
+    aggregation = {c: f for c, f in OHLCV_AGGREGATION.items() if c in data.columns}
+    bars = data.resample(rule, label="left", closed="left").agg(aggregation)
+    return bars.dropna(subset=["Close"])
+
+
+def resample_weekly(daily):
+    """
+    Velas semanales como las de yfinance: semana de lunes a domingo, etiquetada con
+    el lunes (aunque sea feriado); la semana en curso queda como vela parcial.
+    """
+    return resample_bars(daily, "W-MON")
+
+
+def resample_daily(hourly):
+    """
+    Velas diarias a partir de horarias (día calendario en la zona horaria del índice).
+    Útil sólo para ventanas recientes: yfinance da como máximo ~730 días de 1h.
+    """
+    return resample_bars(hourly, "1D")
+
+
+def fetch_histories(tickers, period="5y", interval="1d", cache=None, chunk_size=CHUNK_SIZE, downloader=None,
+                    refresh=True, metrics=NULL_METRICS):
+    """
+    Igual que `download_history`, pero apoyándose en el cache OHLCV en disco.
+
+    Los tickers sin cache (o con cache vencido) se descargan completos; el resto
+    sólo pide las velas desde la última guardada y las une a lo cacheado. Con
+    `refresh=False` se usa lo cacheado tal cual, sin pedir la vela nueva. Las
+    temporalidades de DERIVED_INTERVALS se calculan desde la temporalidad base.
+    En `metrics` se cuentan los tickers al día, actualizados y descargados completos.
+    """
+    if cache is None:
+        return download_history(tickers, period, interval, chunk_size, downloader)
+
+    if interval in DERIVED_INTERVALS:
+        base = fetch_histories(tickers, period, DERIVED_INTERVALS[interval], cache, chunk_size, downloader, refresh,
+                               metrics)
+        return {ticker: resample_weekly(data) for ticker, data in base.items()}
+
+    tickers = list(dict.fromkeys(tickers))
+    histories = {}
+    full, top_up = [], {}
+    for ticker in tickers:
+        entry = cache.load(ticker, interval)
+        if entry is None or cache.needs_full_refresh(entry, period):
+            full.append(ticker)
+        elif not refresh or cache.is_fresh(entry):
+            histories[ticker] = entry.data
+        else:
+            top_up[ticker] = entry
+
+    metrics.count("cache_completo", len(full))
+    metrics.count("cache_incremental", len(top_up))
+    metrics.count("cache_al_dia", len(histories))
+
+    if full:
+        fetched = download_history(full, period, interval, chunk_size, downloader)
+        for ticker, data in fetched.items():
+            cache.store(ticker, interval, data, full=True, period=period)
+            histories[ticker] = data
+
+    if top_up:
+        # Un request por grupo de tickers que comparten la misma fecha de la última vela
+        by_start = {}
+        for ticker, entry in top_up.items():
+            start = entry.data.index[-1].strftime("%Y-%m-%d")
+            by_start.setdefault(start, []).append(ticker)
+
+        for start, group in by_start.items():
+            fetched = download_history(group, period, interval, chunk_size, downloader, start=start)
+            for ticker in group:
+                entry = top_up[ticker]
+                new = fetched.get(ticker)
+                if new is None or new.empty:
+                    histories[ticker] = entry.data
+                    continue
+                # No se recorta por debajo de lo que se bajó completo (otro análisis puede usar más historia)
+                keep = period
+                stored_span, span = period_to_timedelta(entry.period), period_to_timedelta(period)
+                if stored_span is not None and span is not None and stored_span > span:
+                    keep = entry.period
+                merged = merge_bars(entry.data, new, keep)
+                cache.store(ticker, interval, merged, previous=entry)
+                histories[ticker] = merged
+
+    cache.evict()
+    return {ticker: histories[ticker] for ticker in tickers}
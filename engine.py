@@ -0,0 +1,69 @@
+import threading
+import time
+
+
+class AnalyticsEngine:
+    """
+    Stack analítico (pandas, numpy, ta, yfinance y los caches) cargado en segundo plano.
+
+    La GUI lo crea sin importar nada pesado, así la ventana aparece enseguida.
+    `prewarm()` lanza la carga en un thread y `get()` espera a que termine:
+    se llama desde el worker del análisis, nunca desde el thread de Tk.
+    `source` son las opciones de `providers.build_provider` (por defecto, yfinance).
+    """
+
+    def __init__(self, source=None):
+        self.source = source or {}
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.error = None
+        self.load_seconds = None
+
+    def prewarm(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._load, daemon=True)
+                self._thread.start()
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def _load(self):
+        start = time.perf_counter()
+        try:
+            from cache import OHLCVCache
+            from history import QuantileStore
+            from metadata import METADATA_FILE, MetadataCache
+            from pipeline import DEFAULT_WORKERS, run_pipeline
+            from providers import build_provider
+            from streaming import StateStore
+            import yfinance  # noqa: F401  (se usa recién al descargar; se precarga acá)
+
+            self.run_pipeline = run_pipeline
+            self.max_workers = DEFAULT_WORKERS
+            self.provider = build_provider(**self.source)
+            self.clock = self.provider.clock  # Simulado en replay: el modo automático corre a `speed`x
+            directory = self.provider.cache_dir
+            # Las fuentes locales no pasan por el cache OHLCV ni por metadata.json
+            self.ohlcv_cache = OHLCVCache(directory) if self.provider.cacheable else None
+            metadata_path = METADATA_FILE if self.provider.cacheable else None
+            self.metadata_cache = MetadataCache(metadata_path, fetcher=self.provider.company_name)
+            self.state_store = StateStore(directory)  # Estado incremental de indicadores para el modo automático
+            self.quantile_store = QuantileStore(directory)  # Ventana larga de los cuantiles MACD, aparte del histórico corto
+        except Exception as e:
+            self.error = e
+        finally:
+            self.load_seconds = time.perf_counter() - start
+            self._ready.set()
+
+    def get(self):
+        """
+        Devuelve el motor ya cargado (bloquea hasta que termine la precarga).
+        """
+        self.prewarm()
+        self._ready.wait()
+        if self.error is not None:
+            raise self.error
+        return self
@@ -0,0 +1,156 @@
+"""
+Histórico mínimo por temporalidad y ventana larga de la señal MACD por separado.
+
+Los indicadores convergen con unos cientos de velas (ver `indicators.required_bars`);
+sólo los cuantiles de la señal MACD miran años atrás. Esa ventana larga se descarga
+aparte, cada `QUANTILE_TTL`, y se guarda ya calculada (un array de señal por ticker).
+"""
+import os
+import re
+import time
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from cache import CACHE_DIR, period_to_timedelta
+from data import DEFAULT_PERIODS, fetch_histories
+from indicators import (
+    EMA_TOLERANCE, QUANTILE_LOOKBACK, RULE_LOOKBACK, lookback_bars, macd, required_bars,
+)
+
+STANDARD_PERIODS = ("1mo", "3mo", "6mo", "1y", "2y", "5y", "10y")  # Períodos que acepta yfinance
+TRADING_DAY_RATIO = 0.68  # Ruedas por día calendario (fines de semana y feriados)
+BARS_PER_SESSION = {"1h": 6, "1d": 1, "1wk": 1 / 5}  # Velas por rueda (1h: 6 en BYMA, 7 en EE.UU.)
+# Cada cuánto se recalcula la ventana larga: entre medio se completa con las velas nuevas
+QUANTILE_TTL = {"1h": timedelta(days=1), "1d": timedelta(days=7), "1wk": timedelta(days=30)}
+
+
+def minimal_period(interval, period=None, tolerance=EMA_TOLERANCE):
+    """
+    Período de yfinance más corto que alcanza para `required_bars` velas (nunca más largo que `period`).
+    """
+    period = period or DEFAULT_PERIODS.get(interval, "5y")
+    limit = period_to_timedelta(period)
+    days = required_bars(tolerance) / BARS_PER_SESSION.get(interval, 1) / TRADING_DAY_RATIO
+    for candidate in STANDARD_PERIODS:
+        span = period_to_timedelta(candidate)
+        if span.days >= days:
+            return candidate if limit is None or span < limit else period
+    return period
+
+
+def tail_bars(histories, bars):
+    # Recorta cada histórico a sus últimas `bars` velas (lo que sobra no cambia los indicadores)
+    return {ticker: data.iloc[-bars:] if len(data) > bars else data for ticker, data in histories.items()}
+
+
+class QuantileBaseline:
+    __slots__ = ("values", "until", "built_at")
+
+    def __init__(self, values, until, built_at):
+        self.values = values  # Últimos QUANTILE_LOOKBACK valores de señal MACD (velas cerradas)
+        self.until = until  # Vela de la última señal incluida (ns UTC)
+        self.built_at = built_at  # epoch
+
+
+def _utc_ns(index):
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_convert("UTC")
+    return index.as_unit("ns").asi8
+
+
+class QuantileStore:
+    """
+    Ventana larga de la señal MACD por (ticker, intervalo), guardada junto al cache OHLCV.
+
+    `priors` devuelve, para cada ticker, la señal histórica y cuántas velas del
+    histórico corto son posteriores a ella; sólo para los tickers sin ventana, con
+    la ventana vencida o con un hueco se lee el histórico largo (`fetch_histories`,
+    por el cache OHLCV y en chunks de `CHUNK_SIZE`).
+    """
+
+    def __init__(self, directory=CACHE_DIR, ttl=QUANTILE_TTL, lookback=QUANTILE_LOOKBACK,
+                 tolerance=EMA_TOLERANCE):
+        self.directory = directory
+        self.ttl = ttl
+        self.lookback = lookback
+        self.tolerance = tolerance
+        self.rebuilds = 0
+
+    def _path(self, ticker, interval):
+        safe = re.sub(r"[^A-Za-z0-9._-]", "_", ticker.upper())
+        return os.path.join(self.directory, f"{safe}_{interval}.qnt.npz")
+
+    def load(self, ticker, interval):
+        try:
+            with np.load(self._path(ticker, interval), allow_pickle=False) as npz:
+                return QuantileBaseline(npz["values"], int(npz["until"]), float(npz["built_at"]))
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def save(self, ticker, interval, baseline):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(ticker, interval)
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, values=baseline.values, until=np.array(baseline.until),
+                 built_at=np.array(baseline.built_at))
+        os.replace(tmp_path, path)
+
+    def build(self, data):
+        """
+        Ventana de señal MACD a partir de un histórico largo (la última vela puede seguir abierta: no entra).
+        """
+        if data is None or len(data) < 2:
+            return None
+        _, signal = macd(pd.Series(data["Close"].to_numpy(dtype=float)), 12, 26, 9)
+        values = signal.to_numpy()[:-1]
+        values = values[~np.isnan(values)][-self.lookback:]
+        return QuantileBaseline(np.ascontiguousarray(values), int(_utc_ns(data.index)[-2]), time.time())
+
+    def new_count(self, baseline, index, interval):
+        """
+        Velas de `index` posteriores a la ventana, o None si no se puede usar (vencida o con hueco).
+        """
+        if baseline is None or len(index) == 0:
+            return None
+        ttl = self.ttl.get(interval, timedelta(days=7))
+        if time.time() - baseline.built_at > ttl.total_seconds():
+            return None
+        new = int(np.count_nonzero(_utc_ns(index) > baseline.until))
+        # Las velas nuevas tienen que caer donde la señal corta ya convergió
+        if new > len(index) - lookback_bars("MACDs_12_26_9", self.tolerance) - RULE_LOOKBACK:
+            return None
+        return new
+
+    def priors(self, histories, interval, period, downloader=None, cache=None, refresh=True):
+        """
+        {ticker: (señal histórica, velas nuevas)} para los tickers de `histories` con datos.
+
+        `cache` y `refresh` se pasan a `fetch_histories` al leer el histórico largo.
+        """
+        priors, stale = {}, []
+        for ticker, data in histories.items():
+            if data is None or len(data) == 0:
+                continue
+            baseline = self.load(ticker, interval)
+            count = self.new_count(baseline, data.index, interval)
+            if count is None:
+                stale.append(ticker)
+            else:
+                priors[ticker] = (baseline.values, count)
+
+        if stale:
+            long_histories = fetch_histories(stale, period, interval, cache=cache, downloader=downloader,
+                                             refresh=refresh)
+            for ticker in stale:
+                baseline = self.build(long_histories.get(ticker))
+                if baseline is None:
+                    continue
+                self.save(ticker, interval, baseline)
+                self.rebuilds += 1
+                count = self.new_count(baseline, histories[ticker].index, interval)
+                if count is not None:
+                    priors[ticker] = (baseline.values, count)
+        return priors
@@ -0,0 +1,289 @@
+import bisect
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+KONKORDE_WINDOW = 15  # Estándar Blai5
+QUANTILE_LOOKBACK = 1250  # Valores de señal MACD para los cuantiles "históricos" (~5 años de velas diarias)
+QUANTILE_MIN_PERIODS = 100  # Valores mínimos para que un cuantil de la señal sea representativo (backtest)
+EMA_TOLERANCE = 1e-3  # Peso máximo que puede conservar la semilla de una EMA para darla por convergida
+ADX_MIN_BARS = 2 * 14  # Velas para sembrar el ADX de 14 (TR/DM y después el DX)
+
+# Histórico que necesita cada indicador, como cadena de suavizados: ("ema", span),
+# ("wilder", ventana) o ("window", velas) para medias simples. Las EMAs nunca
+# olvidan del todo la semilla; se cuentan las velas hasta que pese menos que la tolerancia.
+INDICATOR_LOOKBACKS = {
+    "RSI_14": [("wilder", 14)],
+    "MACD_12_26_9": [("ema", 26)],
+    "MACDs_12_26_9": [("ema", 26), ("ema", 9)],
+    "ADX_14": [("wilder", 14), ("wilder", 14)],  # TR/DM suavizados y después el DX
+    "SMA_20": [("window", 20)],
+    "SMA_50": [("window", 50)],
+    "konkorde": [("ema", KONKORDE_WINDOW), ("window", KONKORDE_WINDOW)],  # PVI/NVI sólo cambian de escala
+}
+RULE_LOOKBACK = 6  # Velas que leen las reglas (cruces en las últimas 5, pendiente de la SMA 20 en la -6)
+
+
+def pvi_nvi(close, volume):
+    """
+    Calcula los índices de volumen positivo (PVI) y negativo (NVI) sin bucles.
+
+    Acepta arrays 1-D (una serie) o 2-D (velas x tickers). El PVI acumula la
+    variación de precio sólo en las velas cuyo volumen sube respecto de la
+    anterior y el NVI sólo en las que baja; ambos arrancan en 100.
+    """
+    close = np.asarray(close, dtype=float)
+    volume = np.asarray(volume, dtype=float)
+
+    prev_close = close[:-1]
+    price_change = (close[1:] - prev_close) / prev_close
+    sube = volume[1:] > volume[:-1]
+    baja = volume[1:] < volume[:-1]
+
+    # Factores multiplicativos por vela: 1 + variación donde aplica, 1 en el resto
+    pvi_factor = np.ones_like(close)
+    nvi_factor = np.ones_like(close)
+    pvi_factor[1:] = np.where(sube, 1 + price_change, 1.0)
+    nvi_factor[1:] = np.where(baja, 1 + price_change, 1.0)
+
+    # Las velas sin precio previo (inicio de la serie en un panel alineado) no acumulan
+    sin_previo = np.isnan(prev_close)
+    pvi_factor[1:][sin_previo] = 1.0
+    nvi_factor[1:][sin_previo] = 1.0
+
+    pvi = 100.0 * np.cumprod(pvi_factor, axis=0)
+    nvi = 100.0 * np.cumprod(nvi_factor, axis=0)
+
+    # Donde no hay precio no hay índice
+    sin_precio = np.isnan(close)
+    pvi[sin_precio] = np.nan
+    nvi[sin_precio] = np.nan
+    return pvi, nvi
+
+
+def konkorde(close, volume, window=KONKORDE_WINDOW):
+    """
+    Devuelve (manos_fuertes, minoristas, konkorde_signal) como arrays.
+
+    Manos Fuertes = NVI - EMA(NVI), Minoristas = PVI - EMA(PVI) y la señal es la
+    media móvil simple de Manos Fuertes, todas de `window` periodos.
+    """
+    pvi, nvi = pvi_nvi(close, volume)
+
+    manos_fuertes = _volume_oscillator(nvi, window)
+    minoristas = _volume_oscillator(pvi, window)
+    konkorde_signal = manos_fuertes.rolling(window=window).mean()
+
+    shape = np.shape(close)
+    return (
+        manos_fuertes.to_numpy().reshape(shape),
+        minoristas.to_numpy().reshape(shape),
+        konkorde_signal.to_numpy().reshape(shape),
+    )
+
+
+def minoristas(close, volume, window=KONKORDE_WINDOW):
+    """
+    Sólo la línea de Minoristas de `konkorde` (PVI - EMA(PVI)), para el primer filtro de alertas.
+    """
+    pvi, _ = pvi_nvi(close, volume)
+    return _volume_oscillator(pvi, window).to_numpy().reshape(np.shape(close))
+
+
+def _volume_oscillator(index, window):
+    # Índice menos su EMA, columna a columna (mismo cálculo para la serie de un ticker y el panel)
+    index = pd.DataFrame(index.reshape(len(index), -1))
+    return index - index.ewm(span=window).mean()
+
+
+# --- Indicadores genéricos sobre pandas (Series de un ticker o DataFrame velas x tickers) ---
+# Reproducen las fórmulas de la librería `ta`, pero operan columna a columna
+# sobre un panel completo en una sola pasada.
+
+def ema(series, span):
+    return series.ewm(span=span, min_periods=span, adjust=False).mean()
+
+
+def rsi(close, window=14):
+    """
+    RSI de Wilder (igual que `ta.momentum.rsi`).
+    """
+    diff = close.diff(1)
+    # Las velas previas al inicio de cada serie (panel alineado) no cuentan como 0
+    up_direction = diff.where(diff > 0, 0.0).where(close.notna())
+    down_direction = -diff.where(diff < 0, 0.0).where(close.notna())
+    emaup = up_direction.ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+    emadn = down_direction.ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+    relative_strength = emaup / emadn
+    return (100 - (100 / (1 + relative_strength))).mask(emadn == 0, 100.0)
+
+
+def macd(close, window_fast=12, window_slow=26, window_sign=9):
+    """
+    Devuelve (macd, macd_signal) como `ta.trend.MACD`.
+    """
+    macd_line = ema(close, window_fast) - ema(close, window_slow)
+    return macd_line, ema(macd_line, window_sign)
+
+
+def wilder_smooth(values, window):
+    """
+    Suavizado de Wilder sembrado con la media de las primeras `window` velas válidas.
+
+    Es una EMA con alpha = 1/window; la semilla se ubica por columna, así que
+    funciona igual con series de distinto largo dentro de un panel.
+    """
+    seed = values.rolling(window=window).mean()
+    valid = seed.notna()
+    first = valid & ~valid.shift(1, fill_value=False)
+    return values.where(valid).mask(first, seed).ewm(alpha=1 / window, adjust=False).mean()
+
+
+def directional_movement(high, low, close, window=14):
+    """
+    Devuelve (adx, adx_pos, adx_neg) como `ta.trend.ADXIndicator`.
+    """
+    close_shift = close.shift(1)
+    true_range = np.maximum(high, close_shift) - np.minimum(low, close_shift)
+
+    diff_up = high - high.shift(1)
+    diff_down = low.shift(1) - low
+    pos = diff_up.where((diff_up > diff_down) & (diff_up > 0), 0.0).where(diff_up.notna())
+    neg = diff_down.where((diff_down > diff_up) & (diff_down > 0), 0.0).where(diff_down.notna())
+
+    smooth_tr = wilder_smooth(true_range, window)
+    dip = (100 * wilder_smooth(pos, window) / smooth_tr).mask(smooth_tr == 0, 0.0)
+    din = (100 * wilder_smooth(neg, window) / smooth_tr).mask(smooth_tr == 0, 0.0)
+
+    di_sum = dip + din
+    directional_index = (100 * (dip - din).abs() / di_sum).mask(di_sum == 0, 0.0)
+    adx = wilder_smooth(directional_index, window)
+
+    # Como `ta`: +DI/-DI se informan desde la vela siguiente a la semilla y sus
+    # velas de calentamiento quedan en 0. El ADX queda en NaN hasta sembrarse
+    # (`ta` lo rellena con 0 y, con menos de 2 * window velas, falla)
+    seeded = smooth_tr.notna()
+    first = seeded & ~seeded.shift(1, fill_value=False)
+    return adx, dip.mask(first).fillna(0.0), din.mask(first).fillna(0.0)
+
+
+def warmup_bars(kind, param, tolerance=EMA_TOLERANCE):
+    """
+    Velas hasta que un suavizado no dependa de su arranque (más que `tolerance`).
+    """
+    if kind == "window":
+        return param
+    alpha = 2 / (param + 1) if kind == "ema" else 1 / param
+    # Después de n velas la semilla pesa (1 - alpha)^n
+    return param + math.ceil(math.log(tolerance) / math.log(1 - alpha))
+
+
+def lookback_bars(name, tolerance=EMA_TOLERANCE):
+    return sum(warmup_bars(kind, param, tolerance) for kind, param in INDICATOR_LOOKBACKS[name])
+
+
+def required_bars(tolerance=EMA_TOLERANCE):
+    """
+    Velas mínimas para que todos los indicadores converjan en las velas que leen las reglas.
+    """
+    return max(lookback_bars(name, tolerance) for name in INDICATOR_LOOKBACKS) + RULE_LOOKBACK
+
+
+# --- Cuantiles móviles (ventana de `lookback` valores válidos, independiente del histórico pedido) ---
+
+def rolling_quantile(values, q, lookback=QUANTILE_LOOKBACK, min_periods=1):
+    """
+    Cuantil `q` en cada vela sobre los últimos `lookback` valores (Series o DataFrame).
+
+    Los NaN sólo aparecen al principio (calentamiento o panel alineado), así que
+    contar la ventana en velas equivale a contarla en valores válidos. Hasta
+    juntar `min_periods` valores válidos el cuantil es NaN.
+    """
+    return values.rolling(window=lookback, min_periods=min_periods).quantile(q)
+
+
+def window_quantile(values, q, lookback=QUANTILE_LOOKBACK):
+    """
+    Cuantil `q` de los últimos `lookback` valores válidos (sólo la última vela).
+    """
+    return pd.Series(values).dropna().iloc[-lookback:].quantile(q)
+
+
+def prior_quantiles(signal, prior, new_count, lookback=QUANTILE_LOOKBACK):
+    """
+    (q10, q90) de la ventana formada por `prior` (señal MACD histórica ya calculada)
+    y las últimas `new_count` velas de `signal` (las posteriores a ese histórico).
+    """
+    new = np.asarray(signal, dtype=float)[len(signal) - new_count:] if new_count else np.empty(0)
+    window = np.concatenate([prior, new[~np.isnan(new)]])
+    return window_quantile(window, 0.10, lookback), window_quantile(window, 0.90, lookback)
+
+
+class SortedWindow:
+    """
+    Ventana de los últimos `lookback` valores mantenida ordenada, para cuantiles incrementales.
+
+    Cada `push` ubica el valor con bisect y descarta el más viejo; la búsqueda es
+    O(log w) pero insertar y borrar en la lista mueven O(w) elementos (un memmove,
+    barato para las ~1250 velas de la ventana). `quantile` interpola linealmente
+    como `Series.quantile` y, con `extra`, no copia la ventana: O(log w).
+    """
+
+    def __init__(self, lookback=QUANTILE_LOOKBACK):
+        self.lookback = lookback
+        self.order = deque()  # Valores en orden de llegada, para saber cuál sale
+        self.sorted = []
+
+    def push(self, x):
+        if math.isnan(x):
+            return
+        if len(self.order) == self.lookback:
+            oldest = self.order.popleft()
+            del self.sorted[bisect.bisect_left(self.sorted, oldest)]
+        self.order.append(x)
+        bisect.insort(self.sorted, x)
+
+    def quantile(self, q, extra=None):
+        """
+        Cuantil de la ventana; con `extra` se calcula como si ese valor se hubiera agregado.
+        """
+        values = self.sorted
+        size = len(values)
+        removed = None  # Índice del valor que saldría al agregar `extra`
+        if extra is not None and not math.isnan(extra):
+            if len(self.order) == self.lookback:
+                removed = bisect.bisect_left(values, self.order[0])
+                size -= 1
+            inserted = bisect.bisect_right(values, extra)
+            if removed is not None and values[removed] <= extra:
+                inserted -= 1
+            size += 1
+        else:
+            extra = None
+        if not size:
+            return float("nan")
+
+        def at(i):
+            # Elemento i de la ventana ordenada con `extra` agregado y el más viejo quitado
+            if extra is not None:
+                if i == inserted:
+                    return extra
+                if i > inserted:
+                    i -= 1
+            if removed is not None and i >= removed:
+                i += 1
+            return values[i]
+
+        # Interpolación lineal con la misma aritmética que numpy (y por lo tanto `Series.quantile`)
+        position = q * (size - 1)
+        low = math.floor(position)
+        high = min(low + 1, size - 1)
+        t = position - low
+        low_value, high_value = at(low), at(high)
+        diff = high_value - low_value
+        return high_value - diff * (1 - t) if t >= 0.5 else low_value + diff * t
+
+    def __len__(self):
+        return len(self.order)
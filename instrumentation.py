@@ -0,0 +1,190 @@
+import json
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+METRICS_LOG_FILE = "metrics.ndjson"  # Una línea JSON por corrida, para analizar después
+
+# Etapas que se resumen en la línea final (en este orden)
+SUMMARY_STAGES = ("descarga", "cuantiles", "filtro", "indicadores", "reglas", "incremental", "panel", "render")
+
+_NULL_STAGE = nullcontext()
+
+
+def percentile(values, q):
+    """
+    Percentil `q` (0-100) por interpolación lineal; NaN si no hay valores.
+    """
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    position = (len(values) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "ticker", "start")
+
+    def __init__(self, metrics, name, ticker):
+        self.metrics = metrics
+        self.name = name
+        self.ticker = ticker
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.record(self.name, time.perf_counter() - self.start, self.ticker)
+        return False
+
+
+class Metrics:
+    """
+    Duraciones por etapa (y por ticker) y contadores de una corrida de análisis.
+
+    Es thread-safe. Con `enabled=False`, `stage` devuelve un contexto vacío
+    compartido y `count`/`record` no hacen nada: instrumentar cuesta una llamada.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.wall = None
+        self.records = []  # (etapa, ticker o None, segundos)
+        self.counters = {}
+        self._by_ticker = {}  # {ticker: {etapa: segundos}}
+        self._lock = threading.Lock()
+
+    def stage(self, name, ticker=None):
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Timer(self, name, ticker)
+
+    def record(self, name, seconds, ticker=None):
+        if self.enabled:
+            with self._lock:
+                self._add(name, ticker, seconds)
+
+    def merge(self, records):
+        # Registros medidos en otro proceso (pool de procesos)
+        if self.enabled and records:
+            with self._lock:
+                for record in records:
+                    self._add(*record)
+
+    def _add(self, name, ticker, seconds):
+        self.records.append((name, ticker, seconds))
+        if ticker is not None:
+            stages = self._by_ticker.setdefault(ticker, {})
+            stages[name] = stages.get(name, 0.0) + seconds
+
+    def ticker_stages(self, ticker):
+        """
+        {etapa: segundos} medidos para `ticker` (vacío si la etapa no es por ticker, como el panel).
+        """
+        with self._lock:
+            return dict(self._by_ticker.get(ticker, {}))
+
+    def count(self, name, n=1):
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + n
+
+    def finish(self):
+        self.wall = time.perf_counter() - self.started
+
+    def stage_stats(self):
+        """
+        {etapa: {n, total, p50, p95, max}} en segundos.
+        """
+        with self._lock:
+            durations = {}
+            for name, _, seconds in self.records:
+                durations.setdefault(name, []).append(seconds)
+        return {
+            name: {
+                "n": len(values),
+                "total": sum(values),
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "max": max(values),
+            }
+            for name, values in durations.items()
+        }
+
+    def summary(self):
+        """
+        Línea de resumen, ej. "312 tickers en 41.2s · p95 descarga 380ms · ... · 3 errores".
+        """
+        wall = self.wall if self.wall is not None else time.perf_counter() - self.started
+        parts = [f"{self.counters.get('tickers', 0)} tickers en {wall:.1f}s"]
+        stats = self.stage_stats()
+        for name in SUMMARY_STAGES:
+            if name in stats:
+                parts.append(f"p95 {name} {stats[name]['p95'] * 1000:.0f}ms")
+        cached = self.counters.get("cache_al_dia", 0) + self.counters.get("cache_incremental", 0)
+        requested = cached + self.counters.get("cache_completo", 0)
+        if requested:
+            parts.append(f"cache {cached}/{requested}")
+        if self.counters.get("filas"):
+            parts.append(f"{self.counters['filas']} velas ({self.counters.get('bytes', 0) / 2 ** 20:.1f} MB)")
+        if self.counters.get("descartados"):
+            parts.append(f"{self.counters['descartados']} descartados por el primer filtro")
+        parts.append(f"{self.counters.get('errores', 0)} errores")
+        return " · ".join(parts)
+
+    def to_record(self, **context):
+        """
+        Registro completo de la corrida (contexto, contadores, estadísticas y duraciones por ticker).
+        """
+        with self._lock:
+            per_ticker = [
+                {"stage": name, "ticker": ticker, "seconds": round(seconds, 6)}
+                for name, ticker, seconds in self.records
+            ]
+            counters = dict(self.counters)
+        return {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            **context,
+            "wall": self.wall,
+            "counters": counters,
+            "stages": self.stage_stats(),
+            "records": per_ticker,
+        }
+
+    def write_log(self, path=METRICS_LOG_FILE, **context):
+        if not self.enabled or not path:
+            return
+        try:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(self.to_record(**context), ensure_ascii=False) + "\n")
+        except OSError:
+            pass
+
+
+NULL_METRICS = Metrics(enabled=False)
+
+
+@contextmanager
+def profiled(path=None):
+    """
+    Perfil opcional con cProfile del thread que llama; se guarda en `path` (ver con pstats o snakeviz).
+
+    En modo "thread" los indicadores corren en este thread; las descargas (pool
+    de threads) y el pool de procesos no quedan en el perfil.
+    """
+    if not path:
+        yield
+        return
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
@@ -0,0 +1,231 @@
+import json
+import os
+import time as _time
+import warnings
+from datetime import date, datetime, time, timedelta
+
+import pytz
+
+HOLIDAYS_FILE = "holidays.json"  # Feriados extra por mercado: {"US": ["2027-01-01", ...], "BA": [...]}
+AUTO_REFRESH = timedelta(minutes=10)  # Separación máxima entre corridas automáticas dentro de la sesión
+BAR_CLOSE_DELAY = timedelta(seconds=30)  # Margen tras el cierre de vela para que el proveedor la publique
+SESSION_GRACE = timedelta(minutes=5)  # Tras el cierre, la sesión cuenta como abierta para la última corrida
+BAR_LENGTH = {"1h": timedelta(hours=1), "1d": timedelta(days=1), "1wk": timedelta(weeks=1)}
+
+# Feriados de BYMA con el mercado cerrado: los puentes se decretan cada año, así que
+# no salen por regla (mantener al día; fuera de la tabla se avisa con un warning)
+BA_HOLIDAYS = [
+    "2026-01-01", "2026-02-16", "2026-02-17", "2026-03-23", "2026-03-24", "2026-04-02",
+    "2026-04-03", "2026-05-01", "2026-05-25", "2026-06-15", "2026-07-09", "2026-07-10",
+    "2026-08-17", "2026-10-12", "2026-11-23", "2026-12-07", "2026-12-08", "2026-12-25",
+    "2027-01-01", "2027-02-08", "2027-02-09", "2027-03-24", "2027-03-25", "2027-03-26",
+    "2027-04-02", "2027-05-25", "2027-06-21", "2027-07-09", "2027-08-16", "2027-10-11",
+    "2027-12-08",
+]
+
+
+def easter(year):
+    # Domingo de Pascua (calendario gregoriano, algoritmo de Meeus/Jones/Butcher)
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = divmod(b, 4)
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _nth_weekday(year, month, weekday, n):
+    # n-ésimo `weekday` (0 = lunes) del mes; n = -1 es el último
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(day):
+    # Feriado fijo en fin de semana: se pasa al viernes (sábado) o al lunes (domingo)
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def nyse_holidays(year):
+    """
+    Feriados de NYSE/NASDAQ por regla (año nuevo en sábado no se pasa al viernes anterior).
+    """
+    holidays = {
+        _nth_weekday(year, 1, 0, 3),  # Martin Luther King Jr.
+        _nth_weekday(year, 2, 0, 3),  # Presidents' Day
+        easter(year) - timedelta(days=2),  # Viernes Santo
+        _nth_weekday(year, 5, 0, -1),  # Memorial Day
+        _observed(date(year, 7, 4)),
+        _nth_weekday(year, 9, 0, 1),  # Labor Day
+        _nth_weekday(year, 11, 3, 4),  # Thanksgiving
+        _observed(date(year, 12, 25)),
+    }
+    if year >= 2022:
+        holidays.add(_observed(date(year, 6, 19)))  # Juneteenth
+    if date(year, 1, 1).weekday() != 5:
+        holidays.add(_observed(date(year, 1, 1)))
+    return holidays
+
+
+class Exchange:
+    """
+    Calendario de un mercado: zona horaria, horario de rueda y feriados.
+
+    Los feriados salen de `holiday_rule(año)` si el mercado la tiene, más los de
+    la tabla `holidays`. Sin regla, un año posterior a la tabla se trata como sin
+    feriados y se avisa (una vez por año) con un `RuntimeWarning`.
+    """
+
+    def __init__(self, code, name, timezone, open_time, close_time, holidays=(), holiday_rule=None):
+        self.code = code
+        self.name = name
+        self.tz = pytz.timezone(timezone)
+        self.open_time = open_time
+        self.close_time = close_time
+        self.holidays = {date.fromisoformat(d) for d in holidays}
+        self.holiday_rule = holiday_rule
+        self._rule_years = {}
+        self._warned_years = set()
+
+    def is_trading_day(self, day):
+        if day.weekday() >= 5 or day in self.holidays:
+            return False
+        if self.holiday_rule is not None:
+            if day.year not in self._rule_years:
+                self._rule_years[day.year] = self.holiday_rule(day.year)
+            return day not in self._rule_years[day.year]
+        if self.holidays and day.year > max(self.holidays).year and day.year not in self._warned_years:
+            self._warned_years.add(day.year)
+            warnings.warn(f"No hay feriados de {self.name} cargados para {day.year}: se toma cada día hábil "
+                          f"como rueda. Agregalos en {HOLIDAYS_FILE}.", RuntimeWarning, stacklevel=2)
+        return True
+
+    def session(self, day):
+        # (apertura, cierre) como datetimes con zona horaria
+        return (
+            self.tz.localize(datetime.combine(day, self.open_time)),
+            self.tz.localize(datetime.combine(day, self.close_time)),
+        )
+
+    def is_open(self, now, grace=timedelta(0)):
+        day = now.astimezone(self.tz).date()
+        if not self.is_trading_day(day):
+            return False
+        session_open, session_close = self.session(day)
+        return session_open <= now < session_close + grace
+
+    def next_run(self, interval, now, delay=BAR_CLOSE_DELAY):
+        """
+        Próxima corrida alineada a los cierres de vela de la sesión (ancladas a la apertura).
+
+        La grilla es de `min(vela, AUTO_REFRESH)`, así que incluye todos los cierres
+        de vela de `interval` y el cierre de la rueda; nunca se corre con el mercado cerrado.
+        """
+        step = min(BAR_LENGTH.get(interval, AUTO_REFRESH), AUTO_REFRESH)
+        day = now.astimezone(self.tz).date()
+        for offset in range(15):
+            current = day + timedelta(days=offset)
+            if not self.is_trading_day(current):
+                continue
+            session_open, session_close = self.session(current)
+            if now < session_open + step + delay:
+                return session_open + step + delay
+            if now < session_close + delay:
+                bars = (now - delay - session_open) // step + 1
+                return min(session_open + bars * step, session_close) + delay
+        return now + timedelta(days=1)
+
+
+EXCHANGES = {
+    "US": Exchange("US", "NYSE/NASDAQ", "America/New_York", time(9, 30), time(16, 0), holiday_rule=nyse_holidays),
+    "BA": Exchange("BA", "BYMA", "America/Argentina/Buenos_Aires", time(11, 0), time(17, 0), BA_HOLIDAYS),
+}
+SUFFIX_EXCHANGES = {".BA": "BA"}  # Sufijo de Yahoo -> mercado; sin sufijo se asume EE.UU.
+DEFAULT_EXCHANGE = "US"
+
+
+def load_holidays(path=HOLIDAYS_FILE):
+    """
+    Suma los feriados de `holidays.json` (si existe) a los calendarios.
+    """
+    if not os.path.exists(path):
+        return
+    try:
+        with open(path, 'r') as f:
+            extra = json.load(f)
+    except (OSError, ValueError):
+        return
+    for code, days in extra.items():
+        if code in EXCHANGES:
+            EXCHANGES[code].holidays.update(date.fromisoformat(d) for d in days)
+
+
+def exchange_for(ticker):
+    for suffix, code in SUFFIX_EXCHANGES.items():
+        if ticker.upper().endswith(suffix):
+            return EXCHANGES[code]
+    return EXCHANGES[DEFAULT_EXCHANGE]
+
+
+def open_tickers(tickers, now=None, grace=SESSION_GRACE):
+    """
+    Filtra los tickers cuyo mercado está en rueda (o acaba de cerrar hace menos de `grace`).
+    """
+    now = now or datetime.now(pytz.utc)
+    return [t for t in tickers if exchange_for(t).is_open(now, grace)]
+
+
+class SystemClock:
+    """
+    Reloj real (UTC); el modo automático espera con `wait` para poder cortarse al instante.
+    """
+
+    def now(self):
+        return datetime.now(pytz.utc)
+
+    def wait(self, event, seconds):
+        return event.wait(max(0.0, seconds))
+
+    def sleep(self, seconds):
+        _time.sleep(max(0.0, seconds))
+
+
+class SimulatedClock(SystemClock):
+    """
+    Reloj que arranca en `start` y avanza `speed` veces más rápido que el real (para replays).
+    """
+
+    def __init__(self, start, speed=1.0):
+        self.start = start if start.tzinfo is not None else pytz.utc.localize(start)
+        self.speed = speed
+        self._real_start = _time.monotonic()
+
+    def now(self):
+        return self.start + timedelta(seconds=(_time.monotonic() - self._real_start) * self.speed)
+
+    def wait(self, event, seconds):
+        return event.wait(max(0.0, seconds) / self.speed)
+
+    def sleep(self, seconds):
+        _time.sleep(max(0.0, seconds) / self.speed)
+
+
+def next_run_time(tickers, interval, now=None):
+    """
+    Próximo cierre de vela entre los mercados de los tickers.
+    """
+    now = now or datetime.now(pytz.utc)
+    exchanges = {exchange_for(t).code: exchange_for(t) for t in tickers} or {DEFAULT_EXCHANGE: EXCHANGES[DEFAULT_EXCHANGE]}
+    return min(exchange.next_run(interval, now) for exchange in exchanges.values())
+
+
+load_holidays()
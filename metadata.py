@@ -0,0 +1,130 @@
+import json
+import os
+import threading
+import time
+from datetime import timedelta
+
+METADATA_FILE = "metadata.json"  # Se guarda junto a stocks.json
+METADATA_TTL = timedelta(days=30)  # Los nombres de empresa casi nunca cambian
+
+
+def yf_company_name(ticker):
+    """
+    Pide a yfinance el nombre largo de la empresa (request pesado de metadatos).
+    """
+    import yfinance as yf  # Import diferido: sólo se carga si hay que ir a la red
+
+    return yf.Ticker(ticker).info.get("longName", "") or ""
+
+
+class MetadataCache:
+    """
+    Cache persistente de nombres de empresa con TTL largo.
+
+    `get_name` nunca bloquea: si el nombre no está (o venció) devuelve lo que haya
+    y lo encola para buscarlo en segundo plano. Con `path=None` no se persiste.
+    """
+
+    def __init__(self, path=METADATA_FILE, ttl=METADATA_TTL, fetcher=None):
+        self.path = path
+        self.ttl = ttl
+        self.fetcher = fetcher or yf_company_name
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._pending = []
+        self._lock = threading.Lock()
+        self._worker = None
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def _save(self):
+        if not self.path:
+            return
+        with self._lock:
+            snapshot = dict(self._entries)
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+    def _is_valid(self, entry):
+        return entry is not None and time.time() - entry.get("fetched_at", 0) < self.ttl.total_seconds()
+
+    def get_name(self, ticker):
+        ticker = ticker.upper()
+        with self._lock:
+            entry = self._entries.get(ticker)
+            if self._is_valid(entry):
+                self.hits += 1
+                return entry.get("longName", "")
+            self.misses += 1
+        self.prefetch([ticker])
+        # Un nombre vencido sigue siendo mejor que nada mientras se actualiza
+        return entry.get("longName", "") if entry else ""
+
+    def prefetch(self, tickers):
+        """
+        Encola en segundo plano los tickers cuyo nombre falta o venció.
+        """
+        with self._lock:
+            for ticker in tickers:
+                ticker = ticker.upper()
+                if not self._is_valid(self._entries.get(ticker)) and ticker not in self._pending:
+                    self._pending.append(ticker)
+            if not self._pending or (self._worker and self._worker.is_alive()):
+                return
+            self._worker = threading.Thread(target=self._fetch_pending, daemon=True)
+            self._worker.start()
+
+    def _fetch_pending(self):
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._worker = None
+                    break
+                ticker = self._pending[0]
+            try:
+                name = self.fetcher(ticker)
+            except Exception:
+                name = None
+            with self._lock:
+                self._pending.remove(ticker)
+                if name is not None:
+                    self._entries[ticker] = {"longName": name, "fetched_at": time.time()}
+        self._save()
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats_text(self):
+        return f"Metadatos: {self.hits} en cache, {self.misses} pendientes"
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def default_metadata_cache():
+    """
+    Cache compartido, creado recién en el primer uso (lo piden varios threads de análisis a la vez).
+    """
+    global _default_cache
+    if _default_cache is None:
+        with _default_lock:
+            if _default_cache is None:
+                _default_cache = MetadataCache()
+    return _default_cache
@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+
+from analysis import analyze_arrays, no_data_report, ohlcv_arrays
+from indicators import ADX_MIN_BARS, QUANTILE_LOOKBACK, directional_movement, konkorde, macd, prior_quantiles, rsi
+from metadata import default_metadata_cache
+from report import build_result
+
+MIN_PANEL_BARS = ADX_MIN_BARS  # Con menos velas el ADX no llega a sembrarse: se analiza por ticker
+
+
+def build_panel(histories):
+    """
+    Arma un panel ancho (velas x tickers) por campo OHLCV, alineado a la derecha.
+
+    La fila i es la i-ésima vela contando desde el final de cada ticker, no una
+    fecha: así tickers de mercados con feriados distintos no dejan huecos en el
+    medio y la última fila es siempre la última vela de cada uno.
+    """
+    tickers = list(histories)
+    length = max((len(histories[t]) for t in tickers), default=0)
+    panel = {}
+    for field in ("High", "Low", "Close", "Volume"):
+        values = np.full((length, len(tickers)), np.nan)
+        for j, ticker in enumerate(tickers):
+            column = np.asarray(histories[ticker][field], dtype=float)
+            values[length - len(column):, j] = column
+        panel[field] = pd.DataFrame(values, columns=tickers)
+    return panel
+
+
+def compute_panel_indicators(panel):
+    """
+    Calcula RSI, MACD, ADX/+DI/-DI, SMA 20/50 y Konkorde para todo el panel a la vez.
+    """
+    high, low, close, volume = panel["High"], panel["Low"], panel["Close"], panel["Volume"]
+    indicators = {"Close": close}
+    indicators["RSI_14"] = rsi(close, window=14)
+    indicators["MACD_12_26_9"], indicators["MACDs_12_26_9"] = macd(close, 12, 26, 9)
+    indicators["ADX_14"], indicators["ADX_POS_14"], indicators["ADX_NEG_14"] = directional_movement(
+        high, low, close, window=14
+    )
+    indicators["SMA_20"] = close.rolling(window=20).mean()
+    indicators["SMA_50"] = close.rolling(window=50).mean()
+
+    manos_fuertes, minoristas, konkorde_signal = konkorde(close.to_numpy(), volume.to_numpy())
+    indicators["manos_fuertes"] = pd.DataFrame(manos_fuertes, columns=close.columns)
+    indicators["minoristas"] = pd.DataFrame(minoristas, columns=close.columns)
+    indicators["konkorde_signal"] = pd.DataFrame(konkorde_signal, columns=close.columns)
+    return indicators
+
+
+def evaluate_panel(indicators, quantile_lookback=QUANTILE_LOOKBACK):
+    """
+    Evalúa las reglas de alerta columna a columna (mismas reglas que `evaluate_signals`).
+
+    Devuelve un dict de arrays de largo = cantidad de tickers.
+    """
+    last = {name: frame.to_numpy()[-1] for name, frame in indicators.items()}
+    signals = {"price": last["Close"]}
+
+    # Paso 1: RSI
+    signals["rsi"] = last["RSI_14"]
+    signals["rsi_sobrecompra"] = last["RSI_14"] > 70
+    signals["rsi_sobreventa"] = last["RSI_14"] < 30
+
+    # Paso 2: MACD - cruces en las últimas 4 velas, gana el más reciente
+    macd_tail = indicators["MACD_12_26_9"].to_numpy()[-5:]
+    signal_tail = indicators["MACDs_12_26_9"].to_numpy()[-5:]
+    curr_macd, prev_macd = macd_tail[:0:-1], macd_tail[-2::-1]  # velas -1..-4 y -2..-5
+    curr_signal, prev_signal = signal_tail[:0:-1], signal_tail[-2::-1]
+    alcista = (prev_macd < prev_signal) & (curr_macd > curr_signal)
+    bajista = (prev_macd > prev_signal) & (curr_macd < curr_signal)
+    any_cross = alcista | bajista
+    first = any_cross.argmax(axis=0)
+    has_cross = any_cross.any(axis=0)
+    columns = np.arange(any_cross.shape[1])
+    signals["cruce_alcista"] = has_cross & alcista[first, columns]
+    signals["cruce_bajista"] = has_cross & bajista[first, columns]
+    signals["dias_desde_cruce"] = np.where(has_cross, first, 0)
+
+    last_macdsignal = last["MACDs_12_26_9"]
+    signals["macd_signal"] = last_macdsignal
+
+    # Cuantiles de la señal MACD en la ventana móvil (NaN excluidos por columna; sólo están al principio)
+    signal_window = indicators["MACDs_12_26_9"].iloc[-quantile_lookback:]
+    quantile_10 = signal_window.quantile(0.10).to_numpy()
+    quantile_90 = signal_window.quantile(0.90).to_numpy()
+    signals["quantile_10"] = quantile_10
+    signals["quantile_90"] = quantile_90
+    signals["signal_minimo"] = last_macdsignal <= quantile_10
+    signals["signal_maximo"] = last_macdsignal >= quantile_90
+
+    # Paso 3: ADX
+    adx_val, adx_pos, adx_neg = last["ADX_14"], last["ADX_POS_14"], last["ADX_NEG_14"]
+    signals["adx"] = adx_val
+    signals["adx_fuerte"] = adx_val > 23
+    signals["tendencia"] = np.select(
+        [(adx_pos > adx_neg) & (adx_val > 20), (adx_neg > adx_pos) & (adx_val > 20)],
+        ["Alcista", "Bajista"],
+        default="Indefinida",
+    )
+
+    # Canal de Tendencia (SMA 20/50)
+    sma20 = indicators["SMA_20"].to_numpy()
+    slope_sma20 = (sma20[-1] - sma20[-6]) / sma20[-6]
+    last_close, last_sma50 = last["Close"], last["SMA_50"]
+    signals["canal"] = np.select(
+        [(last_close > last_sma50) & (slope_sma20 > 0.001), (last_close < last_sma50) & (slope_sma20 < -0.001)],
+        ["ALCISTA", "BAJISTA"],
+        default="LATERAL",
+    )
+
+    # Paso 4: Konkorde
+    minoristas = indicators["minoristas"].to_numpy()
+    signals["minorista_cruce_cero"] = (minoristas[-2] < 0) & (minoristas[-1] > 0)
+    manos_fuertes = indicators["manos_fuertes"].to_numpy()
+    signals["mf_acumulando"] = manos_fuertes[-1] > 0
+    signals["mf_distribuyendo"] = manos_fuertes[-1] < 0
+    signals["mf_aumentando"] = manos_fuertes[-1] > manos_fuertes[-2]
+    return signals
+
+
+def analyze_panel(histories, metadata=None, quantile_priors=None):
+    """
+    Analiza todos los tickers en una única pasada numérica sobre el panel.
+
+    Devuelve los mismos `StockResult` que `check_stock`. `quantile_priors`
+    ({ticker: (señal histórica, velas nuevas)}) reemplaza los cuantiles de la
+    ventana del panel cuando los históricos son sólo las últimas velas.
+    """
+    metadata = metadata or default_metadata_cache()
+    quantile_priors = quantile_priors or {}
+    reports = {}
+    panel_histories = {}
+    for ticker, data in histories.items():
+        if data is None or data.empty:
+            reports[ticker] = no_data_report(ticker)
+        elif len(data) < MIN_PANEL_BARS:
+            reports[ticker] = analyze_arrays(ticker, *ohlcv_arrays(data), company_name=metadata.get_name(ticker),
+                                             quantile_prior=quantile_priors.get(ticker))
+        else:
+            panel_histories[ticker] = data
+
+    if panel_histories:
+        indicators = compute_panel_indicators(build_panel(panel_histories))
+        signals = evaluate_panel(indicators)
+        macd_signal = indicators["MACDs_12_26_9"].to_numpy()
+        for j, ticker in enumerate(panel_histories):
+            ticker_signals = {name: values[j].item() for name, values in signals.items()}
+            if ticker in quantile_priors:
+                quantile_10, quantile_90 = prior_quantiles(macd_signal[:, j], *quantile_priors[ticker])
+                ticker_signals.update(
+                    quantile_10=quantile_10,
+                    quantile_90=quantile_90,
+                    signal_minimo=ticker_signals["macd_signal"] <= quantile_10,
+                    signal_maximo=ticker_signals["macd_signal"] >= quantile_90,
+                )
+            reports[ticker] = build_result(ticker, ticker_signals, metadata.get_name(ticker))
+
+    return [reports[ticker] for ticker in histories]
@@ -0,0 +1,200 @@
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from analysis import analyze_arrays, check_stock, no_data_report, ohlcv_arrays
+from bars import PRICE_DTYPE, Bars, as_bars
+from data import fetch_histories, yf_downloader
+from history import minimal_period, tail_bars
+from indicators import required_bars
+from instrumentation import NULL_METRICS, Metrics
+from metadata import default_metadata_cache
+from panel import analyze_panel
+from streaming import analyze_incremental
+
+DEFAULT_WORKERS = 4  # Descargas simultáneas
+PIPELINE_CHUNK = 10  # Tickers por request: chico para que el primer resultado llegue rápido
+MIN_REQUEST_INTERVAL = 0.2  # Segundos mínimos entre requests a yfinance
+PROCESS_CHUNK = 16  # Tickers por tarea enviada al pool de procesos
+
+
+class RateLimiter:
+    """
+    Garantiza un intervalo mínimo entre llamadas, compartido por todos los threads.
+    """
+
+    def __init__(self, min_interval=MIN_REQUEST_INTERVAL):
+        self.min_interval = min_interval
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def wrap(self, func):
+        def limited(*args, **kwargs):
+            self.wait()
+            return func(*args, **kwargs)
+        return limited
+
+
+def _analyze_chunk(items, timed=False, screen=None):
+    # Tarea del pool de procesos: cada item es (ticker, high, low, close, volume, company_name, quantile_prior).
+    # Las duraciones se miden acá y viajan de vuelta con los resultados
+    metrics = Metrics(enabled=timed)
+    results = [analyze_arrays(*item[:6], metrics=metrics, quantile_prior=item[6], screen=screen) for item in items]
+    return results, metrics.records
+
+
+def _memory_bytes(data):
+    return data.nbytes if isinstance(data, Bars) else int(data.memory_usage(index=True).sum())
+
+
+def run_pipeline(tickers, period="5y", interval="1d", on_result=None, max_workers=DEFAULT_WORKERS,
+                 chunk_size=PIPELINE_CHUNK, min_interval=MIN_REQUEST_INTERVAL, cache=None,
+                 metadata=None, downloader=None, mode="thread", processes=None, state_store=None,
+                 refresh=True, cancel=None, price_dtype=PRICE_DTYPE, metrics=NULL_METRICS, quantile_store=None,
+                 screen=None):
+    """
+    Analiza una lista de tickers en etapas y devuelve todos los `StockResult`.
+
+    1. Descarga: un pool de threads baja los tickers en chunks (con rate limiting).
+    2. Indicadores: cada chunk descargado se analiza apenas llega. Con
+       mode="process" esta etapa corre en un ProcessPoolExecutor (`processes`
+       procesos, todos los núcleos por defecto) recibiendo sólo arrays OHLCV.
+       Con mode="panel" cada chunk se calcula como un único panel velas x tickers.
+       Con `state_store` los indicadores se actualizan de forma incremental,
+       procesando sólo las velas nuevas desde el ciclo anterior.
+    3. Resultados: `on_result(result)` se llama por cada ticker terminado, sin
+       esperar al resto de la lista.
+
+    Con `refresh=False` los tickers ya cacheados se analizan sin tocar la red.
+    Si se pasa `cancel` (threading.Event) y se activa, no se descargan más chunks,
+    se corta el análisis en el próximo ticker y se devuelven los resultados parciales.
+    Lo descargado se pasa a `Bars` compactos (precios en `price_dtype`) apenas
+    llega, salvo en modo incremental, que necesita el DataFrame con fechas.
+    En `metrics` (`instrumentation.Metrics`) quedan las duraciones por etapa y los
+    contadores de la corrida (velas, bytes, cache y errores).
+
+    Con `quantile_store` (`history.QuantileStore`) se descarga sólo el histórico
+    que necesitan los indicadores (`history.minimal_period`) y la ventana larga
+    de los cuantiles MACD (`period`) sale del store, que la renueva cada tanto.
+
+    Con `screen` ('compra', 'venta' o 'todas') cada ticker pasa primero por
+    `analysis.screen_arrays` y sólo los candidatos se analizan completos (con
+    nombre de empresa); los descartados no se emiten ni se devuelven. No aplica
+    al modo incremental (necesita todos los tickers para ver qué alertas
+    terminaron) ni al panel, que ya evalúa la lista entera en una pasada.
+    """
+    fetch_period = minimal_period(interval, period, quantile_store.tolerance) if quantile_store else period
+    split = fetch_period != period
+    tickers = list(dict.fromkeys(t for t in tickers if t))
+    metadata = metadata or default_metadata_cache()
+    limited_downloader = RateLimiter(min_interval).wrap(downloader or yf_downloader)
+
+    def cancelled():
+        return cancel is not None and cancel.is_set()
+
+    def fetch(chunk):
+        if cancelled():
+            return {}, {}
+        with metrics.stage("descarga"):
+            histories = fetch_histories(chunk, fetch_period, interval, cache=cache, chunk_size=len(chunk),
+                                        downloader=limited_downloader, refresh=refresh, metrics=metrics)
+        priors = {}
+        if split:
+            histories = tail_bars(histories, required_bars(quantile_store.tolerance))
+            with metrics.stage("cuantiles"):
+                priors = quantile_store.priors(histories, interval, period, limited_downloader, cache, refresh)
+        if state_store is None:
+            histories = as_bars(histories, price_dtype)
+        if metrics.enabled:
+            metrics.count("filas", sum(len(data) for data in histories.values()))
+            metrics.count("bytes", sum(_memory_bytes(data) for data in histories.values()))
+        return histories, priors
+
+    results = []
+
+    def emit(result):
+        if cancelled():
+            return
+        metrics.count("tickers")
+        if result is None:
+            metrics.count("descartados")  # Sin alertas del tipo buscado según el primer filtro
+            return
+        results.append(result)
+        if result.error:
+            metrics.count("errores")
+        if on_result:
+            on_result(result)
+
+    chunks = [tickers[i:i + chunk_size] for i in range(0, len(tickers), chunk_size)]
+    compute_pool = ProcessPoolExecutor(max_workers=processes or os.cpu_count()) if mode == "process" else None
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            fetches = {pool.submit(fetch, chunk) for chunk in chunks}
+            computes = set()
+            while fetches or computes:
+                if cancelled():
+                    for future in fetches | computes:
+                        future.cancel()
+                    break
+                done, _ = wait(fetches | computes, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in computes:
+                        computes.discard(future)
+                        chunk_results, records = future.result()
+                        metrics.merge(records)
+                        for result in chunk_results:
+                            if screen is not None and result is not None and not result.error:
+                                result.company_name = metadata.get_name(result.ticker)
+                            emit(result)
+                        continue
+
+                    fetches.discard(future)
+                    histories, priors = future.result()
+                    if mode == "panel":
+                        with metrics.stage("panel"):
+                            panel_results = analyze_panel(histories, metadata, priors)
+                        for result in panel_results:
+                            emit(result)
+                        continue
+                    if state_store is not None:
+                        for ticker, data in histories.items():
+                            if cancelled():
+                                break
+                            with metrics.stage("incremental", ticker):
+                                result = analyze_incremental(ticker, interval, data, state_store, metadata.get_name(ticker),
+                                                             priors.get(ticker))
+                            emit(result)
+                        continue
+                    if compute_pool is None:
+                        for ticker, data in histories.items():
+                            if cancelled():
+                                break
+                            emit(check_stock(ticker, period, interval, data=data, metadata=metadata, metrics=metrics,
+                                             quantile_prior=priors.get(ticker), screen=screen))
+                        continue
+
+                    items = []
+                    for ticker, data in histories.items():
+                        if data is None or data.empty:
+                            emit(no_data_report(ticker))
+                        else:
+                            # Con `screen` el nombre se busca al volver, sólo para los candidatos
+                            company_name = metadata.get_name(ticker) if screen is None else ""
+                            items.append((ticker, *ohlcv_arrays(data), company_name, priors.get(ticker)))
+                    for i in range(0, len(items), PROCESS_CHUNK):
+                        computes.add(compute_pool.submit(_analyze_chunk, items[i:i + PROCESS_CHUNK], metrics.enabled,
+                                                         screen))
+    finally:
+        if compute_pool is not None:
+            compute_pool.shutdown(cancel_futures=True)
+    metrics.finish()
+    return results
@@ -0,0 +1,243 @@
+"""
+Fuentes de velas intercambiables: yfinance, un directorio local (CSV/Parquet) y replay.
+
+Un proveedor es un `downloader` como los que ya aceptan `download_history` y
+`run_pipeline`: `provider(tickers, interval=..., period=..., start=...)` devuelve
+un DataFrame multi-ticker con el formato de `yf.download(group_by="ticker")`.
+"""
+import os
+import re
+from abc import ABC, abstractmethod
+
+import pandas as pd
+
+from cache import CACHE_DIR, period_to_timedelta
+from data import DEFAULT_PERIODS, DERIVED_INTERVALS, OHLCV_COLUMNS, download_history, resample_weekly, yf_downloader
+from indicators import required_bars
+from markets import SimulatedClock, SystemClock
+from metadata import yf_company_name
+
+LOCAL_CACHE_DIR = os.path.join(CACHE_DIR, "local")  # Estado de fuentes locales, aparte del de Yahoo
+
+
+def _window(data, period=None, start=None, now=None):
+    # Velas dentro de la ventana pedida (`start` o `period` hacia atrás desde `now`/la última vela)
+    if data.empty:
+        return data
+    index = data.index
+    if start is not None:
+        start = pd.Timestamp(start)
+        if index.tz is not None and start.tz is None:
+            start = start.tz_localize(index.tz)
+        return data[index >= start]
+    span = period_to_timedelta(period)
+    if span is None:
+        return data
+    end = pd.Timestamp(now) if now is not None else index[-1]
+    return data[index >= end - span]
+
+
+class BarProvider(ABC):
+    """
+    Interfaz de una fuente de velas OHLCV.
+
+    Las subclases implementan `history(ticker, interval, period, start)`; el pedido
+    multi-ticker (`__call__`) y el adaptador para `check_stock` (`ticker`) salen de ahí.
+    `cacheable` indica si conviene el cache OHLCV en disco (sólo para fuentes remotas)
+    y `cache_dir` dónde guardar el estado derivado (cuantiles, estado incremental).
+    """
+
+    cacheable = False
+    cache_dir = LOCAL_CACHE_DIR
+
+    def __init__(self):
+        self.clock = SystemClock()
+
+    @abstractmethod
+    def history(self, ticker, interval="1d", period=None, start=None):
+        """
+        Velas de un ticker (DataFrame con `OHLCV_COLUMNS`), o None/vacío si no hay.
+        """
+
+    def __call__(self, tickers, interval="1d", period=None, start=None):
+        frames = {}
+        for ticker in tickers:
+            data = self.history(ticker, interval, period, start)
+            if data is not None and not data.empty:
+                frames[ticker] = data
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1)
+
+    def ticker(self, symbol):
+        # Reemplazo de `yf.Ticker` para `check_stock(ticker_factory=provider.ticker)`
+        return _ProviderTicker(self, symbol)
+
+    def company_name(self, ticker):
+        return ""
+
+
+class _ProviderTicker:
+    def __init__(self, provider, symbol):
+        self.provider = provider
+        self.symbol = symbol
+
+    def history(self, period=None, interval="1d"):
+        return self.provider.history(self.symbol, interval, period)
+
+
+class YFinanceProvider(BarProvider):
+    """
+    Yahoo Finance (requests multi-símbolo); es la fuente por defecto.
+    """
+
+    cacheable = True
+    cache_dir = CACHE_DIR
+
+    def __call__(self, tickers, interval="1d", period=None, start=None):
+        window = {"start": start} if start is not None else {"period": period}
+        return yf_downloader(tickers, interval=interval, **window)
+
+    def history(self, ticker, interval="1d", period=None, start=None):
+        frame = self([ticker], interval, period, start)
+        if isinstance(frame.columns, pd.MultiIndex):
+            frame = frame[ticker] if ticker in frame.columns.get_level_values(0) else pd.DataFrame()
+        return frame.dropna(how="all")
+
+    def company_name(self, ticker):
+        return yf_company_name(ticker)
+
+
+def history_path(directory, ticker, interval, ext=".csv"):
+    safe = re.sub(r"[^A-Za-z0-9._-]", "_", ticker.upper())
+    return os.path.join(directory, f"{safe}_{interval}{ext}")
+
+
+def save_history(directory, ticker, interval, data):
+    """
+    Guarda las velas de un ticker como CSV (índice en UTC), el formato que lee `DirectoryProvider`.
+    """
+    os.makedirs(directory, exist_ok=True)
+    data = data[[c for c in OHLCV_COLUMNS if c in data.columns]]
+    index = data.index
+    if getattr(index, "tz", None) is not None:
+        data = data.set_axis(index.tz_convert("UTC"))
+    data.rename_axis("Datetime").to_csv(history_path(directory, ticker, interval))
+
+
+class DirectoryProvider(BarProvider):
+    """
+    Velas desde archivos locales `TICKER_intervalo.csv` (o `.parquet`, que requiere pyarrow).
+
+    Cada archivo se lee una sola vez y queda en memoria. Las temporalidades de
+    `DERIVED_INTERVALS` sin archivo propio se arman desde la base (1wk desde 1d),
+    como hace el cache OHLCV con yfinance.
+    """
+
+    def __init__(self, directory):
+        super().__init__()
+        self.directory = directory
+        self._files = {}
+        self._derived = {}
+
+    def load(self, ticker, interval):
+        data = self.read(ticker, interval)
+        if data.empty and interval in DERIVED_INTERVALS:
+            key = (ticker.upper(), interval)
+            if key not in self._derived:
+                self._derived[key] = resample_weekly(self.read(ticker, DERIVED_INTERVALS[interval]))
+            return self._derived[key]
+        return data
+
+    def read(self, ticker, interval):
+        # Sólo el archivo de esa temporalidad (vacío si no hay)
+        key = (ticker.upper(), interval)
+        if key not in self._files:
+            data = pd.DataFrame(columns=OHLCV_COLUMNS)
+            parquet = history_path(self.directory, ticker, interval, ".parquet")
+            csv = history_path(self.directory, ticker, interval)
+            if os.path.exists(parquet):
+                data = pd.read_parquet(parquet)
+            elif os.path.exists(csv):
+                data = pd.read_csv(csv, index_col=0)
+            if not data.empty:
+                index = pd.to_datetime(data.index, utc=True)
+                data = data.set_axis(index).sort_index()
+            self._files[key] = data
+        return self._files[key]
+
+    def history(self, ticker, interval="1d", period=None, start=None):
+        return _window(self.load(ticker, interval), period, start)
+
+    def tickers(self, interval):
+        # Tickers con archivo para la temporalidad (o para su base, si se deriva)
+        intervals = [interval] + ([DERIVED_INTERVALS[interval]] if interval in DERIVED_INTERVALS else [])
+        suffixes = tuple(f"_{name}{ext}" for name in intervals for ext in (".csv", ".parquet"))
+        return sorted({
+            name.rsplit("_", 1)[0]
+            for name in os.listdir(self.directory)
+            if name.endswith(suffixes)
+        })
+
+
+class ReplayProvider(BarProvider):
+    """
+    Repite una sesión grabada vela por vela sobre un reloj simulado (`speed` veces el tiempo real).
+
+    Sólo entregan las velas ya abiertas según `clock.now()`; la última se ve
+    con sus valores finales (la grabación no tiene los intermedios). Por defecto
+    arranca en la primera vela con historia suficiente para los indicadores.
+    """
+
+    def __init__(self, source, interval="1d", start=None, speed=1.0):
+        super().__init__()
+        self.source = source
+        if start is None:
+            start = self.default_start(interval)
+        self.clock = SimulatedClock(pd.Timestamp(start).to_pydatetime(), speed)
+
+    def default_start(self, interval):
+        starts = [
+            data.index[min(required_bars(), len(data) - 1)]
+            for data in (self.source.load(t, interval) for t in self.source.tickers(interval))
+            if not data.empty
+        ]
+        if not starts:
+            raise ValueError(f"No hay velas {interval} grabadas en {self.source.directory}")
+        return min(starts)
+
+    def history(self, ticker, interval="1d", period=None, start=None):
+        now = pd.Timestamp(self.clock.now())
+        data = self.source.read(ticker, interval)
+        if data.empty and interval in DERIVED_INTERVALS:
+            # La vela semanal en curso sólo suma los días ya abiertos, no los que siguen en la grabación
+            daily = self.source.read(ticker, DERIVED_INTERVALS[interval])
+            data = resample_weekly(daily[daily.index <= now])
+        elif not data.empty:
+            data = data[data.index <= now]
+        return _window(data, period, start, now)
+
+
+def build_provider(data_dir=None, replay=None, interval="1d", speed=1.0, start=None):
+    """
+    Proveedor según las opciones de línea de comandos (por defecto, yfinance).
+    """
+    if replay:
+        return ReplayProvider(DirectoryProvider(replay), interval, start, speed)
+    if data_dir:
+        return DirectoryProvider(data_dir)
+    return YFinanceProvider()
+
+
+def record_history(directory, tickers, interval="1d", period=None, provider=None):
+    """
+    Graba el histórico de los tickers en `directory` para reproducirlo después con `ReplayProvider`.
+    """
+    provider = provider or YFinanceProvider()
+    histories = download_history(tickers, period or DEFAULT_PERIODS.get(interval, "5y"), interval, downloader=provider)
+    saved = 0
+    for ticker, data in histories.items():
+        if not data.empty:
+            save_history(directory, ticker, interval, data)
+            saved += 1
+    return saved
@@ -0,0 +1,144 @@
+import bisect
+import time
+from collections import deque
+
+from instrumentation import NULL_METRICS
+from report import render_report
+
+FRAME_INTERVAL_MS = 33  # Cada cuánto se vuelcan los reportes pendientes (~30 cuadros por segundo)
+FRAME_BUDGET = 0.012  # Segundos máximos de inserción por cuadro, para no congelar la ventana
+MAX_VISIBLE_REPORTS = 100  # Reportes cargados en el textbox; el resto se pagina con "Mostrar más"
+PAGE_SIZE = 100  # Reportes que agrega cada "Mostrar más"
+
+
+def layout_report(messages):
+    """
+    Une los mensajes de un reporte en un solo texto y calcula los rangos de cada tag.
+
+    Devuelve (texto, cantidad de líneas, [(tag, inicio, fin)]) con offsets en
+    caracteres; los mensajes seguidos con el mismo estado comparten un rango.
+    """
+    parts = []
+    ranges = []
+    offset = 0
+    for msg in messages:
+        text = f"{msg['text']}\n"
+        parts.append(text)
+        end = offset + len(text)
+        if ranges and ranges[-1][0] == msg['status'] and ranges[-1][2] == offset:
+            ranges[-1] = (msg['status'], ranges[-1][1], end)
+        else:
+            ranges.append((msg['status'], offset, end))
+        offset = end
+    text = "".join(parts)
+    return text, text.count("\n"), ranges
+
+
+class ReportView:
+    """
+    Muestra los reportes en un textbox ordenados por pass_count, en lotes y con ventana acotada.
+
+    `push` se puede llamar desde el thread de análisis: el reporte se arma ahí y
+    queda en cola junto al evento de cancelación de ese análisis. En el thread de
+    la interfaz, cada `FRAME_INTERVAL_MS` se insertan los pendientes (un insert
+    por reporte más sus `tag_add`) hasta agotar `FRAME_BUDGET`, salteando los de
+    análisis cancelados. Sólo los primeros `visible_limit` reportes viven en el widget;
+    `on_hidden_changed(n)` avisa cuántos quedaron fuera para ofrecer "Mostrar más".
+    """
+
+    def __init__(self, textbox, on_hidden_changed=None):
+        self.textbox = textbox
+        self.on_hidden_changed = on_hidden_changed
+        self.pending = deque()
+        self.entries = []  # (-pass_count, texto, líneas, rangos), en el orden en que se muestran
+        self.keys = []  # -pass_count de cada entrada, para bisect
+        self.visible_limit = MAX_VISIBLE_REPORTS
+        self.metrics = NULL_METRICS  # El análisis en curso asigna el suyo para medir el volcado
+
+    def begin(self):
+        # Los reportes se insertan a partir de esta marca
+        self.pending.clear()
+        self.entries = []
+        self.keys = []
+        self.visible_limit = MAX_VISIBLE_REPORTS
+        self.textbox.mark_set("reports_start", "end-1c")
+        self.textbox.mark_gravity("reports_start", "left")
+        self._notify_hidden()
+
+    def push(self, result, cancel=None):
+        # `cancel` se revisa en `flush`, en el thread de la interfaz: un análisis reemplazado
+        # puede llegar a encolar después de `begin`, pero nunca se muestra en la vista nueva
+        text, lines, ranges = layout_report(render_report(result) + [{'text': "\n", 'status': 'info'}])
+        self.pending.append((cancel, (-result.pass_count, text, lines, ranges)))
+
+    def start(self, widget):
+        # Loop de volcado en el thread de la interfaz (`widget.after`)
+        self._widget = widget
+        self._tick()
+
+    def _tick(self):
+        if self.pending:
+            self.flush(FRAME_BUDGET)
+        self._widget.after(FRAME_INTERVAL_MS, self._tick)
+
+    def flush(self, budget=None):
+        """
+        Inserta reportes pendientes hasta agotar `budget` segundos (todos si es None).
+        """
+        deadline = time.perf_counter() + budget if budget is not None else None
+        hidden_before = self.hidden_count()
+        with self.metrics.stage("render"):
+            self.textbox.configure(state="normal")
+            while self.pending:
+                cancel, entry = self.pending.popleft()
+                if cancel is not None and cancel.is_set():
+                    continue
+                self._add(entry)
+                if deadline is not None and time.perf_counter() >= deadline:
+                    break
+            self.textbox.configure(state="disabled")
+        if self.hidden_count() != hidden_before:
+            self._notify_hidden()
+
+    def _add(self, entry):
+        # Posición estable: después de los reportes con igual o mayor pass_count
+        pos = bisect.bisect_right(self.keys, entry[0])
+        self.keys.insert(pos, entry[0])
+        self.entries.insert(pos, entry)
+        if pos >= self.visible_limit:
+            return
+        self._insert_at(pos)
+        if len(self.entries) > self.visible_limit:
+            # El último visible sale del widget (queda disponible para "Mostrar más")
+            start = self._line_offset(self.visible_limit)
+            lines = self.entries[self.visible_limit][2]
+            self.textbox.delete(f"reports_start + {start} lines", f"reports_start + {start + lines} lines")
+
+    def _line_offset(self, pos):
+        return sum(entry[2] for entry in self.entries[:pos])
+
+    def _insert_at(self, pos):
+        _, text, _, ranges = self.entries[pos]
+        start = self.textbox.index(f"reports_start + {self._line_offset(pos)} lines")
+        self.textbox.insert(start, text, ())  # Sin tags heredados de los vecinos: los pone tag_add
+        for tag, begin, end in ranges:
+            self.textbox.tag_add(tag, f"{start} + {begin} chars", f"{start} + {end} chars")
+
+    def load_more(self):
+        """
+        Agrega al widget la siguiente página de reportes ocultos.
+        """
+        first = self.visible_limit
+        self.visible_limit += PAGE_SIZE
+        self.textbox.configure(state="normal")
+        for pos in range(first, min(self.visible_limit, len(self.entries))):
+            self._insert_at(pos)
+        self.textbox.configure(state="disabled")
+        self._notify_hidden()
+
+    def hidden_count(self):
+        return max(0, len(self.entries) - self.visible_limit)
+
+    def _notify_hidden(self):
+        if self.on_hidden_changed:
+            self.on_hidden_changed(self.hidden_count())
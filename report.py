@@ -0,0 +1,304 @@
+import math
+from dataclasses import dataclass
+from enum import Enum
+
+from indicators import ADX_MIN_BARS
+
+
+class Cruce(str, Enum):
+    NINGUNO = "ninguno"
+    ALCISTA = "alcista"
+    BAJISTA = "bajista"
+
+
+class Tendencia(str, Enum):
+    ALCISTA = "Alcista"
+    BAJISTA = "Bajista"
+    INDEFINIDA = "Indefinida"
+
+
+class Canal(str, Enum):
+    ALCISTA = "ALCISTA"
+    BAJISTA = "BAJISTA"
+    LATERAL = "LATERAL"
+
+
+@dataclass(slots=True)
+class StockResult:
+    """
+    Resultado compacto del análisis de un ticker: valores numéricos y señales tipadas.
+
+    Es lo que devuelven `check_stock`, el motor de panel y el modo incremental;
+    el texto encuadrado se genera aparte con `render_report`, sólo para lo que se muestra.
+    """
+    ticker: str
+    company_name: str = ""
+    pass_count: int = 0
+    error: str = ""  # Mensaje si no hubo datos o falló el análisis
+    price: float = float("nan")
+    rsi: float = float("nan")
+    rsi_sobrecompra: bool = False
+    rsi_sobreventa: bool = False
+    cruce: Cruce = Cruce.NINGUNO
+    dias_desde_cruce: int = 0
+    macd_signal: float = float("nan")
+    quantile_10: float = float("nan")
+    quantile_90: float = float("nan")
+    signal_minimo: bool = False
+    signal_maximo: bool = False
+    adx: float = float("nan")
+    adx_fuerte: bool = False
+    tendencia: Tendencia = Tendencia.INDEFINIDA
+    canal: Canal = Canal.LATERAL
+    minorista_cruce_cero: bool = False
+    mf_acumulando: bool = False
+    mf_distribuyendo: bool = False
+    mf_aumentando: bool = False
+
+    @property
+    def estrategia_compra(self):
+        # Cruce MACD confirmado por Institucionales comprando
+        return self.cruce is Cruce.ALCISTA and self.mf_acumulando
+
+    @property
+    def estrategia_venta(self):
+        return self.cruce is Cruce.BAJISTA and self.mf_distribuyendo
+
+    @property
+    def alerta_compra(self):
+        return self.cruce is Cruce.ALCISTA or self.signal_minimo or self.minorista_cruce_cero
+
+    @property
+    def alerta_venta(self):
+        return self.cruce is Cruce.BAJISTA or self.signal_maximo
+
+    def signals(self):
+        """
+        Señales como dict de tipos nativos (para JSON).
+        """
+        return {
+            name: getattr(self, name).value if isinstance(getattr(self, name), Enum) else getattr(self, name)
+            for name in self.__dataclass_fields__
+            if name not in ("ticker", "company_name", "pass_count", "error")
+        }
+
+
+def build_result(ticker, signals, company_name=""):
+    """
+    Convierte el dict de `evaluate_signals` en un `StockResult` y calcula el recuento de filtros.
+
+    Sin ADX (menos de `ADX_MIN_BARS` velas, no llega a sembrarse) el ticker se informa
+    con error por datos insuficientes, como cuando `ta` fallaba al calcularlo.
+    """
+    if math.isnan(signals["adx"]):
+        return StockResult(ticker=ticker, company_name=company_name,
+                           error=f"{ticker.upper()}: Datos insuficientes para el ADX (se necesitan {ADX_MIN_BARS} velas).")
+    cruce = Cruce.ALCISTA if signals["cruce_alcista"] else Cruce.BAJISTA if signals["cruce_bajista"] else Cruce.NINGUNO
+    result = StockResult(
+        ticker=ticker,
+        company_name=company_name,
+        price=float(signals["price"]),
+        rsi=float(signals["rsi"]),
+        rsi_sobrecompra=bool(signals["rsi_sobrecompra"]),
+        rsi_sobreventa=bool(signals["rsi_sobreventa"]),
+        cruce=cruce,
+        dias_desde_cruce=int(signals["dias_desde_cruce"]),
+        macd_signal=float(signals["macd_signal"]),
+        quantile_10=float(signals["quantile_10"]),
+        quantile_90=float(signals["quantile_90"]),
+        signal_minimo=bool(signals["signal_minimo"]),
+        signal_maximo=bool(signals["signal_maximo"]),
+        adx=float(signals["adx"]),
+        adx_fuerte=bool(signals["adx_fuerte"]),
+        tendencia=Tendencia(signals["tendencia"]),
+        canal=Canal(signals["canal"]),
+        minorista_cruce_cero=bool(signals["minorista_cruce_cero"]),
+        mf_acumulando=bool(signals["mf_acumulando"]),
+        mf_distribuyendo=bool(signals["mf_distribuyendo"]),
+        mf_aumentando=bool(signals["mf_aumentando"]),
+    )
+
+    pass_count = 0
+    # Paso 1: RSI
+    if result.rsi_sobrecompra or result.rsi_sobreventa:
+        pass_count += 1
+    # Paso 2: MACD (el cruce suma por sí mismo y por su alerta)
+    if cruce is not Cruce.NINGUNO:
+        pass_count += 2
+    pass_count += result.signal_minimo + result.signal_maximo
+    # Paso 3: ADX
+    if result.adx_fuerte and result.tendencia is not Tendencia.INDEFINIDA:
+        pass_count += 1
+    # Paso 4: Konkorde
+    pass_count += result.minorista_cruce_cero
+    if result.estrategia_compra or result.estrategia_venta:
+        pass_count += 2
+    result.pass_count = int(pass_count)
+    return result
+
+
+def has_opportunity(result, filter_type="compra"):
+    """
+    Indica si el resultado tiene alguna alerta del tipo buscado ('compra', 'venta' o 'todas').
+    """
+    if filter_type == "todas":
+        return result.alerta_compra or result.alerta_venta
+    return result.alerta_compra if filter_type == "compra" else result.alerta_venta
+
+
+def render_report(result):
+    """
+    Arma los mensajes encuadrados (texto y estado de color) de un resultado.
+
+    Es la parte cara del reporte (medición de anchos y bordes), así que sólo se
+    llama para los resultados que se van a mostrar.
+    """
+    if result.error:
+        return [{"text": result.error, "status": "fail"}]
+
+    ticker = result.ticker
+    messages = []
+
+    # Paso 1: RSI
+    rsi_status = "pass" if result.rsi_sobrecompra or result.rsi_sobreventa else "fail"
+    rsi_text = f"RSI(14): {result.rsi:.2f}. {'Sobrecompra' if result.rsi_sobrecompra else 'Sobreventa' if result.rsi_sobreventa else 'Neutral'}"
+    messages.append({"text": rsi_text, "status": rsi_status})
+
+    # Paso 2: MACD
+    cruce_alcista = result.cruce is Cruce.ALCISTA
+    cruce_bajista = result.cruce is Cruce.BAJISTA
+    dias_desde_cruce = result.dias_desde_cruce
+
+    # Confirmación con RSI
+    macd_condition_met = (result.rsi_sobrecompra and cruce_bajista) or (
+        result.rsi_sobreventa and cruce_alcista
+    )
+    macd_status = "pass" if macd_condition_met else "fail"
+
+    cruce_text = "Sin cruce reciente"
+    if cruce_alcista:
+        cruce_text = f"Cruce Alcista ({'Hoy' if dias_desde_cruce == 0 else f'hace {dias_desde_cruce}d'})"
+    elif cruce_bajista:
+        cruce_text = f"Cruce Bajista ({'Hoy' if dias_desde_cruce == 0 else f'hace {dias_desde_cruce}d'})"
+
+    macd_text = f"MACD ({result.macd_signal:.2f}): {cruce_text}. Confirmación RSI: {'OK' if macd_condition_met else 'NO'}"
+    messages.append({"text": macd_text, "status": macd_status})
+
+    if cruce_alcista:
+        messages.append({'text': f"\n*** MACD: ALERTA DE COMPRA para {ticker.upper()} ***", 'status': 'alert_buy'})
+        messages.append({'text': f"Motivo: {cruce_text} de MACD.", 'status': 'alert_buy'})
+    elif cruce_bajista:
+        messages.append({'text': f"\n*** MACD: ALERTA DE VENTA para {ticker.upper()} ***", 'status': 'alert_sell'})
+        messages.append({'text': f"Motivo: {cruce_text} de MACD.", 'status': 'alert_sell'})
+
+    # Análisis de la señal MACD con cuantiles históricos
+    if result.signal_minimo:
+        min_macd_text = f"MACD: Signal en el 10% inferior histórico ({result.quantile_10:.2f}). Posible oportunidad de compra."
+        messages.append({'text': min_macd_text, 'status': 'alert_buy'})
+
+    if result.signal_maximo:
+        max_macd_text = f"MACD: Signal en el 10% superior histórico ({result.quantile_90:.2f}). Posible oportunidad de venta."
+        messages.append({'text': max_macd_text, 'status': 'alert_sell'})
+
+    # Paso 3: ADX
+    trend_direction_text = result.tendencia.value
+    strength_text = "Fuerte" if result.adx_fuerte else "Débil o en rango"
+
+    # Color: verde si la tendencia fuerte es alcista, rojo si es bajista, gris si es débil
+    adx_status_for_color = "info"
+    if result.adx_fuerte and result.tendencia is Tendencia.ALCISTA:
+        adx_status_for_color = "pass"
+    elif result.adx_fuerte and result.tendencia is Tendencia.BAJISTA:
+        adx_status_for_color = "fail"
+
+    adx_text = (
+        f"ADX: {result.adx:.2f}. Tendencia: {trend_direction_text} ({strength_text})"
+    )
+    messages.append({"text": adx_text, "status": adx_status_for_color})
+
+    # Canal de Tendencia
+    if result.canal is Canal.ALCISTA:
+        canal_text = "Canal: ALCISTA (Basado en SMA 20/50 - Últimos 50 días)"
+        canal_status = "pass"
+    elif result.canal is Canal.BAJISTA:
+        canal_text = "Canal: BAJISTA (Basado en SMA 20/50 - Últimos 50 días)"
+        canal_status = "fail"
+    else:
+        canal_text = "Canal: LATERAL / CONSOLIDACIÓN (SMA 20/50)"
+        canal_status = "info"
+    messages.append({"text": canal_text, "status": canal_status})
+
+    # Paso 4: Konkorde
+    if result.minorista_cruce_cero:
+        messages.append({'text': "Konkorde: Interés minorista entrando (Cruce a cero). Alerta de COMPRA.", 'status': 'alert_buy'})
+
+    if result.mf_acumulando:
+        konkorde_interpretation = "Manos Fuertes ACUMULANDO (Positivo)."
+        konkorde_status = "pass"
+        if result.mf_aumentando:
+            konkorde_interpretation += " Incrementando posición."
+    else:
+        konkorde_interpretation = "Manos Fuertes DISTRIBUYENDO (Negativo)."
+        konkorde_status = "fail"
+        if not result.mf_aumentando:
+            konkorde_interpretation += " Reduciendo posición."
+
+    messages.append({"text": f"Konkorde: {konkorde_interpretation}", "status": konkorde_status})
+
+    # Confirmación Konkorde + MACD
+    if result.estrategia_compra:
+        messages.append({"text": "\n*** ESTRATEGIA: ALERTA DE COMPRA (Konkorde + MACD) ***", "status": "alert_buy"})
+        messages.append({"text": "Motivo: Cruce MACD con Institucionales comprando.", "status": "alert_buy"})
+    elif result.estrategia_venta:
+        messages.append({"text": "\n*** ESTRATEGIA: ALERTA DE VENTA (Konkorde + MACD) ***", "status": "alert_sell"})
+        messages.append({"text": "Motivo: Cruce MACD con Institucionales vendiendo.", "status": "alert_sell"})
+
+    header_text = f"{ticker.upper()}"
+    if result.company_name:
+        header_text += f" ({result.company_name})"
+
+    price_text = f"Precio: ${result.price:.2f} USD"
+
+    # Create a list of all content lines to calculate max width
+    content_lines = [header_text, price_text, "═" * 10] # Divider placeholder
+    for m in messages:
+        content_lines.append(m['text'].strip())
+
+    # Find max width and add padding
+    max_w = max(len(line) for line in content_lines)
+    box_width = max_w + 4 # 2 spaces padding on each side
+
+    # Re-build messages with borders
+    framed_messages = []
+
+    # Header
+    top_border = "╔" + "═" * (box_width) + "╗"
+    mid_border = "╠" + "═" * (box_width) + "╣"
+    bot_border = "╚" + "═" * (box_width) + "╝"
+
+    framed_messages.append({"text": top_border, "status": "info"})
+
+    # Linea de Ticker
+    line = f"║  {header_text.ljust(max_w)}  ║"
+    framed_messages.append({"text": line, "status": "info"})
+
+    # Linea de Precio
+    line = f"║  {price_text.ljust(max_w)}  ║"
+    framed_messages.append({"text": line, "status": "info"})
+
+    framed_messages.append({"text": mid_border, "status": "info"})
+
+    # Contenido de indicadores
+    for m in messages:
+        text = m['text'].strip()
+        # If the text has multiple lines (like ALERTA), handle them
+        for subline in text.split('\n'):
+            subline = subline.strip()
+            if not subline: continue
+
+            # Check if it's an alert to keep its status
+            line_str = f"║  {subline.ljust(max_w)}  ║"
+            framed_messages.append({"text": line_str, "status": m['status']})
+
+    framed_messages.append({"text": bot_border, "status": "info"})
+    return framed_messages
@@ -0,0 +1,76 @@
+import threading
+from concurrent.futures import Future
+
+
+class Run:
+    """
+    Un análisis en curso: su clave, el evento de cancelación y el Future con los resultados.
+    """
+    __slots__ = ("key", "cancel_event", "future")
+
+    def __init__(self, key):
+        self.key = key
+        self.cancel_event = threading.Event()
+        self.future = Future()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+
+class RunScheduler:
+    """
+    Planificador "single-flight" de análisis.
+
+    Hay a lo sumo un análisis activo por clave (lista, temporalidad, filtro): un
+    pedido idéntico mientras otro corre se suma a ese mismo `Run` y comparte su
+    resultado. Con `exclusive=True` un pedido nuevo con otra clave cancela los
+    que estén en curso; el pipeline revisa la cancelación ticker por ticker.
+    """
+
+    def __init__(self):
+        self._runs = {}
+        self._lock = threading.Lock()
+
+    def active(self, key):
+        with self._lock:
+            run = self._runs.get(key)
+            return run if run is not None and not run.cancelled else None
+
+    def submit(self, key, job, exclusive=True):
+        """
+        Ejecuta `job(cancel_event)` en un thread, salvo que ya haya uno igual en curso.
+
+        Devuelve (run, nuevo): `nuevo` es False si se reutilizó un análisis idéntico.
+        """
+        with self._lock:
+            run = self._runs.get(key)
+            if run is not None and not run.cancelled:
+                return run, False
+            if exclusive:
+                for other in self._runs.values():
+                    other.cancel()
+            run = Run(key)
+            self._runs[key] = run
+
+        thread = threading.Thread(target=self._execute, args=(run, job), daemon=True)
+        thread.start()
+        return run, True
+
+    def _execute(self, run, job):
+        try:
+            run.future.set_result(job(run.cancel_event))
+        except Exception as e:
+            run.future.set_exception(e)
+        finally:
+            with self._lock:
+                if self._runs.get(run.key) is run:
+                    del self._runs[run.key]
+
+    def cancel_all(self):
+        with self._lock:
+            for run in self._runs.values():
+                run.cancel()
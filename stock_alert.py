@@ -0,0 +1,226 @@
+"""
+Escáner sin interfaz gráfica: analiza una lista de tickers y escribe un JSON por línea (NDJSON).
+
+Ejemplos:
+    python -m stock_alert scan --list "Mi Portfolio" --interval 1d
+    python -m stock_alert scan --tickers AAPL,MELI --filter todas
+    python -m stock_alert scan --list "Mi Portfolio" --changes   # sólo lo que cambió desde la última corrida
+    python -m stock_alert scan --list "Mi Portfolio" --every 10   # modo daemon
+    python -m stock_alert record --tickers AAPL,MELI --interval 1h --output sesiones/
+    python -m stock_alert scan --tickers AAPL,MELI --interval 1h --replay sesiones/ --speed 1000 --every 60
+"""
+import argparse
+import json
+import math
+import sys
+import time
+
+import numpy as np
+
+from alerts import SignalStore
+from bars import PRICE_DTYPE
+from cache import OHLCVCache
+from data import DEFAULT_PERIODS
+from history import QuantileStore
+from instrumentation import Metrics, profiled
+from metadata import METADATA_FILE, MetadataCache
+from pipeline import DEFAULT_WORKERS, run_pipeline
+from providers import YFinanceProvider, build_provider, record_history
+from report import has_opportunity
+from storage import STOCKS_FILE, read_stock_lists
+from streaming import StateStore
+
+
+def json_safe(value):
+    """
+    Convierte NaN/inf a None para serializar en JSON estricto.
+    """
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+NO_FILTER = "ninguno"  # Sin filtro: se escribe un registro por cada ticker analizado
+FILTERS = [NO_FILTER, "compra", "venta", "todas"]
+
+
+def result_record(result, stages=None):
+    """
+    Registro NDJSON de un ticker: recuento de filtros, tipo de alerta y señales estructuradas.
+
+    `stages` son los segundos por etapa medidos para este ticker (`Metrics.ticker_stages`);
+    `elapsed` es su suma, o None si el motor no mide por ticker (panel).
+    """
+    stages = stages or {}
+    return {
+        "ticker": result.ticker.upper(),
+        "company_name": result.company_name,
+        "pass_count": result.pass_count,
+        "alerta_compra": result.alerta_compra,
+        "alerta_venta": result.alerta_venta,
+        "error": result.error or None,
+        "signals": {name: json_safe(value) for name, value in result.signals().items()},
+        "elapsed": round(sum(stages.values()), 4) if stages else None,
+        "stages": {name: round(seconds, 6) for name, seconds in stages.items()},
+    }
+
+
+def resolve_tickers(args):
+    if args.tickers:
+        return [t.strip().upper() for t in args.tickers.split(",") if t.strip()]
+    stock_lists, active_list = read_stock_lists(args.stocks_file)
+    name = args.list or active_list
+    if name not in stock_lists:
+        raise SystemExit(f"La lista '{name}' no existe en {args.stocks_file}")
+    return [t.strip().upper() for t in stock_lists[name] if t.strip()]
+
+
+def scan(args, tickers, cache, metadata, state_store=None, signal_store=None, out=sys.stdout, provider=None):
+    """
+    Ejecuta un ciclo de análisis y escribe cada ticker que pasa el filtro apenas termina.
+
+    Con el filtro "ninguno" se escriben todos los tickers. Con `signal_store` sólo
+    se escriben los tickers cuyas alertas cambiaron desde el ciclo anterior (o la
+    corrida anterior, guardada en disco), con sus eventos (nueva, terminada o cambio).
+    `provider` es la fuente de velas (por defecto, yfinance).
+    """
+    period = args.period or DEFAULT_PERIODS.get(args.interval, "5y")
+    provider = provider or YFinanceProvider()
+    filter_type = "todas" if args.filter == NO_FILTER else args.filter
+    # El primer filtro no aplica con --changes/--every ni sin filtro: hay que ver todos los tickers
+    unfiltered = state_store is not None or signal_store is not None or args.filter == NO_FILTER
+    screen = filter_type if args.tiered and not unfiltered else None
+    metadata.reset_stats()
+    if screen is None:
+        metadata.prefetch(tickers)
+    start = time.perf_counter()
+    matched = 0
+    metrics = Metrics()
+
+    def write(record):
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+
+    def on_result(result):
+        nonlocal matched
+        if signal_store is not None:
+            events = signal_store.diff(result, args.interval, provider.clock.now())
+            if events:
+                matched += 1
+                write({**result_record(result, metrics.ticker_stages(result.ticker)), "events": events})
+            return
+        opportunity = has_opportunity(result, filter_type)
+        if opportunity:
+            matched += 1
+        if opportunity or args.filter == NO_FILTER:
+            write(result_record(result, metrics.ticker_stages(result.ticker)))
+
+    with profiled(args.profile):
+        results = run_pipeline(tickers, period, args.interval, on_result=on_result, max_workers=args.workers,
+                               cache=cache, metadata=metadata, mode=args.mode, state_store=state_store,
+                               price_dtype=np.float32 if args.float32 else PRICE_DTYPE, metrics=metrics,
+                               quantile_store=None if args.full_history else QuantileStore(provider.cache_dir),
+                               downloader=provider, screen=screen)
+    if signal_store is not None:
+        signal_store.save()
+    found = "con cambios de alertas" if signal_store is not None else f"con oportunidad de {filter_type.upper()}"
+    print(f"{metrics.counters.get('tickers', len(results))} tickers, {matched} {found} "
+          f"en {time.perf_counter() - start:.2f}s. {metadata.stats_text()}", file=sys.stderr)
+    print(metrics.summary(), file=sys.stderr)
+    metrics.write_log(args.metrics_log, interval=args.interval, mode=args.mode,
+                      incremental=state_store is not None, filter=args.filter)
+
+
+def run_scan(args):
+    tickers = resolve_tickers(args)
+    if not tickers:
+        raise SystemExit("No hay tickers para analizar.")
+
+    provider = build_provider(args.data_dir, args.replay, args.interval, args.speed, args.replay_start)
+    # Las fuentes locales no pasan por el cache OHLCV ni por metadata.json
+    cache = OHLCVCache(provider.cache_dir) if provider.cacheable else None
+    metadata = MetadataCache(METADATA_FILE if provider.cacheable else None, fetcher=provider.company_name)
+    # Con --changes se compara contra las alertas guardadas del ciclo (o la corrida) anterior
+    signal_store = SignalStore() if args.changes else None
+    if not args.every:
+        scan(args, tickers, cache, metadata, signal_store=signal_store, provider=provider)
+        return
+
+    # Modo daemon: igual que el análisis automático, los indicadores se actualizan de forma incremental
+    state_store = StateStore(provider.cache_dir)
+    try:
+        while True:
+            scan(args, tickers, cache, metadata, state_store, signal_store, provider=provider)
+            provider.clock.sleep(args.every * 60)  # En replay, `speed` veces más rápido
+    except KeyboardInterrupt:
+        pass
+
+
+def run_record(args):
+    tickers = resolve_tickers(args)
+    if not tickers:
+        raise SystemExit("No hay tickers para grabar.")
+    saved = record_history(args.output, tickers, args.interval, args.period)
+    print(f"{saved} de {len(tickers)} tickers grabados en {args.output}.", file=sys.stderr)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="stock_alert", description="Monitor de alertas de acciones sin interfaz gráfica.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scan_parser = commands.add_parser("scan", help="Analiza una lista y escribe un JSON por ticker (NDJSON).")
+    source = scan_parser.add_mutually_exclusive_group()
+    source.add_argument("--list", help="Nombre de la lista guardada (por defecto, la lista activa).")
+    source.add_argument("--tickers", help="Tickers separados por coma (ignora stocks.json).")
+    scan_parser.add_argument("--stocks-file", default=STOCKS_FILE, help="Archivo de listas (por defecto stocks.json).")
+    scan_parser.add_argument("--interval", default="1d", choices=sorted(DEFAULT_PERIODS), help="Temporalidad de las velas.")
+    scan_parser.add_argument("--period", help="Histórico a descargar (por defecto según la temporalidad).")
+    scan_parser.add_argument("--filter", default=NO_FILTER, choices=FILTERS,
+                             help="Tipo de oportunidad a informar (por defecto, todos los tickers).")
+    scan_parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Descargas simultáneas.")
+    scan_parser.add_argument("--mode", default="thread", choices=["thread", "process", "panel"],
+                             help="Motor de indicadores.")
+    scan_parser.add_argument("--float32", action="store_true",
+                             help="Guarda los precios en float32 (menos memoria en listas grandes).")
+    scan_parser.add_argument("--full-history", action="store_true",
+                             help="Descarga todo el período en cada análisis (sin separar la ventana de los cuantiles).")
+    scan_parser.add_argument("--tiered", action="store_true",
+                             help="Con --filter, evalúa primero las reglas baratas (MACD, cuantiles, Minoristas) y completa sólo los candidatos.")
+    scan_parser.add_argument("--metrics-log", metavar="ARCHIVO",
+                             help="Agrega los tiempos por etapa y ticker de cada ciclo a este NDJSON (ej. metrics.ndjson).")
+    scan_parser.add_argument("--profile", metavar="ARCHIVO",
+                             help="Perfila el análisis con cProfile y guarda el resultado (se ve con pstats).")
+    scan_parser.add_argument("--every", type=float, metavar="MINUTOS",
+                             help="Repite el análisis cada N minutos (modo daemon).")
+    scan_parser.add_argument("--changes", action="store_true",
+                             help="Informa sólo los tickers cuyas alertas cambiaron desde el análisis anterior (y las guarda en alerts.ndjson).")
+    source = scan_parser.add_mutually_exclusive_group()
+    source.add_argument("--data-dir", metavar="DIR",
+                        help="Velas desde archivos locales TICKER_intervalo.csv/.parquet en lugar de yfinance.")
+    source.add_argument("--replay", metavar="DIR",
+                        help="Repite una sesión grabada con `record` sobre un reloj simulado.")
+    scan_parser.add_argument("--speed", type=float, default=1.0,
+                             help="Velocidad del replay respecto del tiempo real (ej. 1000).")
+    scan_parser.add_argument("--replay-start", metavar="FECHA",
+                             help="Inicio del replay (por defecto, la primera vela con historia suficiente).")
+    scan_parser.set_defaults(func=run_scan)
+
+    record_parser = commands.add_parser("record", help="Graba el histórico de una lista para usarlo con --data-dir o --replay.")
+    source = record_parser.add_mutually_exclusive_group()
+    source.add_argument("--list", help="Nombre de la lista guardada (por defecto, la lista activa).")
+    source.add_argument("--tickers", help="Tickers separados por coma (ignora stocks.json).")
+    record_parser.add_argument("--stocks-file", default=STOCKS_FILE, help="Archivo de listas (por defecto stocks.json).")
+    record_parser.add_argument("--interval", default="1d", choices=sorted(DEFAULT_PERIODS), help="Temporalidad de las velas.")
+    record_parser.add_argument("--period", help="Histórico a grabar (por defecto según la temporalidad).")
+    record_parser.add_argument("--output", required=True, metavar="DIR", help="Directorio donde se guardan los CSV.")
+    record_parser.set_defaults(func=run_record)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import json
+import os
+
+STOCKS_FILE = "stocks.json"
+DEFAULT_LIST = "Mi Portfolio"
+
+
+def read_stock_lists(path=STOCKS_FILE):
+    """
+    Lee las listas guardadas y devuelve (listas, nombre de la lista activa).
+    """
+    if not os.path.exists(path):
+        return {DEFAULT_LIST: []}, DEFAULT_LIST
+
+    with open(path, 'r') as f:
+        data = json.load(f)
+
+    # Compatibilidad con formato viejo (si era una lista simple)
+    if isinstance(data, list):
+        return {DEFAULT_LIST: data}, DEFAULT_LIST
+    return data.get("lists", {DEFAULT_LIST: []}), data.get("active_list", DEFAULT_LIST)
+
+
+def write_stock_lists(stock_lists, active_list, path=STOCKS_FILE):
+    # Guardamos todo el objeto (listas y activa)
+    data = {
+        "active_list": active_list,
+        "lists": stock_lists
+    }
+    with open(path, 'w') as f:
+        json.dump(data, f)
@@ -0,0 +1,375 @@
+import copy
+import math
+import os
+import pickle
+import re
+from collections import deque
+
+import numpy as np
+
+from analysis import error_report, evaluate_signals, no_data_report
+from cache import CACHE_DIR
+from indicators import KONKORDE_WINDOW, QUANTILE_LOOKBACK, SortedWindow
+from report import build_result
+
+NAN = float("nan")
+TAIL = 6  # Velas de cada indicador que necesitan las reglas (pendiente SMA 20 usa la -6)
+CHECKPOINT_EVERY = 64  # Velas entre puntos de control de la huella de cierres
+CHECKPOINTS = 64  # Puntos de control guardados (cubren 4096 velas)
+
+
+class EMAState:
+    """
+    EMA incremental equivalente a `Series.ewm(...).mean()` (ignora NaN iniciales).
+    """
+
+    def __init__(self, span=None, alpha=None, min_periods=0, adjust=False):
+        self.alpha = alpha if alpha is not None else 2 / (span + 1)
+        self.min_periods = min_periods
+        self.adjust = adjust
+        self.count = 0
+        self.value = NAN
+        self._weight = 0.0  # Suma de pesos (sólo adjust=True)
+
+    def update(self, x):
+        if math.isnan(x):
+            return self.current()
+        self.count += 1
+        if self.adjust:
+            decay = 1 - self.alpha
+            numerator = 0.0 if self.count == 1 else self.value * self._weight
+            self._weight = decay * self._weight + 1
+            self.value = (decay * numerator + x) / self._weight
+        elif self.count == 1:
+            self.value = x
+        else:
+            self.value += self.alpha * (x - self.value)
+        return self.current()
+
+    def current(self):
+        return self.value if self.count >= max(self.min_periods, 1) else NAN
+
+
+class WilderState:
+    """
+    Suavizado de Wilder incremental: semilla = media de las primeras `window` velas válidas.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.seed = []
+        self.value = NAN
+
+    def update(self, x):
+        if math.isnan(x):
+            return self.value
+        if len(self.seed) < self.window:
+            self.seed.append(x)
+            if len(self.seed) == self.window:
+                self.value = sum(self.seed) / self.window
+            return self.value
+        self.value += (x - self.value) / self.window
+        return self.value
+
+
+class RollingMeanState:
+    """
+    Media móvil simple incremental (NaN hasta completar la ventana).
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self._updates = 0
+
+    def update(self, x):
+        if len(self.values) == self.window:
+            self.total -= self.values[0]
+        self.values.append(x)
+        self.total += x
+        self._updates += 1
+        if self._updates % self.window == 0:
+            self.total = sum(self.values)  # Evita que se acumule error de redondeo
+        if len(self.values) < self.window:
+            return NAN
+        return self.total / self.window
+
+
+class RSIState:
+    def __init__(self, window=14):
+        self.prev_close = NAN
+        self.up = EMAState(alpha=1 / window, min_periods=window)
+        self.down = EMAState(alpha=1 / window, min_periods=window)
+
+    def update(self, close):
+        diff = close - self.prev_close
+        self.prev_close = close
+        # Como `ta`, la primera vela (sin diferencia) cuenta como 0
+        emaup = self.up.update(diff if diff > 0 else 0.0)
+        emadn = self.down.update(-diff if diff < 0 else 0.0)
+        if emadn == 0:
+            return 100.0
+        return 100 - (100 / (1 + emaup / emadn))
+
+
+class MACDState:
+    def __init__(self, window_fast=12, window_slow=26, window_sign=9):
+        self.fast = EMAState(span=window_fast, min_periods=window_fast)
+        self.slow = EMAState(span=window_slow, min_periods=window_slow)
+        self.signal = EMAState(span=window_sign, min_periods=window_sign)
+
+    def update(self, close):
+        macd_line = self.fast.update(close) - self.slow.update(close)
+        return macd_line, self.signal.update(macd_line)
+
+
+class DirectionalMovementState:
+    """
+    ADX, +DI y -DI incrementales (mismas reglas que `indicators.directional_movement`).
+    """
+
+    def __init__(self, window=14):
+        self.prev_high = NAN
+        self.prev_low = NAN
+        self.prev_close = NAN
+        self.tr = WilderState(window)
+        self.pos = WilderState(window)
+        self.neg = WilderState(window)
+        self.adx = WilderState(window)
+        self.di_reported = False
+
+    def update(self, high, low, close):
+        prev_close = self.prev_close
+        true_range = max(high, prev_close) - min(low, prev_close) if not math.isnan(prev_close) else NAN
+        diff_up = high - self.prev_high
+        diff_down = self.prev_low - low
+        pos = diff_up if diff_up > diff_down and diff_up > 0 else (0.0 if not math.isnan(diff_up) else NAN)
+        neg = diff_down if diff_down > diff_up and diff_down > 0 else (0.0 if not math.isnan(diff_down) else NAN)
+        self.prev_high, self.prev_low, self.prev_close = high, low, close
+
+        smooth_tr = self.tr.update(true_range)
+        smooth_pos = self.pos.update(pos)
+        smooth_neg = self.neg.update(neg)
+        if math.isnan(smooth_tr):
+            return NAN, 0.0, 0.0
+
+        dip = 100 * smooth_pos / smooth_tr if smooth_tr != 0 else 0.0
+        din = 100 * smooth_neg / smooth_tr if smooth_tr != 0 else 0.0
+        di_sum = dip + din
+        directional_index = 100 * abs(dip - din) / di_sum if di_sum != 0 else 0.0
+        adx = self.adx.update(directional_index)
+
+        # +DI/-DI se informan desde la vela siguiente a la semilla
+        first = not self.di_reported
+        self.di_reported = True
+        return (
+            adx,
+            0.0 if first else dip,
+            0.0 if first else din,
+        )
+
+
+class KonkordeState:
+    def __init__(self, window=KONKORDE_WINDOW):
+        self.prev_close = NAN
+        self.prev_volume = NAN
+        self.pvi = 100.0
+        self.nvi = 100.0
+        self.pvi_ema = EMAState(span=window, adjust=True)
+        self.nvi_ema = EMAState(span=window, adjust=True)
+        self.signal = RollingMeanState(window)
+
+    def update(self, close, volume):
+        if not math.isnan(self.prev_close):
+            price_change = (close - self.prev_close) / self.prev_close
+            if volume > self.prev_volume:
+                self.pvi *= 1 + price_change
+            elif volume < self.prev_volume:
+                self.nvi *= 1 + price_change
+        self.prev_close, self.prev_volume = close, volume
+
+        manos_fuertes = self.nvi - self.nvi_ema.update(self.nvi)
+        minoristas = self.pvi - self.pvi_ema.update(self.pvi)
+        return manos_fuertes, minoristas, self.signal.update(manos_fuertes)
+
+
+class _Calculators:
+    # Estados recursivos de todos los indicadores (pocos escalares y ventanas cortas)
+    def __init__(self):
+        self.rsi = RSIState(14)
+        self.macd = MACDState(12, 26, 9)
+        self.dm = DirectionalMovementState(14)
+        self.sma20 = RollingMeanState(20)
+        self.sma50 = RollingMeanState(50)
+        self.konkorde = KonkordeState()
+
+    def update(self, high, low, close, volume):
+        row = {"Close": close, "RSI_14": self.rsi.update(close)}
+        row["MACD_12_26_9"], row["MACDs_12_26_9"] = self.macd.update(close)
+        row["ADX_14"], row["ADX_POS_14"], row["ADX_NEG_14"] = self.dm.update(high, low, close)
+        row["SMA_20"] = self.sma20.update(close)
+        row["SMA_50"] = self.sma50.update(close)
+        row["manos_fuertes"], row["minoristas"], row["konkorde_signal"] = self.konkorde.update(close, volume)
+        return row
+
+
+class TickerState:
+    """
+    Estado incremental de los indicadores de un ticker.
+
+    Sólo se consolidan velas cerradas; la última vela descargada puede seguir
+    cambiando (sesión en curso), así que se evalúa sobre una copia del estado.
+
+    La huella del histórico consolidado es la suma acumulada de los cierres, con
+    un punto de control (fecha, suma previa) cada `CHECKPOINT_EVERY` velas: la
+    suma de los cierres descargados desde un punto de control tiene que coincidir.
+    """
+
+    VERSION = 3  # Cambia cuando cambia el formato; un estado viejo se reconstruye
+
+    def __init__(self, quantile_lookback=QUANTILE_LOOKBACK):
+        self.version = self.VERSION
+        self.calculators = _Calculators()
+        self.tail = deque(maxlen=TAIL)
+        self.quantile_window = SortedWindow(quantile_lookback)  # Señal MACD consolidada, para los cuantiles
+        self.last_timestamp = None
+        self.bars = 0
+        self.close_sum = 0.0
+        self.checkpoints = deque(maxlen=CHECKPOINTS)
+
+    def commit(self, timestamp, high, low, close, volume, quantile=True):
+        row = self.calculators.update(high, low, close, volume)
+        self.tail.append(row)
+        if quantile:
+            self.quantile_window.push(row["MACDs_12_26_9"])
+        if self.bars % CHECKPOINT_EVERY == 0:
+            self.checkpoints.append((timestamp, self.close_sum))
+        self.bars += 1
+        self.close_sum += close
+        self.last_timestamp = timestamp
+
+    def matches(self, data, pos):
+        """
+        Indica si los cierres de `data` hasta la vela `pos` (la última consolidada) son los que se procesaron.
+
+        Compara contra el punto de control más viejo que siga en `data`; sin
+        ninguno no se puede verificar y se reconstruye.
+        """
+        for timestamp, before in self.checkpoints:
+            start = data.index.searchsorted(timestamp)
+            if start <= pos and data.index[start] == timestamp:
+                total = data["Close"].to_numpy(dtype=float)[start:pos + 1].sum()
+                return math.isclose(total, self.close_sum - before, rel_tol=1e-9)
+        return False
+
+    def preview(self, high, low, close, volume):
+        """
+        Indicadores (últimas velas) y cuantiles (q10, q90) incluyendo una vela sin consolidar.
+        """
+        row = copy.deepcopy(self.calculators).update(high, low, close, volume)
+        rows = list(self.tail)[1 - TAIL:] + [row]
+        indicators = {name: np.array([r[name] for r in rows]) for name in row}
+        signal = row["MACDs_12_26_9"]
+        quantiles = (self.quantile_window.quantile(0.10, signal), self.quantile_window.quantile(0.90, signal))
+        return indicators, quantiles
+
+
+def _bars(data):
+    return zip(
+        data.index,
+        data["High"].to_numpy(dtype=float),
+        data["Low"].to_numpy(dtype=float),
+        data["Close"].to_numpy(dtype=float),
+        data["Volume"].to_numpy(dtype=float),
+    )
+
+
+def sync_state(state, data, quantile_prior=None):
+    """
+    Lleva el estado hasta la anteúltima vela de `data` procesando sólo las velas nuevas.
+
+    Si no hay estado, falta la última vela consolidada (hueco) o cambió algún
+    cierre ya procesado (revisión, por ejemplo un ajuste por dividendos, que
+    detecta `TickerState.matches`) se reconstruye desde todo el histórico. Si `data` es sólo el histórico corto, `quantile_prior` (señal
+    histórica, velas nuevas) siembra la ventana de cuantiles al reconstruir.
+    Devuelve (estado, reconstruido).
+    """
+    rebuilt = False
+    if state is not None and state.last_timestamp is not None:
+        pos = data.index.searchsorted(state.last_timestamp)
+        same_bar = pos < len(data) and data.index[pos] == state.last_timestamp
+        if not same_bar or not state.matches(data, pos):
+            state = None
+        else:
+            new_bars = data.iloc[pos + 1:-1]
+    quantile_from = 0  # Primera vela de `new_bars` que entra a la ventana de cuantiles
+    if state is None or state.last_timestamp is None:
+        state = TickerState()
+        new_bars = data.iloc[:-1]
+        rebuilt = True
+        if quantile_prior is not None:
+            prior, new_count = quantile_prior
+            for value in prior:
+                state.quantile_window.push(value)
+            quantile_from = len(data) - new_count
+
+    for i, bar in enumerate(_bars(new_bars)):
+        state.commit(*bar, quantile=i >= quantile_from)
+    return state, rebuilt
+
+
+class StateStore:
+    """
+    Guarda el `TickerState` de cada (ticker, intervalo) entre ciclos, junto al cache OHLCV.
+    """
+
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = directory
+        self.rebuilds = 0
+        self.updates = 0
+
+    def _path(self, ticker, interval):
+        safe = re.sub(r"[^A-Za-z0-9._-]", "_", ticker.upper())
+        return os.path.join(self.directory, f"{safe}_{interval}.state")
+
+    def load(self, ticker, interval):
+        try:
+            with open(self._path(ticker, interval), 'rb') as f:
+                state = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+        # Un estado de una versión anterior se descarta y se reconstruye desde el histórico
+        return state if getattr(state, "version", None) == TickerState.VERSION else None
+
+    def save(self, ticker, interval, state):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(ticker, interval)
+        with open(path + ".tmp", 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+
+
+def analyze_incremental(ticker, interval, data, store, company_name="", quantile_prior=None):
+    """
+    Igual que `analyze_arrays`, pero actualizando el estado guardado sólo con las velas nuevas.
+    """
+    try:
+        if data is None or data.empty:
+            return no_data_report(ticker)
+
+        state, rebuilt = sync_state(store.load(ticker, interval), data, quantile_prior)
+        if rebuilt:
+            store.rebuilds += 1
+        else:
+            store.updates += 1
+        store.save(ticker, interval, state)
+
+        last = data.iloc[-1]
+        indicators, quantiles = state.preview(
+            float(last["High"]), float(last["Low"]), float(last["Close"]), float(last["Volume"])
+        )
+        signals = evaluate_signals(indicators, quantiles=quantiles)
+        return build_result(ticker, signals, company_name)
+    except Exception as e:
+        return error_report(ticker, e)
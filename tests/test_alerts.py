@@ -0,0 +1,57 @@
+import json
+from datetime import datetime, timedelta
+
+import pytz
+
+from alerts import SignalStore, event_message
+from markets import SimulatedClock
+from report import Cruce, StockResult
+
+
+def result(cruce=Cruce.NINGUNO, **signals):
+    return StockResult("aapl", cruce=cruce, **signals)
+
+
+def kinds(events):
+    return [(e["alert"], e["kind"]) for e in events]
+
+
+def test_diff_reports_new_changed_and_ended_alerts(tmp_path):
+    store = SignalStore(str(tmp_path / "state.json"), str(tmp_path / "alerts.ndjson"))
+    assert kinds(store.diff(result(Cruce.ALCISTA, signal_minimo=True), "1d")) == [
+        ("cruce_macd", "nueva"), ("signal_minimo", "nueva"),
+    ]
+    assert store.diff(result(Cruce.ALCISTA, signal_minimo=True), "1d") == []
+
+    changed = store.diff(result(Cruce.BAJISTA), "1d")
+    assert kinds(changed) == [("cruce_macd", "cambio"), ("signal_minimo", "terminada")]
+    assert (changed[0]["previous"], changed[0]["value"]) == ("alcista", "bajista")
+    # Cada intervalo lleva su propio estado y los errores no cuentan como "sin alertas"
+    assert kinds(store.diff(result(Cruce.BAJISTA), "1h")) == [("cruce_macd", "nueva")]
+    assert store.diff(StockResult("aapl", error="AAPL: No se encontraron datos."), "1d") == []
+
+    logged = [json.loads(line) for line in (tmp_path / "alerts.ndjson").read_text().splitlines()]
+    assert len(logged) == 5 and all(e["ticker"] == "AAPL" for e in logged)
+
+
+def test_state_survives_a_restart(tmp_path):
+    path = str(tmp_path / "state.json")
+    store = SignalStore(path, log_path=None)
+    store.diff(result(Cruce.ALCISTA), "1d")
+    store.save()
+
+    restarted = SignalStore(path, log_path=None)
+    assert restarted.diff(result(Cruce.ALCISTA), "1d") == []
+    assert kinds(restarted.diff(result(), "1d")) == [("cruce_macd", "terminada")]
+    # Sin `save` el cambio no queda: otro reinicio vuelve a ver el cruce
+    assert kinds(SignalStore(path, log_path=None).diff(result(), "1d")) == [("cruce_macd", "terminada")]
+
+
+def test_event_time_comes_from_the_given_clock():
+    # En replay los eventos llevan la hora simulada de las velas, no la del reloj de pared
+    clock = SimulatedClock(datetime(2024, 9, 3, 15, 30, tzinfo=pytz.utc), speed=1.0)
+    store = SignalStore(None, None)
+    events = store.diff(result(minorista_cruce_cero=True), "1h", clock.now())
+    when = datetime.fromisoformat(events[0]["time"])
+    assert abs(when - clock.start) < timedelta(seconds=5)
+    assert event_message(events[0])["text"].endswith("AAPL: NUEVA Konkorde: minoristas cruzan a positivo")
@@ -0,0 +1,37 @@
+import numpy as np
+
+from backtest import backtest, rule_states
+from benchmarks.synthetic import synthetic_universe
+from indicators import QUANTILE_MIN_PERIODS
+from panel import build_panel
+
+
+def quantile_rules(n_tickers=20, n_bars=600):
+    universe = synthetic_universe(n_tickers, n_bars, 0)
+    panel = build_panel(universe)
+    signals, ready = rule_states(panel["Close"], panel["Volume"])
+    return universe, signals, ready
+
+
+def test_quantile_rules_wait_for_min_periods():
+    _, signals, ready = quantile_rules()
+    # La señal MACD es válida desde la vela 33: el cuantil necesita QUANTILE_MIN_PERIODS valores más
+    first_ready = np.argmax(ready["signal_minimo"].to_numpy(), axis=0)
+    assert (first_ready >= 33 + QUANTILE_MIN_PERIODS - 1).all()
+    for name in ("signal_minimo", "signal_maximo"):
+        active = signals[name].to_numpy()
+        for column, row in enumerate(first_ready):
+            assert not active[:row, column].any()
+
+
+def test_onset_at_first_evaluable_bar_is_not_counted():
+    universe, signals, ready = quantile_rules()
+    summary = backtest(universe)
+    for name in ("signal_minimo", "signal_maximo"):
+        active = signals[name].to_numpy()
+        first_ready = np.argmax(ready[name].to_numpy(), axis=0)
+        onset = active.copy()
+        onset[1:] &= ~active[:-1]
+        # Las que ya estaban encendidas al poder evaluarse no son disparos
+        stale = sum(active[row, column] for column, row in enumerate(first_ready))
+        assert summary.loc[name, "disparos"] == onset.sum() - stale
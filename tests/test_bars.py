@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from analysis import compute_indicators, ohlcv_arrays
+from bars import Bars
+from benchmarks.synthetic import synthetic_ohlcv
+
+
+def test_missing_volume_stays_missing():
+    data = synthetic_ohlcv(300, 0)
+    data.iloc[[50, 51, 200], data.columns.get_loc("Volume")] = np.nan
+    bars = Bars.from_frame(data)
+    assert np.isnan(bars.volume[[50, 51, 200]]).all()
+
+    # Mismos indicadores desde Bars que desde el DataFrame (Konkorde incluido)
+    from_bars = compute_indicators(*ohlcv_arrays(bars))
+    from_frame = compute_indicators(*ohlcv_arrays(data))
+    for name, values in from_frame.items():
+        assert np.array_equal(from_bars[name], values, equal_nan=True), name
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_round_trip(dtype):
+    data = synthetic_ohlcv(100, 1)
+    frame = Bars.from_frame(data, dtype).to_frame()
+    assert np.allclose(frame["Close"].to_numpy(), data["Close"].to_numpy(), rtol=1e-6)
+    assert np.array_equal(frame["Volume"].to_numpy(), data["Volume"].to_numpy())
+    assert (frame.index == data.index).all()
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_bars_do_not_pin_the_frame(dtype):
+    # Una vista al bloque del DataFrame lo mantendría vivo entero (más memoria que el propio DataFrame)
+    data = synthetic_ohlcv(100, 2)
+    bars = Bars.from_frame(data, dtype)
+    for name in ("open", "high", "low", "close", "volume"):
+        assert not any(np.shares_memory(getattr(bars, name), data[c].to_numpy()) for c in data.columns)
@@ -0,0 +1,102 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from cache import TMP_SUFFIX, CacheEntry, OHLCVCache, merge_bars
+
+
+def bars(start, n, tz="America/New_York", freq="D", close=100.0):
+    index = pd.date_range(start, periods=n, freq=freq, tz=tz).as_unit("ns")  # Como lo guarda el cache
+    values = close + np.arange(n, dtype=float)
+    return pd.DataFrame({"Open": values, "High": values + 1, "Low": values - 1,
+                         "Close": values, "Volume": values * 1000}, index=index)
+
+
+def age(path, seconds):
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def test_store_and_load_round_trip(tmp_path):
+    cache = OHLCVCache(str(tmp_path))
+    daily = bars("2026-01-05", 30)
+    hourly = bars("2026-01-05 09:30", 7, tz=None, freq="h")
+    cache.store("aapl", "1d", daily, full=True, period="1y")
+    cache.store("BRK-B", "1h", hourly, full=True)
+
+    entry = cache.load("AAPL", "1d")
+    pd.testing.assert_frame_equal(entry.data, daily, check_freq=False)
+    assert str(entry.data.index.tz) == "America/New_York" and entry.period == "1y"
+    assert entry.fetched_at == entry.full_at
+    pd.testing.assert_frame_equal(cache.load("brk-b", "1h").data, hourly, check_freq=False)
+    assert cache.load("AAPL", "1h") is None
+
+    # Un store incremental conserva el período y la fecha de la descarga completa
+    cache.store("AAPL", "1d", bars("2026-02-04", 1), previous=entry, period="5d")
+    incremental = cache.load("AAPL", "1d")
+    assert incremental.period == "1y" and incremental.full_at == entry.full_at
+    assert not list(tmp_path.glob(f"*{TMP_SUFFIX}"))
+
+
+def test_merge_bars_replaces_the_repeated_bar_and_trims_the_period():
+    cached = bars("2026-01-05", 10)
+    new = bars("2026-01-14", 3, close=500.0)
+    merged = merge_bars(cached, new, period="10d")
+    assert merged.index.is_monotonic_increasing and not merged.index.has_duplicates
+    assert merged.loc["2026-01-14", "Close"].item() == 500.0
+    assert merged.index[-1] - merged.index[0] <= pd.Timedelta(days=10) and len(merged) == 11
+    assert merge_bars(cached, None) is cached
+
+    # Las velas nuevas se llevan a la zona horaria del cache
+    utc = bars("2026-01-15 14:30", 1, tz="UTC", close=700.0)
+    assert str(merge_bars(cached, utc).index.tz) == "America/New_York"
+    naive = merge_bars(bars("2026-01-05", 3, tz=None), bars("2026-01-08", 1, tz="UTC"))
+    assert naive.index.tz is None and len(naive) == 4
+
+
+def test_needs_full_refresh():
+    cache = OHLCVCache(None)
+    recent = bars(pd.Timestamp.now(tz="America/New_York").normalize() - pd.Timedelta(days=29), 30)
+    now = time.time()
+    assert not cache.needs_full_refresh(CacheEntry(recent, now, now, "1y"), "1y")
+    assert cache.needs_full_refresh(CacheEntry(recent.iloc[:0], now, now, "1y"), "1y")
+    # Vieja, bajada con un período más corto que el pedido o con la última vela fuera del período
+    assert cache.needs_full_refresh(CacheEntry(recent, now, now - 8 * 86400, "1y"), "1y")
+    assert cache.needs_full_refresh(CacheEntry(recent, now, now, "1mo"), "1y")
+    assert cache.needs_full_refresh(CacheEntry(bars("2020-01-01", 30), now, now, "1y"), "1y")
+    assert not cache.needs_full_refresh(CacheEntry(recent, now, now, ""), "max")
+
+
+def test_evict_removes_expired_and_least_recently_used(tmp_path):
+    cache = OHLCVCache(str(tmp_path))
+    for i, ticker in enumerate(["OLD", "LRU", "NEW"]):
+        cache.store(ticker, "1d", bars("2026-01-05", 200))
+        age(cache._path(ticker, "1d"), [40 * 86400, 3600, 60][i])
+    size = os.path.getsize(cache._path("NEW", "1d"))
+
+    cache.max_bytes = int(size * 1.5)
+    cache.evict()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["NEW_1d.npz"]
+
+    # `load` marca el uso: la entrada leída sobrevive a la más nueva sin leer
+    cache.store("LRU", "1d", bars("2026-01-05", 200))
+    age(cache._path("NEW", "1d"), 120)
+    age(cache._path("LRU", "1d"), 3600)
+    cache.load("LRU", "1d")
+    cache.evict()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["LRU_1d.npz"]
+
+
+def test_evict_keeps_the_temporary_file_of_a_store_in_flight(tmp_path):
+    cache = OHLCVCache(str(tmp_path), max_bytes=0)
+    in_flight = cache._path("AAPL", "1d") + TMP_SUFFIX
+    np.savez(in_flight, index=np.arange(3))
+    leftover = cache._path("MSFT", "1d") + TMP_SUFFIX
+    np.savez(leftover, index=np.arange(3))
+    age(leftover, 40 * 86400)
+
+    cache.evict()
+    assert os.path.exists(in_flight) and not os.path.exists(leftover)
+    os.replace(in_flight, cache._path("AAPL", "1d"))  # El store termina sin FileNotFoundError
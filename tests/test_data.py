@@ -0,0 +1,98 @@
+import math
+import os
+
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import FakeDownloader, synthetic_universe
+from data import CHUNK_SIZE, OHLCV_COLUMNS, download_history, resample_weekly
+from providers import DirectoryProvider
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+YAHOO_FIXTURES = os.path.join(FIXTURES, "yahoo")
+EXCHANGE_TZ = "America/New_York"  # Las grabaciones se guardan en UTC; las semanas de Yahoo empiezan el lunes local
+
+
+def read_bars(name):
+    data = pd.read_csv(os.path.join(FIXTURES, name), index_col=0)
+    index = pd.to_datetime(data.index, utc=True).tz_convert("America/New_York")
+    return data.set_axis(index.rename("Date"))
+
+
+def yahoo_pairs():
+    # Grabaciones reales de yfinance: TICKER_1d.csv y TICKER_1wk.csv del mismo período, por ejemplo
+    #   python -m stock_alert record --tickers SPY --interval 1d --period 3mo --output tests/fixtures/yahoo
+    #   python -m stock_alert record --tickers SPY --interval 1wk --period 3mo --output tests/fixtures/yahoo
+    if not os.path.isdir(YAHOO_FIXTURES):
+        return []
+    files = set(os.listdir(YAHOO_FIXTURES))
+    return sorted(name[:-len("_1d.csv")] for name in files
+                  if name.endswith("_1d.csv") and name.replace("_1d.csv", "_1wk.csv") in files)
+
+
+@pytest.mark.parametrize("ticker", yahoo_pairs() or [pytest.param(None, marks=pytest.mark.skip(
+    reason="Sin grabaciones de yfinance en tests/fixtures/yahoo (ver yahoo_pairs)"))])
+def test_resample_weekly_matches_yfinance_weekly_bars(ticker):
+    provider = DirectoryProvider(YAHOO_FIXTURES)
+    daily = provider.read(ticker, "1d").tz_convert(EXCHANGE_TZ)
+    expected = provider.read(ticker, "1wk").tz_convert(EXCHANGE_TZ)[OHLCV_COLUMNS]
+
+    # La grabación tiene que cubrir un lunes feriado (sin vela diaria) para que el caso cuente
+    mondays = pd.date_range(daily.index[0].normalize(), daily.index[-1], freq="W-MON")
+    assert mondays.difference(daily.index.normalize()).size, "la grabación no incluye un lunes feriado"
+
+    # La primera semana puede estar cortada por el inicio del período diario
+    weekly = resample_weekly(daily).iloc[1:]
+    expected = expected[expected.index >= weekly.index[0]]
+    pd.testing.assert_frame_equal(weekly[["Open", "High", "Low", "Close"]], expected[["Open", "High", "Low", "Close"]],
+                                  check_freq=False, check_dtype=False, check_names=False, rtol=1e-6)
+    # Yahoo suma el volumen semanal de su lado: se tolera un redondeo mínimo
+    pd.testing.assert_series_equal(weekly["Volume"], expected["Volume"], check_freq=False, check_dtype=False,
+                                   check_names=False, rtol=1e-3)
+
+
+def test_resample_weekly_matches_hand_built_weekly_bars():
+    # Velas sintéticas armadas a mano (no son de Yahoo): 24/08 al miércoles 16/09/2026,
+    # sin el lunes 07/09 (Labor Day); las semanales son lo que tiene que dar el resampleo
+    daily = read_bars("synthetic_daily_1d.csv")
+    expected = read_bars("synthetic_weekly_1wk.csv")
+    weekly = resample_weekly(daily)
+    pd.testing.assert_frame_equal(weekly, expected, check_freq=False, check_dtype=False)
+
+
+def test_resample_weekly_holiday_monday_and_partial_week():
+    daily = read_bars("synthetic_daily_1d.csv")
+    weekly = resample_weekly(daily)
+    holiday_week = pd.Timestamp("2026-09-07", tz="America/New_York")
+    current_week = pd.Timestamp("2026-09-14", tz="America/New_York")
+
+    # La semana del feriado se etiqueta igual con el lunes y abre con el martes
+    assert holiday_week in weekly.index
+    assert weekly.loc[holiday_week, "Open"] == daily.loc[pd.Timestamp("2026-09-08", tz="America/New_York"), "Open"]
+    # La semana en curso (lunes a miércoles) queda como vela parcial con lo que hay
+    assert weekly.index[-1] == current_week
+    assert weekly.loc[current_week, "Close"] == daily["Close"].iloc[-1]
+    assert weekly.loc[current_week, "Volume"] == daily["Volume"].iloc[-3:].sum()
+
+
+@pytest.mark.parametrize("n_tickers", [1, CHUNK_SIZE, CHUNK_SIZE + 1, 3 * CHUNK_SIZE + 7])
+def test_download_history_batches_requests(n_tickers):
+    universe = synthetic_universe(n_tickers, 60)
+    downloader = FakeDownloader(universe)
+    histories = download_history(list(universe), "5y", "1d", downloader=downloader)
+    assert downloader.requests == math.ceil(n_tickers / CHUNK_SIZE)
+    for ticker, data in universe.items():
+        pd.testing.assert_frame_equal(histories[ticker], data[OHLCV_COLUMNS],
+                                      check_freq=False)
+
+
+def test_download_history_collapses_duplicates_and_keeps_missing():
+    universe = synthetic_universe(CHUNK_SIZE, 60)
+    tickers = list(universe)
+    downloader = FakeDownloader(universe)
+    # Cada ticker pedido dos veces más uno que el proveedor no conoce
+    histories = download_history(tickers + tickers + ["NOEXISTE"], "5y", "1d", downloader=downloader)
+    assert downloader.requests == math.ceil((CHUNK_SIZE + 1) / CHUNK_SIZE)
+    assert list(histories) == tickers + ["NOEXISTE"]
+    assert histories["NOEXISTE"].empty
+    assert list(histories["NOEXISTE"].columns) == OHLCV_COLUMNS
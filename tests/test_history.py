@@ -0,0 +1,38 @@
+import math
+
+import numpy as np
+
+from benchmarks.synthetic import FakeDownloader, synthetic_universe
+from cache import OHLCVCache
+from data import CHUNK_SIZE, fetch_histories
+from history import QuantileStore, tail_bars
+from indicators import EMA_TOLERANCE, required_bars
+
+UNIVERSE = synthetic_universe(2 * CHUNK_SIZE + 1, n_bars=1300)
+SHORT = tail_bars(UNIVERSE, required_bars(EMA_TOLERANCE))  # Lo que analiza el pipeline con el store
+
+
+def test_priors_download_stale_tickers_in_chunks(tmp_path):
+    store = QuantileStore(str(tmp_path))
+    downloader = FakeDownloader(UNIVERSE)
+    priors = store.priors(SHORT, "1d", "5y", downloader)
+    assert downloader.requests == math.ceil(len(UNIVERSE) / CHUNK_SIZE)
+    assert set(priors) == set(UNIVERSE) and store.rebuilds == len(UNIVERSE)
+
+    # Con la ventana guardada y vigente no se vuelve a descargar
+    assert store.priors(SHORT, "1d", "5y", downloader).keys() == priors.keys()
+    assert downloader.requests == math.ceil(len(UNIVERSE) / CHUNK_SIZE)
+
+
+def test_priors_read_the_long_history_from_the_cache(tmp_path):
+    cache = OHLCVCache(str(tmp_path / "ohlcv"))
+    fetch_histories(list(UNIVERSE), "5y", "1d", cache=cache, downloader=FakeDownloader(UNIVERSE))
+    expected = QuantileStore(str(tmp_path / "reference")).priors(SHORT, "1d", "5y", FakeDownloader(UNIVERSE))
+
+    store = QuantileStore(str(tmp_path / "quantiles"))
+    downloader = FakeDownloader(UNIVERSE)
+    priors = store.priors(SHORT, "1d", "5y", downloader, cache=cache, refresh=False)
+    assert downloader.requests == 0
+    assert store.rebuilds == len(UNIVERSE)
+    for ticker, (values, new_count) in expected.items():
+        assert np.array_equal(priors[ticker][0], values) and priors[ticker][1] == new_count
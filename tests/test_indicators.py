@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+import pytest
+import ta.trend
+
+from analysis import check_stock
+from indicators import ADX_MIN_BARS, KONKORDE_WINDOW, SortedWindow, directional_movement, konkorde, pvi_nvi
+from metadata import MetadataCache
+
+
+def random_ohlcv(n_bars, seed):
+    # Paseo aleatorio geométrico con volumen log-normal, reproducible por semilla
+    rng = np.random.default_rng(seed)
+    close = rng.uniform(5, 500) * np.exp(np.cumsum(rng.normal(0.0002, 0.02, n_bars)))
+    spread = np.abs(rng.normal(0, 0.01, (2, n_bars)))
+    volume = np.round(rng.uniform(1e5, 5e7) * rng.lognormal(0, 0.4, n_bars))
+    return pd.DataFrame({"High": close * (1 + spread[0]), "Low": close * (1 - spread[1]), "Close": close,
+                         "Volume": volume})
+
+
+def reference_konkorde(close, volume, window=KONKORDE_WINDOW):
+    """
+    Konkorde con el bucle por vela original (antes de vectorizar PVI/NVI).
+    """
+    pvi = [100.0]
+    nvi = [100.0]
+    for i in range(1, len(close)):
+        prev_close = close[i - 1]
+        curr_close = close[i]
+        prev_vol = volume[i - 1]
+        curr_vol = volume[i]
+
+        price_change = (curr_close - prev_close) / prev_close
+
+        if curr_vol > prev_vol:
+            pvi.append(pvi[-1] * (1 + price_change))
+            nvi.append(nvi[-1])
+        elif curr_vol < prev_vol:
+            pvi.append(pvi[-1])
+            nvi.append(nvi[-1] * (1 + price_change))
+        else:
+            pvi.append(pvi[-1])
+            nvi.append(nvi[-1])
+
+    pvi = pd.Series(pvi)
+    nvi = pd.Series(nvi)
+    manos_fuertes = nvi - nvi.ewm(span=window).mean()
+    minoristas = pvi - pvi.ewm(span=window).mean()
+    konkorde_signal = manos_fuertes.rolling(window=window).mean()
+    return manos_fuertes.to_numpy(), minoristas.to_numpy(), konkorde_signal.to_numpy()
+
+
+def ohlcv_with_flat_volume(n_bars, seed):
+    # Velas sintéticas con volumen cero y rachas de volumen sin cambios (la rama "else" del bucle)
+    data = random_ohlcv(n_bars, seed)
+    volume = data["Volume"].to_numpy().copy()
+    rng = np.random.default_rng(seed)
+    volume[rng.choice(n_bars, n_bars // 10, replace=False)] = 0.0
+    repeated = rng.choice(np.arange(1, n_bars), n_bars // 10, replace=False)
+    volume[repeated] = volume[repeated - 1]
+    return data["Close"].to_numpy(), volume
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_konkorde_matches_reference_loop(seed):
+    close, volume = ohlcv_with_flat_volume(400, seed)
+    expected = reference_konkorde(close, volume)
+    for got, want in zip(konkorde(close, volume), expected):
+        assert np.allclose(got, want, equal_nan=True)
+
+
+def test_pvi_nvi_flat_and_zero_volume():
+    close = np.array([10.0, 11.0, 12.0, 13.2, 12.0])
+    volume = np.array([100.0, 100.0, 0.0, 50.0, 50.0])
+    pvi, nvi = pvi_nvi(close, volume)
+    # Volumen igual: ninguno cambia; baja a 0: sólo NVI; sube: sólo PVI
+    assert np.allclose(pvi, [100.0, 100.0, 100.0, 110.0, 110.0])
+    assert np.allclose(nvi, [100.0, 100.0, 100.0 * 12 / 11, 100.0 * 12 / 11, 100.0 * 12 / 11])
+
+
+def test_konkorde_panel_with_leading_nan_columns():
+    n_bars = 300
+    starts = [0, 40, 120]  # Tickers que empiezan más tarde en el panel alineado
+    close = np.full((n_bars, len(starts)), np.nan)
+    volume = np.full((n_bars, len(starts)), np.nan)
+    for column, start in enumerate(starts):
+        c, v = ohlcv_with_flat_volume(n_bars - start, 10 + column)
+        close[start:, column] = c
+        volume[start:, column] = v
+
+    panel = konkorde(close, volume)
+    for column, start in enumerate(starts):
+        expected = reference_konkorde(close[start:, column], volume[start:, column])
+        for got, want in zip(panel, expected):
+            assert np.isnan(got[:start, column]).all()
+            assert np.allclose(got[start:, column], want, equal_nan=True)
+
+
+def ta_adx(n_bars, seed):
+    data = random_ohlcv(n_bars, seed)
+    high, low, close = data["High"], data["Low"], data["Close"]
+    indicator = ta.trend.ADXIndicator(high=high, low=low, close=close, window=14)
+    return indicator, directional_movement(high, low, close, window=14)
+
+
+@pytest.mark.parametrize("n_bars", [28, 40, 500])
+@pytest.mark.parametrize("seed", range(3))
+def test_directional_movement_matches_ta(n_bars, seed):
+    indicator, (adx, adx_pos, adx_neg) = ta_adx(n_bars, seed)
+    # `ta` rellena con 0 el calentamiento del ADX; acá queda en NaN hasta la vela ADX_MIN_BARS
+    assert np.isnan(adx.to_numpy()[:ADX_MIN_BARS - 1]).all()
+    assert np.allclose(adx.to_numpy()[ADX_MIN_BARS - 1:], indicator.adx().to_numpy()[ADX_MIN_BARS - 1:],
+                       rtol=1e-9, atol=1e-9)
+    assert np.allclose(adx_pos.to_numpy(), indicator.adx_pos().to_numpy(), rtol=1e-9, atol=1e-9)
+    assert np.allclose(adx_neg.to_numpy(), indicator.adx_neg().to_numpy(), rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("n_bars", [15, 20, 27])
+def test_directional_movement_short_series(n_bars):
+    # Con menos de ADX_MIN_BARS velas `ta` falla al sembrar el ADX; acá queda todo en NaN
+    indicator, (adx, adx_pos, adx_neg) = ta_adx(n_bars, 0)
+    with pytest.raises(IndexError):
+        indicator.adx()
+    assert np.isnan(adx.to_numpy()).all()
+    assert np.allclose(adx_pos.to_numpy(), indicator.adx_pos().to_numpy(), rtol=1e-9, atol=1e-9)
+    assert np.allclose(adx_neg.to_numpy(), indicator.adx_neg().to_numpy(), rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("lookback", [1, 5, 50])
+def test_sorted_window_matches_series_quantile(lookback):
+    rng = np.random.default_rng(lookback)
+    # Valores repetidos a propósito: el borrado y la inserción tienen que elegir bien entre iguales
+    values = rng.integers(0, 20, 300).astype(float)
+    window = SortedWindow(lookback)
+    for i, x in enumerate(values):
+        for q in (0.0, 0.10, 0.5, 0.90, 1.0):
+            expected = pd.Series(values[max(0, i + 1 - lookback):i + 1]).quantile(q)
+            assert window.quantile(q, x) == expected
+        window.push(x)
+        assert window.quantile(0.10) == pd.Series(values[max(0, i + 1 - lookback):i + 1]).quantile(0.10)
+
+
+@pytest.mark.parametrize("n_bars", [20, 27])
+def test_short_series_report_insufficient_data(n_bars):
+    # Como cuando `ta` fallaba: el ticker sale con error en vez de una tendencia "débil" sin datos
+    metadata = MetadataCache(path=None, fetcher=lambda ticker: "")
+    result = check_stock("CORTO", data=random_ohlcv(n_bars, 0), metadata=metadata)
+    assert result.error and "insuficientes" in result.error
+    assert check_stock("LARGO", data=random_ohlcv(ADX_MIN_BARS, 0), metadata=metadata).error == ""
@@ -0,0 +1,86 @@
+import warnings
+from datetime import date, datetime, time
+
+import pytest
+import pytz
+
+from markets import BA_HOLIDAYS, EXCHANGES, Exchange, SimulatedClock, next_run_time, nyse_holidays, open_tickers
+
+NEW_YORK = pytz.timezone("America/New_York")
+TICKERS = ["AAPL", "GGAL.BA"]
+
+# Calendario publicado por NYSE para 2026-2027 (la regla lo tiene que reproducir)
+NYSE_2026_2027 = [
+    "2026-01-01", "2026-01-19", "2026-02-16", "2026-04-03", "2026-05-25", "2026-06-19",
+    "2026-07-03", "2026-09-07", "2026-11-26", "2026-12-25",
+    "2027-01-01", "2027-01-18", "2027-02-15", "2027-03-26", "2027-05-31", "2027-06-18",
+    "2027-07-05", "2027-09-06", "2027-11-25", "2027-12-24",
+]
+
+
+def clock_at(day, hour, minute=0, second=0):
+    # Reloj simulado en hora de Nueva York; los chequeos toleran lo que avanza durante el test
+    return SimulatedClock(NEW_YORK.localize(datetime.combine(day, time(hour, minute, second))))
+
+
+def ny(day, hour, minute=0, second=0):
+    return NEW_YORK.localize(datetime.combine(day, time(hour, minute, second)))
+
+
+def test_nyse_rule_matches_the_published_calendar():
+    assert sorted(d.isoformat() for d in nyse_holidays(2026) | nyse_holidays(2027)) == NYSE_2026_2027
+    # Año nuevo en sábado no se pasa al viernes 31; Juneteenth en domingo va al lunes
+    assert date(2027, 12, 31) not in nyse_holidays(2028)
+    assert date(2028, 6, 19) in nyse_holidays(2028) and date(2033, 6, 20) in nyse_holidays(2033)
+
+
+def test_open_tickers_around_open_and_close():
+    thursday = date(2026, 10, 15)
+    assert open_tickers(TICKERS, clock_at(thursday, 9, 29, 59).now()) == []
+    assert open_tickers(TICKERS, clock_at(thursday, 9, 30).now()) == ["AAPL"]
+    # BYMA abre a las 11 de Buenos Aires (10 de Nueva York en horario de verano de EE.UU.)
+    assert open_tickers(TICKERS, clock_at(thursday, 10, 0).now()) == TICKERS
+    # Tras el cierre de las 16 la sesión sigue contando `SESSION_GRACE` para la última corrida
+    assert open_tickers(["AAPL"], clock_at(thursday, 16, 4, 59).now()) == ["AAPL"]
+    assert open_tickers(["AAPL"], clock_at(thursday, 16, 5).now()) == []
+
+
+def test_closed_on_weekends_and_holidays():
+    saturday, thanksgiving = date(2026, 10, 17), date(2026, 11, 26)
+    assert open_tickers(TICKERS, clock_at(saturday, 12).now()) == []
+    assert open_tickers(["AAPL"], clock_at(thanksgiving, 12).now()) == []
+    # Thanksgiving no es feriado en Buenos Aires
+    assert open_tickers(["GGAL.BA"], clock_at(thanksgiving, 12).now()) == ["GGAL.BA"]
+
+
+def test_next_run_follows_the_session_grid():
+    thursday = date(2026, 10, 15)
+    us = EXCHANGES["US"]
+    # Antes de la apertura: primer cierre de la grilla de 10 minutos más el margen de publicación
+    assert us.next_run("1h", clock_at(thursday, 8).now()) == ny(thursday, 9, 40, 30)
+    assert us.next_run("1h", clock_at(thursday, 10, 5).now()) == ny(thursday, 10, 10, 30)
+    # La última corrida coincide con el cierre de la rueda
+    assert us.next_run("1h", clock_at(thursday, 15, 55).now()) == ny(thursday, 16, 0, 30)
+    assert us.next_run("1h", clock_at(thursday, 16, 0, 31).now()) == ny(date(2026, 10, 16), 9, 40, 30)
+
+
+def test_next_run_skips_weekends_and_holidays():
+    us = EXCHANGES["US"]
+    assert us.next_run("1d", clock_at(date(2026, 10, 17), 12).now()) == ny(date(2026, 10, 19), 9, 40, 30)
+    assert us.next_run("1d", clock_at(date(2026, 11, 26), 12).now()) == ny(date(2026, 11, 27), 9, 40, 30)
+    # Con un ticker de BYMA, el jueves feriado en EE.UU. corre la rueda de Buenos Aires (14 hs allá)
+    ba_run = next_run_time(TICKERS, "1d", clock_at(date(2026, 11, 26), 12).now())
+    assert ba_run == EXCHANGES["BA"].tz.localize(datetime(2026, 11, 26, 14, 0, 30))
+
+
+def test_warns_once_when_the_holiday_table_runs_out():
+    exchange = Exchange("BA", "BYMA", "America/Argentina/Buenos_Aires", time(11), time(17), BA_HOLIDAYS)
+    last_year = max(exchange.holidays).year
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert not exchange.is_trading_day(max(exchange.holidays))
+    with pytest.warns(RuntimeWarning, match=str(last_year + 1)):
+        assert exchange.is_trading_day(date(last_year + 1, 3, 2))
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert exchange.is_trading_day(date(last_year + 1, 3, 3))
@@ -0,0 +1,92 @@
+import json
+import threading
+import time
+from datetime import timedelta
+
+import metadata
+from metadata import MetadataCache
+
+
+class FakeFetcher:
+    # Responde "<TICKER> Inc." y deja cada búsqueda esperando hasta `release`
+    def __init__(self):
+        self.calls = []
+        self.gate = threading.Event()
+
+    def __call__(self, ticker):
+        self.calls.append(ticker)
+        self.gate.wait(5)
+        if ticker == "FALLA":
+            raise RuntimeError("sin red")
+        return f"{ticker} Inc."
+
+    def release(self, cache):
+        # La búsqueda corre en el thread de `prefetch`: se suelta y se espera a que termine
+        worker = cache._worker
+        self.gate.set()
+        if worker is not None:
+            worker.join(5)
+
+
+def test_miss_is_fetched_in_the_background_and_then_hits(tmp_path):
+    fetcher = FakeFetcher()
+    cache = MetadataCache(path=str(tmp_path / "metadata.json"), fetcher=fetcher)
+    assert cache.get_name("aapl") == ""  # No bloquea mientras se busca
+    assert cache.get_name("AAPL") == ""  # Ya está en cola: no se vuelve a pedir
+    assert (cache.hits, cache.misses) == (0, 2)
+
+    fetcher.release(cache)
+    assert cache.get_name("AAPL") == "AAPL Inc."
+    assert (cache.hits, cache.misses) == (1, 2) and fetcher.calls == ["AAPL"]
+    assert cache.stats_text() == "Metadatos: 1 en cache, 2 pendientes"
+    cache.reset_stats()
+    assert (cache.hits, cache.misses) == (0, 0)
+
+    # Lo buscado queda en disco para la próxima sesión
+    reopened = MetadataCache(path=str(tmp_path / "metadata.json"), fetcher=FakeFetcher())
+    assert reopened.get_name("AAPL") == "AAPL Inc." and reopened.hits == 1
+
+
+def test_expired_name_is_served_while_it_refreshes(tmp_path):
+    path = tmp_path / "metadata.json"
+    old = time.time() - timedelta(days=31).total_seconds()
+    path.write_text(json.dumps({"AAPL": {"longName": "Apple Computer", "fetched_at": old}}))
+    fetcher = FakeFetcher()
+    cache = MetadataCache(path=str(path), ttl=timedelta(days=30), fetcher=fetcher)
+
+    assert cache.get_name("AAPL") == "Apple Computer" and cache.misses == 1
+    fetcher.release(cache)
+    assert cache.get_name("AAPL") == "AAPL Inc." and cache.hits == 1
+    assert json.loads(path.read_text())["AAPL"]["fetched_at"] > old
+
+
+def test_prefetch_batches_only_missing_names_and_survives_errors():
+    fetcher = FakeFetcher()
+    cache = MetadataCache(path=None, fetcher=fetcher)
+    cache.prefetch(["aapl", "FALLA", "msft", "AAPL"])
+    fetcher.release(cache)
+    assert fetcher.calls == ["AAPL", "FALLA", "MSFT"]
+    assert cache.get_name("MSFT") == "MSFT Inc."
+    # Un error no se guarda: el ticker se vuelve a intentar
+    assert cache.get_name("FALLA") == "" and cache.misses == 1
+    fetcher.release(cache)
+    assert fetcher.calls[-1] == "FALLA"
+
+
+def test_default_cache_is_built_once_across_threads(monkeypatch):
+    built = []
+
+    class SlowCache:
+        def __init__(self):
+            built.append(self)
+            time.sleep(0.05)  # Ventana para que otro thread también lo vea sin crear
+
+    monkeypatch.setattr(metadata, "_default_cache", None)
+    monkeypatch.setattr(metadata, "MetadataCache", SlowCache)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(metadata.default_metadata_cache())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(built) == 1 and all(result is built[0] for result in results)
@@ -0,0 +1,69 @@
+import dataclasses
+
+import pytest
+
+from benchmarks.synthetic import FakeDownloader, synthetic_universe
+from history import QuantileStore
+from indicators import EMA_TOLERANCE
+from metadata import MetadataCache
+from pipeline import run_pipeline
+from report import has_opportunity
+from streaming import StateStore
+
+UNIVERSE = synthetic_universe(30, n_bars=1300, seed=7)
+TICKERS = list(UNIVERSE) + ["NOEXISTE"]  # Un ticker sin datos: siempre vuelve con error
+METADATA = MetadataCache(path=None, fetcher=lambda ticker: "")
+
+
+def run(tmp_path, mode="thread", quantile_store=False, screen=None):
+    return run_pipeline(
+        TICKERS, "5y", "1d", metadata=METADATA, downloader=FakeDownloader(UNIVERSE), min_interval=0,
+        mode="thread" if mode == "incremental" else mode, processes=2,
+        state_store=StateStore(str(tmp_path / "state")) if mode == "incremental" else None,
+        quantile_store=QuantileStore(str(tmp_path / "quantiles")) if quantile_store else None,
+        screen=screen,
+    )
+
+
+def by_ticker(results):
+    return {result.ticker: result for result in results}
+
+
+def assert_same_result(result, expected, rel):
+    for field in dataclasses.fields(expected):
+        value, reference = getattr(result, field.name), getattr(expected, field.name)
+        if isinstance(reference, float):
+            assert value == pytest.approx(reference, rel=rel, nan_ok=True), (expected.ticker, field.name)
+        else:
+            assert value == reference, (expected.ticker, field.name)
+
+
+@pytest.fixture(scope="module")
+def reference(tmp_path_factory):
+    return by_ticker(run(tmp_path_factory.mktemp("reference")))
+
+
+@pytest.mark.parametrize("screen", [None, "compra", "venta", "todas"])
+@pytest.mark.parametrize("quantile_store", [False, True])
+@pytest.mark.parametrize("mode", ["thread", "process", "panel", "incremental"])
+def test_run_pipeline_modes_match_reference(tmp_path, reference, mode, quantile_store, screen):
+    results = by_ticker(run(tmp_path, mode, quantile_store, screen))
+
+    if screen is None or mode in ("panel", "incremental"):
+        expected = set(reference)  # El panel y el incremental ignoran `screen`
+    else:
+        # El primer filtro no puede perder alertas; los errores se reportan igual
+        expected = {ticker for ticker, result in reference.items() if result.error or has_opportunity(result, screen)}
+    assert set(results) == expected
+    # Con el store se descarga sólo el histórico mínimo: las EMAs arrancan de otra semilla
+    rel = EMA_TOLERANCE if quantile_store else 1e-9
+    for ticker in expected:
+        assert_same_result(results[ticker], reference[ticker], rel)
+
+
+def test_reference_has_alerts_and_discards(reference):
+    # Sin alertas de ambos tipos y sin descartes la paridad del filtro no prueba nada
+    results = list(reference.values())
+    assert any(r.alerta_compra for r in results) and any(r.alerta_venta for r in results)
+    assert not all(has_opportunity(r, "todas") or r.error for r in results)
+    assert reference["NOEXISTE"].error
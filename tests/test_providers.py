@@ -0,0 +1,46 @@
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import synthetic_universe
+from data import resample_weekly
+from providers import BarProvider, DirectoryProvider, ReplayProvider, save_history
+
+
+def record_daily(tmp_path, n_tickers=3, n_bars=600):
+    universe = synthetic_universe(n_tickers, n_bars, 0, "1d")
+    for ticker, data in universe.items():
+        save_history(tmp_path, ticker, "1d", data)
+    return universe
+
+
+def test_directory_provider_derives_weekly_from_daily(tmp_path):
+    universe = record_daily(tmp_path)
+    provider = DirectoryProvider(tmp_path)
+    assert provider.tickers("1wk") == sorted(universe)
+    frame = provider(list(universe), interval="1wk", period="5y")
+    for ticker in universe:
+        daily = provider.load(ticker, "1d")
+        pd.testing.assert_frame_equal(frame[ticker].dropna(how="all"), resample_weekly(daily), check_freq=False)
+
+
+def test_replay_weekly_bar_only_sees_open_days(tmp_path):
+    universe = record_daily(tmp_path, n_tickers=1)
+    ticker = next(iter(universe))
+    # Miércoles: la vela semanal en curso tiene lunes a miércoles, nada de jueves y viernes
+    now = pd.Timestamp("2026-09-16 12:00", tz="UTC")
+    replay = ReplayProvider(DirectoryProvider(tmp_path), "1wk", start=now, speed=1e-9)
+    weekly = replay.history(ticker, "1wk", "5y")
+    daily = DirectoryProvider(tmp_path).load(ticker, "1d")
+    open_days = daily[(daily.index >= pd.Timestamp("2026-09-14", tz="UTC")) & (daily.index <= now)]
+    assert len(open_days) == 3
+    assert weekly["Close"].iloc[-1] == open_days["Close"].iloc[-1]
+    assert weekly["Volume"].iloc[-1] == open_days["Volume"].sum()
+
+
+def test_provider_without_history_cannot_be_built():
+    class Incomplete(BarProvider):
+        def company_name(self, ticker):
+            return ticker
+
+    with pytest.raises(TypeError, match="history"):
+        Incomplete()
@@ -0,0 +1,38 @@
+import threading
+
+from rendering import ReportView
+from report import StockResult
+
+
+class FakeTextbox:
+    # El volcado sólo ubica texto en el widget; acá alcanza con aceptar las llamadas
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: "1.0"
+
+
+def test_reports_of_a_cancelled_run_are_dropped():
+    view = ReportView(FakeTextbox())
+    old_run, new_run = threading.Event(), threading.Event()
+    view.begin()
+    view.push(StockResult("VIEJO", pass_count=3), old_run)
+
+    # Un análisis nuevo arranca: su `begin` limpia la cola y cancela al anterior
+    view.begin()
+    old_run.set()
+    # El thread viejo ya había pasado su chequeo de cancelación y encola igual
+    view.push(StockResult("TARDE", pass_count=5), old_run)
+    view.push(StockResult("NUEVO", pass_count=1), new_run)
+    view.flush()
+
+    assert len(view.entries) == 1
+    assert "NUEVO" in view.entries[0][1] and "TARDE" not in view.entries[0][1]
+    assert not view.pending
+
+
+def test_reports_without_cancel_are_always_shown():
+    view = ReportView(FakeTextbox())
+    view.begin()
+    for ticker, passes in (("AAA", 1), ("BBB", 4), ("CCC", 2)):
+        view.push(StockResult(ticker, pass_count=passes))
+    view.flush()
+    assert [entry[0] for entry in view.entries] == [-4, -2, -1]
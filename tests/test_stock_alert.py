@@ -0,0 +1,64 @@
+import io
+import json
+
+import pytest
+
+from alerts import SignalStore
+from benchmarks.synthetic import FakeDownloader, synthetic_universe
+from metadata import MetadataCache
+from providers import BarProvider
+from stock_alert import build_parser, scan
+
+UNIVERSE = synthetic_universe(12, n_bars=600, seed=3)
+TICKERS = list(UNIVERSE) + ["NOEXISTE"]
+
+
+class FakeProvider(BarProvider):
+    # Universo sintético como fuente de velas; el estado derivado va al directorio del test
+    def __init__(self, cache_dir):
+        super().__init__()
+        self.cache_dir = cache_dir
+        self.downloader = FakeDownloader(UNIVERSE)
+
+    def history(self, ticker, interval="1d", period=None, start=None):
+        data = self.downloader([ticker], interval, period, start)
+        return data[ticker] if not data.empty else data
+
+
+def run_scan(tmp_path, *argv, signal_store=None):
+    args = build_parser().parse_args(["scan", "--tickers", ",".join(TICKERS), *argv])
+    out = io.StringIO()
+    metadata = MetadataCache(path=None, fetcher=lambda ticker: "")
+    scan(args, TICKERS, None, metadata, signal_store=signal_store, out=out, provider=FakeProvider(str(tmp_path)))
+    return [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+def test_scan_writes_one_record_per_ticker_by_default(tmp_path):
+    records = run_scan(tmp_path)
+    assert sorted(r["ticker"] for r in records) == sorted(TICKERS)
+    by_ticker = {r["ticker"]: r for r in records}
+    assert by_ticker["NOEXISTE"]["error"]
+    for ticker in UNIVERSE:
+        record = by_ticker[ticker]
+        assert record["error"] is None
+        assert {"alerta_compra", "alerta_venta", "pass_count", "signals"} <= record.keys()
+        # Tiempo propio del ticker (suma de sus etapas), no el acumulado desde el inicio del scan
+        assert record["stages"].keys() >= {"indicadores", "reglas"}
+        assert record["elapsed"] == pytest.approx(sum(record["stages"].values()), abs=1e-3)
+
+
+@pytest.mark.parametrize("filter_type", ["compra", "venta", "todas"])
+def test_scan_filter_keeps_only_matching_tickers(tmp_path, filter_type):
+    everything = run_scan(tmp_path)
+    records = run_scan(tmp_path, "--filter", filter_type)
+    wanted = {"compra": ["alerta_compra"], "venta": ["alerta_venta"], "todas": ["alerta_compra", "alerta_venta"]}
+    expected = {r["ticker"] for r in everything if any(r[field] for field in wanted[filter_type])}
+    assert {r["ticker"] for r in records} == expected
+
+
+def test_scan_changes_without_every_reports_against_the_previous_run(tmp_path):
+    store = SignalStore(str(tmp_path / "alerts.json"), log_path=None)
+    first = run_scan(tmp_path, "--changes", signal_store=store)
+    # Primera corrida: todas las alertas activas son nuevas
+    assert first and all(e["kind"] == "nueva" for r in first for e in r["events"])
+    assert run_scan(tmp_path, "--changes", signal_store=SignalStore(str(tmp_path / "alerts.json"), log_path=None)) == []
@@ -0,0 +1,65 @@
+import dataclasses
+
+import pytest
+
+from analysis import check_stock
+from benchmarks.synthetic import synthetic_ohlcv
+from metadata import MetadataCache
+from streaming import StateStore, analyze_incremental
+
+METADATA = MetadataCache(path=None, fetcher=lambda ticker: "")
+
+
+def assert_matches_full_analysis(result, data):
+    expected = check_stock("SYN", data=data, metadata=METADATA)
+    for field in dataclasses.fields(expected):
+        value, reference = getattr(result, field.name), getattr(expected, field.name)
+        if isinstance(reference, float):
+            assert value == pytest.approx(reference, rel=1e-9, nan_ok=True), field.name
+        else:
+            assert value == reference, field.name
+
+
+def run_cycles(tmp_path, *cycles):
+    store = StateStore(str(tmp_path))
+    for data in cycles:
+        result = analyze_incremental("SYN", "1d", data, store)
+    return store, result
+
+
+def test_one_new_bar_updates_without_rebuild(tmp_path):
+    full = synthetic_ohlcv(1300, seed=1)
+    store, result = run_cycles(tmp_path, full.iloc[:-1], full)
+    assert (store.rebuilds, store.updates) == (1, 1)
+    assert_matches_full_analysis(result, full)
+
+
+def test_sliding_period_keeps_the_state(tmp_path):
+    # Con un período fijo ("5y") la vela más vieja sale cuando entra una nueva
+    full = synthetic_ohlcv(1300, seed=2)
+    store, _ = run_cycles(tmp_path, full.iloc[:-3], full.iloc[1:-2], full.iloc[2:-1], full.iloc[3:])
+    assert (store.rebuilds, store.updates) == (1, 3)
+
+
+def test_missing_last_bar_rebuilds(tmp_path):
+    full = synthetic_ohlcv(1300, seed=3)
+    first = full.iloc[:-3]
+    # La última vela consolidada del primer ciclo (anteúltima de `first`) ya no está
+    gap = full.drop(first.index[-2])
+    store, result = run_cycles(tmp_path, first, gap)
+    assert (store.rebuilds, store.updates) == (2, 0)
+    assert_matches_full_analysis(result, gap)
+
+
+@pytest.mark.parametrize("revision", ["one_close", "dividend"])
+def test_revised_close_rebuilds(tmp_path, revision):
+    full = synthetic_ohlcv(1300, seed=4)
+    revised = full.copy()
+    if revision == "one_close":
+        revised.iloc[-200, revised.columns.get_loc("Close")] *= 1.01
+    else:
+        # Ajuste por dividendos: todo el histórico anterior a la fecha ex se escala
+        revised.iloc[:-200, :4] *= 0.995
+    store, result = run_cycles(tmp_path, full.iloc[:-1], revised)
+    assert (store.rebuilds, store.updates) == (2, 0)
+    assert_matches_full_analysis(result, revised)